@@ -0,0 +1,53 @@
+"""Add sentiment classifications cache table
+
+Revision ID: 3f1c2a7d9e41
+Revises: b10af5929dbe
+Create Date: 2025-11-20 10:12:03.118274
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f1c2a7d9e41"
+down_revision: Union[str, Sequence[str], None] = "b10af5929dbe"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "sentiment_classifications",
+        sa.Column("text_hash", sa.String(length=64), nullable=False),
+        sa.Column("model", sa.String(length=100), nullable=False),
+        sa.Column("prompt_version", sa.INTEGER(), nullable=False),
+        sa.Column("result", sa.String(length=50), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("text_hash", "model", "prompt_version"),
+    )
+    op.create_index(
+        op.f("ix_sentiment_classifications_expires_at"),
+        "sentiment_classifications",
+        ["expires_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        op.f("ix_sentiment_classifications_expires_at"),
+        table_name="sentiment_classifications",
+    )
+    op.drop_table("sentiment_classifications")
@@ -0,0 +1,302 @@
+"""Reference pipeline versions from evaluations
+
+Revision ID: 5b93e0c7d214
+Revises: f4a9d2c61e38
+Create Date: 2025-11-27 10:42:18.906733
+
+"""
+
+import json
+from typing import Optional, Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5b93e0c7d214"
+down_revision: Union[str, Sequence[str], None] = "f4a9d2c61e38"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_BATCH_SIZE = 1000
+
+# Evaluations whose run log copied the pipeline version they ran with. Versions
+# are not linked to their pipeline, so only the pipeline's current version can
+# be matched, by its number. Evaluations that ran with an older version get it
+# recreated from the steps their run log copied.
+_SELECT_FULL_RUN_LOGS = sa.text("""
+    SELECT
+        evaluations.id,
+        evaluations.pipeline_id,
+        evaluations.details,
+        versions.id AS version_id
+    FROM application_evaluations AS evaluations
+    JOIN pipelines ON pipelines.id = evaluations.pipeline_id
+    LEFT JOIN pipeline_versions AS versions
+        ON versions.id = pipelines.current_version_id
+        AND versions.version_number::text
+            = evaluations.details -> 'pipeline' ->> 'version'
+    WHERE evaluations.id > :last_id
+        AND evaluations.details -> 'eval' IS NOT NULL
+    ORDER BY evaluations.id
+    LIMIT :limit
+    """)
+
+_INSERT_VERSION = sa.text("""
+    INSERT INTO pipeline_versions (id, version_number, steps, react_flow_nodes)
+    VALUES (
+        gen_random_uuid(),
+        :version_number,
+        CAST(:steps AS json),
+        CAST(:react_flow_nodes AS json)
+    )
+    RETURNING id
+    """)
+
+_SELECT_COMPACT_RUN_LOGS = sa.text("""
+    SELECT
+        evaluations.id,
+        evaluations.details,
+        versions.id AS version_id,
+        versions.steps,
+        versions.react_flow_nodes
+    FROM application_evaluations AS evaluations
+    JOIN pipeline_versions AS versions
+        ON versions.id = evaluations.pipeline_version_id
+    WHERE evaluations.id > :last_id
+        AND evaluations.details -> 'trace' IS NOT NULL
+    ORDER BY evaluations.id
+    LIMIT :limit
+    """)
+
+_UPDATE_DETAILS = sa.text("""
+    UPDATE application_evaluations
+    SET details = CAST(:details AS json), pipeline_version_id = :version_id
+    WHERE id = :id
+    """)
+
+
+def _trace_from_run_log(details: dict) -> Optional[list]:
+    """Follow the nested evaluation results down the path taken by the run."""
+    trace = []
+    step, evaluation = details.get("steps"), details.get("eval")
+    while isinstance(step, dict) and isinstance(evaluation, dict):
+        trace.append(
+            {
+                "nodeId": step["flowNodeId"],
+                "result": evaluation["evaluation_result"],
+                "value": evaluation["evaluation_result_value"],
+                "duration": evaluation["evaluation_duration"],
+            }
+        )
+        if evaluation["evaluation_result"] == "PASS":
+            step = step["passScenario"]
+            evaluation = evaluation["pass_scenario_evaluation"]
+        else:
+            step = step["failScenario"]
+            evaluation = evaluation["fail_scenario_evaluation"]
+
+    return trace or None
+
+
+def _submitted_steps(step):
+    """The steps as copied into a run log, back to the format they were submitted in."""
+    if not isinstance(step, dict):
+        return step
+
+    submitted = {key: value for key, value in step.items() if key != "flowNodeId"}
+    submitted["nodeId"] = step.get("flowNodeId")
+    submitted["passScenario"] = _submitted_steps(step.get("passScenario"))
+    submitted["failScenario"] = _submitted_steps(step.get("failScenario"))
+    return submitted
+
+
+# Fields `PipelineStep.to_dict` adds to the common ones, by type of step
+_STEP_FIELDS = {
+    "DTI_RULE": ["maxDTI"],
+    "AMOUNT_POLICY_RULE": ["loanCaps"],
+    "RISK_SCORING_RULE": ["maxRiskScore", "loanCaps"],
+    "SENTIMENT_ANALYSIS_RULE": ["model"],
+}
+
+_DEFAULT_SENTIMENT_MODEL = "gpt-4o-mini"
+
+
+def _serialise_steps(step):
+    """
+    Copy of `parse_pipeline_step(step).to_dict()`: the steps as submitted,
+    serialised as the parsed pipeline did when run logs copied them.
+    """
+    if not isinstance(step, dict):
+        return step
+
+    serialised = {
+        "type": step["type"],
+        "flowNodeId": step.get("nodeId"),
+        "passScenario": _serialise_steps(step.get("passScenario")),
+        "failScenario": _serialise_steps(step.get("failScenario")),
+    }
+    for field in _STEP_FIELDS.get(step["type"], []):
+        serialised[field] = step.get(field)
+
+    if "loanCaps" in serialised:
+        # The last cap given for other countries is kept, and listed last
+        caps = [
+            {"country": cap["country"], "capAmount": cap["capAmount"]}
+            for cap in serialised["loanCaps"] or []
+        ]
+        other_caps = [cap for cap in caps if cap["country"] == "OTHER"]
+        serialised["loanCaps"] = [
+            cap for cap in caps if cap["country"] != "OTHER"
+        ] + other_caps[-1:]
+    if "model" in serialised and not serialised["model"]:
+        serialised["model"] = _DEFAULT_SENTIMENT_MODEL
+
+    return serialised
+
+
+def _eval_from_trace(step, trace: list, position: int = 0) -> Optional[dict]:
+    """Copy of `PipelineStep.get_evaluation_result`, over the steps' dict."""
+    if not isinstance(step, dict) or position is None or position >= len(trace):
+        return None
+
+    outcome = trace[position]
+    passed = outcome["result"] == "PASS"
+    return {
+        "evaluation_result": outcome["result"],
+        "evaluation_result_value": outcome["value"],
+        "evaluation_duration": outcome["duration"],
+        "pass_scenario_evaluation": _eval_from_trace(
+            step["passScenario"], trace, position + 1 if passed else None
+        ),
+        "fail_scenario_evaluation": _eval_from_trace(
+            step["failScenario"], trace, None if passed else position + 1
+        ),
+    }
+
+
+def _recreate_version(connection, row, recreated_versions: dict):
+    """
+    ID of the version an evaluation ran with, recreated from its run log.
+    None when the run log doesn't hold enough of it.
+    """
+    version_number = (row.details.get("pipeline") or {}).get("version")
+    steps = row.details.get("steps")
+    if not isinstance(version_number, int) or not isinstance(steps, dict):
+        return None
+
+    key = (row.pipeline_id, version_number)
+    if key not in recreated_versions:
+        recreated_versions[key] = connection.execute(
+            _INSERT_VERSION,
+            {
+                "version_number": version_number,
+                "steps": json.dumps(_submitted_steps(steps)),
+                "react_flow_nodes": json.dumps(row.details.get("reactFlowNodes")),
+            },
+        ).scalar_one()
+
+    return recreated_versions[key]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "application_evaluations",
+        sa.Column("pipeline_version_id", sa.UUID(), nullable=True),
+    )
+    op.create_foreign_key(
+        "application_evaluations_pipeline_version_id_fkey",
+        "application_evaluations",
+        "pipeline_versions",
+        ["pipeline_version_id"],
+        ["id"],
+    )
+
+    connection = op.get_bind()
+    # Recreated versions, by pipeline and version number
+    recreated_versions = {}
+    last_id = "00000000-0000-0000-0000-000000000000"
+    while True:
+        rows = connection.execute(
+            _SELECT_FULL_RUN_LOGS, {"last_id": last_id, "limit": _BATCH_SIZE}
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        updates = []
+        for row in rows:
+            trace = _trace_from_run_log(row.details)
+            if trace is None:
+                continue
+
+            version_id = row.version_id
+            if version_id is None:
+                version_id = _recreate_version(connection, row, recreated_versions)
+                if version_id is None:
+                    continue
+
+            updates.append(
+                {
+                    "id": row.id,
+                    "version_id": version_id,
+                    "details": json.dumps(
+                        {
+                            "pipeline": row.details["pipeline"],
+                            "trace": trace,
+                            "run_result": row.details.get("run_result"),
+                            "run_duration": row.details.get("run_duration"),
+                        }
+                    ),
+                }
+            )
+        if updates:
+            connection.execute(_UPDATE_DETAILS, updates)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    connection = op.get_bind()
+    steps_by_version = {}
+    last_id = "00000000-0000-0000-0000-000000000000"
+    while True:
+        rows = connection.execute(
+            _SELECT_COMPACT_RUN_LOGS, {"last_id": last_id, "limit": _BATCH_SIZE}
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        updates = []
+        for row in rows:
+            if row.version_id not in steps_by_version:
+                # The steps are stored as submitted, run logs hold them as
+                # serialised by the parsed pipeline
+                steps_by_version[row.version_id] = _serialise_steps(row.steps)
+            steps = steps_by_version[row.version_id]
+            updates.append(
+                {
+                    "id": row.id,
+                    "version_id": row.version_id,
+                    "details": json.dumps(
+                        {
+                            "pipeline": row.details["pipeline"],
+                            "steps": steps,
+                            "reactFlowNodes": row.react_flow_nodes or {},
+                            "eval": _eval_from_trace(steps, row.details["trace"]),
+                            "run_result": row.details.get("run_result"),
+                            "run_duration": row.details.get("run_duration"),
+                        }
+                    ),
+                }
+            )
+        connection.execute(_UPDATE_DETAILS, updates)
+
+    op.drop_constraint(
+        "application_evaluations_pipeline_version_id_fkey",
+        "application_evaluations",
+        type_="foreignkey",
+    )
+    op.drop_column("application_evaluations", "pipeline_version_id")
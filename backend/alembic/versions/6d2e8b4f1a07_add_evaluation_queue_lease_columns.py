@@ -0,0 +1,56 @@
+"""Add evaluation queue lease columns
+
+Revision ID: 6d2e8b4f1a07
+Revises: 3f1c2a7d9e41
+Create Date: 2025-11-21 14:37:52.604118
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6d2e8b4f1a07"
+down_revision: Union[str, Sequence[str], None] = "3f1c2a7d9e41"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "application_evaluations",
+        sa.Column("claimed_by", sa.String(length=255), nullable=True),
+    )
+    op.add_column(
+        "application_evaluations",
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.add_column(
+        "application_evaluations",
+        sa.Column(
+            "attempts", sa.INTEGER(), server_default=sa.text("0"), nullable=False
+        ),
+    )
+    op.create_index(
+        "ix_application_evaluations_queue",
+        "application_evaluations",
+        ["status", "created_at"],
+        unique=False,
+        postgresql_where=sa.text("status IN ('PENDING', 'EVALUATING')"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_application_evaluations_queue",
+        table_name="application_evaluations",
+        postgresql_where=sa.text("status IN ('PENDING', 'EVALUATING')"),
+    )
+    op.drop_column("application_evaluations", "attempts")
+    op.drop_column("application_evaluations", "lease_expires_at")
+    op.drop_column("application_evaluations", "claimed_by")
@@ -0,0 +1,77 @@
+"""Encode execution traces by version
+
+Revision ID: 7e1d4a2b9c63
+Revises: 5b93e0c7d214
+Create Date: 2025-11-28 16:05:37.214590
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7e1d4a2b9c63"
+down_revision: Union[str, Sequence[str], None] = "5b93e0c7d214"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Traces were a list of {nodeId, result, value, duration in seconds} objects
+    op.execute("""
+        UPDATE application_evaluations
+        SET details = jsonb_set(
+            details::jsonb,
+            '{trace}',
+            jsonb_build_object(
+                'version', 1,
+                'steps', COALESCE(
+                    (
+                        SELECT jsonb_agg(
+                            jsonb_build_array(
+                                outcome -> 'nodeId',
+                                outcome -> 'result',
+                                outcome -> 'value',
+                                round((outcome ->> 'duration')::numeric * 1e9)::bigint
+                            )
+                            ORDER BY position
+                        )
+                        FROM jsonb_array_elements(details::jsonb -> 'trace')
+                            WITH ORDINALITY AS outcomes (outcome, position)
+                    ),
+                    '[]'::jsonb
+                )
+            )
+        )::json
+        WHERE json_typeof(details -> 'trace') = 'array'
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("""
+        UPDATE application_evaluations
+        SET details = jsonb_set(
+            details::jsonb,
+            '{trace}',
+            COALESCE(
+                (
+                    SELECT jsonb_agg(
+                        jsonb_build_object(
+                            'nodeId', step -> 0,
+                            'result', step -> 1,
+                            'value', step -> 2,
+                            'duration', (step ->> 3)::double precision / 1e9
+                        )
+                        ORDER BY position
+                    )
+                    FROM jsonb_array_elements(details::jsonb -> 'trace' -> 'steps')
+                        WITH ORDINALITY AS steps (step, position)
+                ),
+                '[]'::jsonb
+            )
+        )::json
+        WHERE json_typeof(details -> 'trace') = 'object'
+        """)
@@ -0,0 +1,148 @@
+"""Store JSON columns as JSONB
+
+Revision ID: 9c2f6e8a1d47
+Revises: 7e1d4a2b9c63
+Create Date: 2025-12-01 11:18:06.537204
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9c2f6e8a1d47"
+down_revision: Union[str, Sequence[str], None] = "7e1d4a2b9c63"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column, nullable)
+_JSON_COLUMNS = [
+    ("application_evaluations", "details", True),
+    ("pipeline_versions", "steps", False),
+    ("pipeline_versions", "react_flow_nodes", True),
+]
+
+# (index name, table, expression)
+_INDEXES = [
+    (
+        "ix_application_evaluations_trace",
+        "application_evaluations",
+        sa.text("(details -> 'trace') jsonb_path_ops"),
+    ),
+    (
+        "ix_pipeline_versions_step_types",
+        "pipeline_versions",
+        sa.text("jsonb_path_query_array(steps, '$.**.type')"),
+    ),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rewrites both tables, which are locked meanwhile
+    for table, column, nullable in _JSON_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            existing_type=sa.JSON(),
+            type_=postgresql.JSONB(),
+            existing_nullable=nullable,
+            postgresql_using=f"{column}::jsonb",
+        )
+
+    # Version 2 traces record the type of every step, looked up by flow node ID
+    # in the version the evaluation ran with
+    op.execute("""
+        UPDATE application_evaluations AS evaluations
+        SET details = jsonb_set(
+            evaluations.details,
+            '{trace}',
+            jsonb_build_object(
+                'version', 2,
+                'steps', COALESCE(
+                    (
+                        SELECT jsonb_agg(
+                            jsonb_build_array(
+                                step -> 0,
+                                jsonb_path_query_first(
+                                    versions.steps,
+                                    '$.** ? (@.nodeId == $node_id).type',
+                                    jsonb_build_object('node_id', step -> 0)
+                                ),
+                                step -> 1,
+                                step -> 2,
+                                step -> 3
+                            )
+                            ORDER BY position
+                        )
+                        FROM jsonb_array_elements(
+                            evaluations.details -> 'trace' -> 'steps'
+                        ) WITH ORDINALITY AS steps (step, position)
+                    ),
+                    '[]'::jsonb
+                )
+            )
+        )
+        FROM pipeline_versions AS versions
+        WHERE versions.id = evaluations.pipeline_version_id
+            AND evaluations.details -> 'trace' ->> 'version' = '1'
+        """)
+
+    # Built concurrently so large tables stay writable during the migration
+    with op.get_context().autocommit_block():
+        for name, table, expression in _INDEXES:
+            op.create_index(
+                name,
+                table,
+                [expression],
+                unique=False,
+                postgresql_using="gin",
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(_INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+    op.execute("""
+        UPDATE application_evaluations
+        SET details = jsonb_set(
+            details,
+            '{trace}',
+            jsonb_build_object(
+                'version', 1,
+                'steps', COALESCE(
+                    (
+                        SELECT jsonb_agg(step - 1 ORDER BY position)
+                        FROM jsonb_array_elements(details -> 'trace' -> 'steps')
+                            WITH ORDINALITY AS steps (step, position)
+                    ),
+                    '[]'::jsonb
+                )
+            )
+        )
+        WHERE details -> 'trace' ->> 'version' = '2'
+        """)
+
+    for table, column, nullable in reversed(_JSON_COLUMNS):
+        op.alter_column(
+            table,
+            column,
+            existing_type=postgresql.JSONB(),
+            type_=sa.JSON(),
+            existing_nullable=nullable,
+            postgresql_using=f"{column}::json",
+        )
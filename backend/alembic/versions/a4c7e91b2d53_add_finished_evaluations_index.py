@@ -0,0 +1,39 @@
+"""Add finished evaluations index
+
+Revision ID: a4c7e91b2d53
+Revises: 6d2e8b4f1a07
+Create Date: 2025-11-22 11:05:19.271536
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a4c7e91b2d53"
+down_revision: Union[str, Sequence[str], None] = "6d2e8b4f1a07"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_application_evaluations_finished",
+        "application_evaluations",
+        ["updated_at"],
+        unique=False,
+        postgresql_where=sa.text("status IN ('EVALUATED', 'EVALUATING_ERROR')"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_application_evaluations_finished",
+        table_name="application_evaluations",
+        postgresql_where=sa.text("status IN ('EVALUATED', 'EVALUATING_ERROR')"),
+    )
@@ -0,0 +1,76 @@
+"""Add indexes for wrapper queries
+
+Revision ID: c81f5d3e6a92
+Revises: a4c7e91b2d53
+Create Date: 2025-11-23 16:48:30.917265
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c81f5d3e6a92"
+down_revision: Union[str, Sequence[str], None] = "a4c7e91b2d53"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns)
+_INDEXES = [
+    (
+        "ix_application_evaluations_pipeline_id_created_at",
+        "application_evaluations",
+        ["pipeline_id", sa.text("created_at DESC")],
+    ),
+    (
+        "ix_application_evaluations_status_created_at",
+        "application_evaluations",
+        ["status", sa.text("created_at DESC")],
+    ),
+    (
+        "ix_application_evaluations_application_id_created_at",
+        "application_evaluations",
+        ["application_id", sa.text("created_at DESC")],
+    ),
+    (
+        "ix_application_evaluations_created_at",
+        "application_evaluations",
+        [sa.text("created_at DESC")],
+    ),
+    (
+        "ix_applications_status_created_at",
+        "applications",
+        ["status", sa.text("created_at DESC")],
+    ),
+    ("ix_pipelines_status", "pipelines", ["status"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so large tables stay writable during the migration
+    with op.get_context().autocommit_block():
+        for name, table, columns in _INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(_INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
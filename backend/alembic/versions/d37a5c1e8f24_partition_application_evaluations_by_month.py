@@ -0,0 +1,132 @@
+"""Partition application evaluations by month
+
+Revision ID: d37a5c1e8f24
+Revises: 9c2f6e8a1d47
+Create Date: 2025-12-03 15:26:49.781053
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d37a5c1e8f24"
+down_revision: Union[str, Sequence[str], None] = "9c2f6e8a1d47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_TABLE = "application_evaluations"
+_REBUILT_TABLE = "application_evaluations_rebuilt"
+
+# Months created ahead of the current one. Later ones are created by
+# `python -m orchestrator.partitions create`.
+_MONTHS_AHEAD = 3
+
+# Bounds of the months from the oldest evaluation's to `months_ahead` after the
+# current one. Computed by the database, so months start at midnight in its time
+# zone, as `date_trunc` does.
+_MONTHS = sa.text(f"""
+    SELECT to_char(month, 'YYYYMM'), month, month + interval '1 month'
+    FROM generate_series(
+        date_trunc(
+            'month', COALESCE((SELECT min(created_at) FROM {_TABLE}), now())
+        ),
+        date_trunc('month', now()) + make_interval(months => :months_ahead),
+        interval '1 month'
+    ) AS month
+    """)
+
+# (constraint name, column, referred table)
+_FOREIGN_KEYS = [
+    ("application_evaluations_application_id_fkey", "application_id", "applications"),
+    ("application_evaluations_pipeline_id_fkey", "pipeline_id", "pipelines"),
+    (
+        "application_evaluations_pipeline_version_id_fkey",
+        "pipeline_version_id",
+        "pipeline_versions",
+    ),
+]
+
+# (index name, columns, options), as they were at the time of this revision
+_INDEXES = [
+    (
+        "ix_application_evaluations_pipeline_id_created_at",
+        ["pipeline_id", sa.text("created_at DESC")],
+        {},
+    ),
+    (
+        "ix_application_evaluations_status_created_at",
+        ["status", sa.text("created_at DESC")],
+        {},
+    ),
+    (
+        "ix_application_evaluations_application_id_created_at",
+        ["application_id", sa.text("created_at DESC")],
+        {},
+    ),
+    (
+        "ix_application_evaluations_created_at_id",
+        [sa.text("created_at DESC"), sa.text("id DESC")],
+        {},
+    ),
+    (
+        "ix_application_evaluations_queue",
+        ["status", "created_at"],
+        {"postgresql_where": sa.text("status IN ('PENDING', 'EVALUATING')")},
+    ),
+    (
+        "ix_application_evaluations_finished",
+        ["updated_at"],
+        {"postgresql_where": sa.text("status IN ('EVALUATED', 'EVALUATING_ERROR')")},
+    ),
+    (
+        "ix_application_evaluations_trace",
+        [sa.text("(details -> 'trace') jsonb_path_ops")],
+        {"postgresql_using": "gin"},
+    ),
+]
+
+
+def _replace_table(primary_key: Sequence[str]) -> None:
+    """Swap the rebuilt table in, and give it the constraints and indexes."""
+    op.execute(f"INSERT INTO {_REBUILT_TABLE} SELECT * FROM {_TABLE}")
+    op.drop_table(_TABLE)
+    op.rename_table(_REBUILT_TABLE, _TABLE)
+
+    op.create_primary_key(f"{_TABLE}_pkey", _TABLE, list(primary_key))
+    for name, column, referred_table in _FOREIGN_KEYS:
+        op.create_foreign_key(name, _TABLE, referred_table, [column], ["id"])
+    for name, columns, options in _INDEXES:
+        op.create_index(name, _TABLE, columns, unique=False, **options)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The table is copied over, evaluations can't be written meanwhile
+    op.execute(f"""
+        CREATE TABLE {_REBUILT_TABLE} (LIKE {_TABLE} INCLUDING DEFAULTS)
+        PARTITION BY RANGE (created_at)
+        """)
+
+    # One partition per month, from the oldest evaluation's on
+    months = op.get_bind().execute(_MONTHS, {"months_ahead": _MONTHS_AHEAD}).all()
+    for suffix, start, end in months:
+        op.execute(f"""
+            CREATE TABLE {_TABLE}_p{suffix} PARTITION OF {_REBUILT_TABLE}
+            FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')
+            """)
+    # Catches evaluations of months without a partition yet
+    op.execute(f"CREATE TABLE {_TABLE}_default PARTITION OF {_REBUILT_TABLE} DEFAULT")
+
+    # The partition key has to be part of the primary key
+    _replace_table(primary_key=["id", "created_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Archived partitions are not brought back, restore them first if needed
+    op.execute(f"CREATE TABLE {_REBUILT_TABLE} (LIKE {_TABLE} INCLUDING DEFAULTS)")
+    _replace_table(primary_key=["id"])
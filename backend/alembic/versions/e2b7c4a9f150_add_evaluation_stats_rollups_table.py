@@ -0,0 +1,82 @@
+"""Add evaluation stats rollups table
+
+Revision ID: e2b7c4a9f150
+Revises: c81f5d3e6a92
+Create Date: 2025-11-24 09:31:52.604118
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e2b7c4a9f150"
+down_revision: Union[str, Sequence[str], None] = "c81f5d3e6a92"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Copy of DURATION_BUCKET_BOUNDS at the time of this revision
+_DURATION_BUCKET_BOUNDS = (
+    "ARRAY[0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0]"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "evaluation_stats_rollups",
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("pipeline_id", sa.UUID(), nullable=False),
+        sa.Column(
+            "status",
+            postgresql.ENUM(name="applicationevaluationstatus", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("result", sa.String(length=50), nullable=False),
+        sa.Column("duration_bucket", sa.INTEGER(), nullable=False),
+        sa.Column("count", sa.INTEGER(), nullable=False),
+        sa.Column(
+            "duration_sum",
+            sa.DOUBLE_PRECISION(),
+            server_default=sa.text("0"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["pipeline_id"], ["pipelines.id"]),
+        sa.PrimaryKeyConstraint(
+            "bucket_start", "pipeline_id", "status", "result", "duration_bucket"
+        ),
+    )
+
+    # Finished evaluations are rolled up by the hour they were last updated in
+    op.execute(f"""
+        INSERT INTO evaluation_stats_rollups (
+            bucket_start, pipeline_id, status, result, duration_bucket,
+            count, duration_sum
+        )
+        SELECT
+            date_trunc('hour', updated_at),
+            pipeline_id,
+            status,
+            COALESCE(result::text, ''),
+            COALESCE(
+                width_bucket(
+                    (details ->> 'run_duration')::double precision,
+                    {_DURATION_BUCKET_BOUNDS}::double precision[]
+                ),
+                -1
+            ),
+            count(*),
+            COALESCE(sum((details ->> 'run_duration')::double precision), 0)
+        FROM application_evaluations
+        WHERE status IN ('EVALUATED', 'EVALUATING_ERROR')
+        GROUP BY 1, 2, 3, 4, 5
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("evaluation_stats_rollups")
@@ -0,0 +1,75 @@
+"""Add keyset pagination indexes
+
+Revision ID: f4a9d2c61e38
+Revises: e2b7c4a9f150
+Create Date: 2025-11-25 14:07:43.381920
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f4a9d2c61e38"
+down_revision: Union[str, Sequence[str], None] = "e2b7c4a9f150"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns)
+_INDEXES = [
+    (
+        "ix_application_evaluations_created_at_id",
+        "application_evaluations",
+        [sa.text("created_at DESC"), sa.text("id DESC")],
+    ),
+    (
+        "ix_applications_created_at_id",
+        "applications",
+        [sa.text("created_at DESC"), sa.text("id DESC")],
+    ),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so large tables stay writable during the migration
+    with op.get_context().autocommit_block():
+        for name, table, columns in _INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        # Superseded by the (created_at, id) index
+        op.drop_index(
+            "ix_application_evaluations_created_at",
+            table_name="application_evaluations",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_application_evaluations_created_at",
+            "application_evaluations",
+            [sa.text("created_at DESC")],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        for name, table, _ in reversed(_INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
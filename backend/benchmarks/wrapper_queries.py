@@ -0,0 +1,327 @@
+"""
+Benchmark the queries issued by the DB wrappers.
+
+Seeds the configured database with benchmark pipelines, applications and
+evaluations, then records the query plan and timings of every filter and sort
+path used by the wrappers:
+
+    python -m benchmarks.wrapper_queries --seed --rows 1000000 \
+        --output wrapper_queries.json
+
+Run it before and after `alembic upgrade head` to compare plans. Benchmark
+rows are tagged by name and removed with `--cleanup`. Never point this at a
+production database.
+"""
+
+import argparse
+import json
+import statistics
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from orchestrator.clients.db.session_manager import (
+    get_session_manager,
+    shutdown_session_manager,
+)
+from orchestrator.utils.logging import logger
+
+_BENCHMARK_PREFIX = "benchmark-"
+_DEFAULT_ROWS = 1_000_000
+_DEFAULT_PIPELINES = 20
+_DEFAULT_REPEAT = 5
+_DEFAULT_LIMIT = 100
+
+# Mirrors the first page of the statements built by the wrappers. The list
+# endpoints page with keyset cursors, newest first; later pages only add a
+# `(created_at, id) < cursor` condition, served by the same indexes.
+_QUERIES: Dict[str, str] = {
+    # EvaluationsDBWrapper.get_evaluations_by_values
+    "evaluations_latest": """
+        SELECT * FROM application_evaluations
+        ORDER BY created_at DESC, id DESC
+        LIMIT :limit
+    """,
+    "evaluations_by_pipeline": """
+        SELECT * FROM application_evaluations
+        WHERE pipeline_id = :pipeline_id
+        ORDER BY created_at DESC, id DESC
+        LIMIT :limit
+    """,
+    "evaluations_by_status": """
+        SELECT * FROM application_evaluations
+        WHERE status IN ('EVALUATING_ERROR')
+        ORDER BY created_at DESC, id DESC
+        LIMIT :limit
+    """,
+    "evaluations_by_pipeline_and_status": """
+        SELECT * FROM application_evaluations
+        WHERE pipeline_id = :pipeline_id AND status IN ('EVALUATING_ERROR')
+        ORDER BY created_at DESC, id DESC
+        LIMIT :limit
+    """,
+    "evaluations_by_application_key": """
+        SELECT application_evaluations.* FROM application_evaluations
+        JOIN applications
+            ON application_evaluations.application_id = applications.id
+        WHERE applications.key = :application_key
+        ORDER BY
+            application_evaluations.created_at DESC,
+            application_evaluations.id DESC
+        LIMIT :limit
+    """,
+    # ApplicationsDBWrapper.get_applications_by_value
+    "applications_by_status": """
+        SELECT * FROM applications
+        WHERE status IN ('REVIEWING_ERROR')
+        ORDER BY created_at DESC, id DESC
+        LIMIT :limit
+    """,
+    # PipelinesDBWrapper.get_pipelines_by_status
+    "pipelines_by_status": """
+        SELECT * FROM pipelines
+        WHERE status IN ('DISABLED')
+        ORDER BY created_at DESC, id DESC
+        LIMIT :limit
+    """,
+}
+
+_SEED_STATEMENTS = [
+    """
+    INSERT INTO pipeline_versions (id, version_number, steps)
+    SELECT gen_random_uuid(), 1, '{}'::jsonb
+    FROM generate_series(1, :pipelines)
+    """,
+    """
+    INSERT INTO pipelines (id, name, status, current_version_id)
+    SELECT
+        gen_random_uuid(),
+        :prefix || row_number() OVER (),
+        CASE WHEN random() < 0.2
+            THEN 'DISABLED' ELSE 'ACTIVE' END::pipelinestatus,
+        versions.id
+    FROM (
+        SELECT id FROM pipeline_versions
+        WHERE id NOT IN (
+            SELECT current_version_id FROM pipelines
+            WHERE current_version_id IS NOT NULL
+        )
+        ORDER BY created_at DESC
+        LIMIT :pipelines
+    ) AS versions
+    """,
+    """
+    INSERT INTO applications (
+        id, applicant_name, status, amount, monthly_income, declared_debts,
+        country, loan_purpose, created_at, updated_at
+    )
+    SELECT
+        gen_random_uuid(),
+        :prefix || i,
+        CASE WHEN random() < 0.02
+            THEN 'REVIEWING_ERROR' ELSE 'REVIEWED' END::applicationstatus,
+        10000, 5000, 1000, 'France', 'Benchmark loan purpose',
+        now() - make_interval(secs => i),
+        now() - make_interval(secs => i)
+    FROM generate_series(1, :rows) AS i
+    """,
+    """
+    INSERT INTO application_evaluations (
+        id, application_id, pipeline_id, status, result, created_at, updated_at
+    )
+    SELECT
+        gen_random_uuid(),
+        applications.id,
+        pipelines.ids[1 + floor(random() * array_length(pipelines.ids, 1))::int],
+        CASE WHEN random() < 0.02
+            THEN 'EVALUATING_ERROR' ELSE 'EVALUATED'
+        END::applicationevaluationstatus,
+        'APPROVED'::loanapplicationresult,
+        applications.created_at,
+        applications.created_at
+    FROM applications, (
+        SELECT array_agg(id) AS ids FROM pipelines WHERE name LIKE :prefix || '%'
+    ) AS pipelines
+    WHERE applications.applicant_name LIKE :prefix || '%'
+    """,
+]
+
+_CLEANUP_STATEMENTS = [
+    """
+    DELETE FROM application_evaluations
+    WHERE application_id IN (
+        SELECT id FROM applications WHERE applicant_name LIKE :prefix || '%'
+    )
+    """,
+    "DELETE FROM applications WHERE applicant_name LIKE :prefix || '%'",
+    """
+    WITH deleted AS (
+        DELETE FROM pipelines WHERE name LIKE :prefix || '%'
+        RETURNING current_version_id
+    )
+    DELETE FROM pipeline_versions WHERE id IN (SELECT * FROM deleted)
+    """,
+]
+
+
+def _seed(session: Session, rows: int, pipelines: int) -> None:
+    logger.info(f"Seeding {pipelines} pipelines and {rows} evaluations")
+    params = {"prefix": _BENCHMARK_PREFIX, "rows": rows, "pipelines": pipelines}
+    for statement in _SEED_STATEMENTS:
+        session.execute(text(statement), params)
+    session.commit()
+
+    _analyze(session)
+
+
+def _cleanup(session: Session) -> None:
+    logger.info("Removing benchmark rows")
+    for statement in _CLEANUP_STATEMENTS:
+        session.execute(text(statement), {"prefix": _BENCHMARK_PREFIX})
+    session.commit()
+
+
+def _analyze(session: Session) -> None:
+    # Fresh statistics, so the planner sees the seeded distribution
+    for table in ("pipelines", "applications", "application_evaluations"):
+        session.execute(text(f"ANALYZE {table}"))
+    session.commit()
+
+
+def _query_params(session: Session, limit: int) -> dict:
+    pipeline_id = session.scalar(
+        text("SELECT id FROM pipelines WHERE name LIKE :prefix || '%' LIMIT 1"),
+        {"prefix": _BENCHMARK_PREFIX},
+    )
+    application_key = session.scalar(
+        text(
+            "SELECT key FROM applications WHERE applicant_name LIKE :prefix || '%' "
+            "ORDER BY created_at LIMIT 1"
+        ),
+        {"prefix": _BENCHMARK_PREFIX},
+    )
+    if pipeline_id is None or application_key is None:
+        raise RuntimeError("No benchmark rows found, run with --seed first")
+
+    return {
+        "pipeline_id": str(pipeline_id),
+        "application_key": application_key,
+        "limit": limit,
+    }
+
+
+def _scan_types(plan: dict) -> List[str]:
+    """List the node types of a JSON query plan, depth first."""
+    node_types = [plan["Node Type"]]
+    for child in plan.get("Plans", []):
+        node_types.extend(_scan_types(child))
+    return node_types
+
+
+def _benchmark_query(session: Session, sql: str, params: dict, repeat: int) -> dict:
+    statement = text(sql)
+
+    timings_ms = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        session.execute(statement, params).all()
+        timings_ms.append((time.perf_counter() - start) * 1000)
+
+    explained = session.scalar(
+        text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), params
+    )
+    session.rollback()
+    if isinstance(explained, str):
+        explained = json.loads(explained)
+    plan = explained[0]
+
+    return {
+        "min_ms": round(min(timings_ms), 3),
+        "median_ms": round(statistics.median(timings_ms), 3),
+        "max_ms": round(max(timings_ms), 3),
+        "planning_ms": plan["Planning Time"],
+        "execution_ms": plan["Execution Time"],
+        "node_types": _scan_types(plan["Plan"]),
+        "plan": plan,
+    }
+
+
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Record query plans and timings of the DB wrapper queries."
+    )
+    parser.add_argument(
+        "--seed",
+        action="store_true",
+        help="Insert benchmark rows before running the queries",
+    )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        default=_DEFAULT_ROWS,
+        help="Number of applications and evaluations to seed",
+    )
+    parser.add_argument(
+        "--pipelines",
+        type=int,
+        default=_DEFAULT_PIPELINES,
+        help="Number of pipelines to seed",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=_DEFAULT_REPEAT,
+        help="Number of timed runs of every query",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=_DEFAULT_LIMIT,
+        help="Number of rows fetched by every query",
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="Path of the JSON report, including the full query plans",
+    )
+    parser.add_argument(
+        "--cleanup",
+        action="store_true",
+        help="Remove the benchmark rows once done",
+    )
+
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = _parse_args(argv)
+    session = get_session_manager().session
+
+    try:
+        if args.seed:
+            _seed(session, rows=args.rows, pipelines=args.pipelines)
+
+        params = _query_params(session, limit=args.limit)
+        report = {}
+        for name, sql in _QUERIES.items():
+            report[name] = _benchmark_query(session, sql, params, args.repeat)
+            print(
+                f"{name:<40} median {report[name]['median_ms']:>10.3f} ms   "
+                f"{' > '.join(report[name]['node_types'])}"
+            )
+
+        if args.output:
+            with open(args.output, "w") as output:
+                json.dump(report, output, indent=2)
+            logger.info(f"Wrote benchmark report to {args.output}")
+
+        if args.cleanup:
+            _cleanup(session)
+    finally:
+        shutdown_session_manager()
+
+
+if __name__ == "__main__":
+    main()
@@ -13,5 +13,8 @@ poetry run python generate_config.py
 echo "[entrypoint] Running database migrations..."
 poetry run alembic upgrade head
 
+echo "[entrypoint] Creating upcoming evaluation partitions..."
+poetry run python -m orchestrator.partitions create
+
 echo "[entrypoint] Starting gunicorn on port ${PORT}..."
 exec poetry run gunicorn --bind 0.0.0.0:$PORT --workers 4 orchestrator.app.wsgi:application
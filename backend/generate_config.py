@@ -13,6 +13,11 @@ database_config = {
     "database": os.getenv("POSTGRES_DB", "loan_orchestrator"),
     "host": os.getenv("POSTGRES_HOST", "localhost"),
     "port": int(os.getenv("POSTGRES_PORT", "5432")),
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() in ("true", "1", "yes"),
 }
 
 # Add query_params if SSL mode is specified
@@ -31,6 +36,10 @@ config = {
         "port": int(os.getenv("FLASK_PORT", "5001")),
         "version": os.getenv("FLASK_VERSION", "v1"),
     },
+    "evaluator": {
+        "embedded": os.getenv("EVALUATOR_EMBEDDED", "true").lower() in ("true", "1", "yes"),
+        "workers": int(os.getenv("EVALUATOR_WORKERS", "8")),
+    },
 }
 
 # Write config.yaml to /app/config.yaml
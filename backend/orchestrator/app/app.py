@@ -9,6 +9,8 @@ from flask_cors import CORS
 
 from orchestrator.app.config import Config
 from orchestrator.app.routes import register_routes
+from orchestrator.clients.db.session_manager import teardown
+from orchestrator.utils.async_evaluator import async_evaluator
 
 
 class OrchestratorApp(Flask):
@@ -47,6 +49,13 @@ def create_app(config_path: str | None = None) -> Flask:
     # Register routes
     register_routes(app)
 
+    # Every request's session hands its connection back to the shared pool
+    app.teardown_appcontext(teardown)
+
+    if app.config["EVALUATOR_EMBEDDED"]:
+        async_evaluator.configure(num_workers=app.config["EVALUATOR_WORKERS"])
+        async_evaluator.start()
+
     return app
 
 
@@ -59,6 +59,12 @@ class Config:
         self.PORT = flask_config.get("port", 5000)
         self.VERSION = flask_config.get("version", "v1")
 
+        # Evaluator configuration
+        evaluator_config = config_data.get("evaluator", {})
+        # When disabled, evaluations are only run by `python -m orchestrator.worker`
+        self.EVALUATOR_EMBEDDED = evaluator_config.get("embedded", True)
+        self.EVALUATOR_WORKERS = evaluator_config.get("workers", 8)
+
         # SQLAlchemy database URI
         self.SQLALCHEMY_DATABASE_URI = (
             f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
@@ -81,4 +87,6 @@ class Config:
             "SQLALCHEMY_DATABASE_URI": self.SQLALCHEMY_DATABASE_URI,
             "SQLALCHEMY_TRACK_MODIFICATIONS": (self.SQLALCHEMY_TRACK_MODIFICATIONS),
             "VERSION": self.VERSION,
+            "EVALUATOR_EMBEDDED": self.EVALUATOR_EMBEDDED,
+            "EVALUATOR_WORKERS": self.EVALUATOR_WORKERS,
         }
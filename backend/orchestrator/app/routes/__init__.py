@@ -4,15 +4,21 @@ from .application import (
     create_application,
     get_application_by_key,
     get_loan_applications,
+    ingest_applications,
 )
 from .evaluation import (
     evaluate_application,
+    evaluate_applications_batch,
     get_evaluation_by_id,
+    get_evaluation_queue_lag,
     get_evaluation_stats,
+    get_evaluation_stats_timeseries,
     get_evaluations_by_params,
+    get_evaluator_metrics,
 )
-from .health import health_check
+from .health import get_db_pool_metrics, health_check
 from .pipeline import (
+    backtest_pipeline,
     create_pipeline,
     get_pipeline_by_id,
     get_pipelines,
@@ -24,10 +30,14 @@ from .pipeline import (
 def register_routes(app: Flask) -> None:
     # App health
     app.add_url_rule("/health", "health_check", health_check, methods=["GET"])
+    app.add_url_rule("/health/db", view_func=get_db_pool_metrics, methods=["GET"])
 
     # Loan-application routes
     app.add_url_rule("/application", view_func=create_application, methods=["POST"])
     app.add_url_rule("/application", view_func=get_loan_applications, methods=["GET"])
+    app.add_url_rule(
+        "/application/bulk", view_func=ingest_applications, methods=["POST"]
+    )
     app.add_url_rule(
         "/application/<string:application_key>",
         view_func=get_application_by_key,
@@ -50,9 +60,17 @@ def register_routes(app: Flask) -> None:
         view_func=validate_pipeline_steps,
         methods=["POST"],
     )
+    app.add_url_rule(
+        "/pipeline/<string:pipeline_id>/backtest",
+        view_func=backtest_pipeline,
+        methods=["POST"],
+    )
 
     # Evaluation routes
     app.add_url_rule("/evaluate", view_func=evaluate_application, methods=["POST"])
+    app.add_url_rule(
+        "/evaluate/batch", view_func=evaluate_applications_batch, methods=["POST"]
+    )
     app.add_url_rule(
         "/evaluation/<string:evaluation_id>",
         view_func=get_evaluation_by_id,
@@ -68,3 +86,18 @@ def register_routes(app: Flask) -> None:
         view_func=get_evaluation_stats,
         methods=["GET"],
     )
+    app.add_url_rule(
+        "/evaluations/stats/timeseries",
+        view_func=get_evaluation_stats_timeseries,
+        methods=["GET"],
+    )
+    app.add_url_rule(
+        "/evaluations/queue",
+        view_func=get_evaluator_metrics,
+        methods=["GET"],
+    )
+    app.add_url_rule(
+        "/evaluations/queue/lag",
+        view_func=get_evaluation_queue_lag,
+        methods=["GET"],
+    )
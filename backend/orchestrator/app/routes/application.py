@@ -1,15 +1,22 @@
+import io
 import json
-from typing import Optional
+from typing import Iterator, List, Optional, Tuple
 
-from flask import Response, jsonify, request
+from flask import Response, jsonify, request, stream_with_context
 
 from orchestrator.clients.db.schema import Application as ApplicationDAO
 from orchestrator.clients.db.wrappers.application import ApplicationsDBWrapper
 from orchestrator.resources.application import Application as ApplicationDTO
 from orchestrator.resources.types import Country
 from orchestrator.utils.logging import log_execution_time, logger
+from orchestrator.utils.pagination import parse_page_args
+from orchestrator.utils.parsing import ParsingError, parse_application_row
 from orchestrator.utils.wrappers import run_route_safely
 
+# Applications ingested in bulk are inserted this many at a time
+_BULK_INGEST_CHUNK_SIZE = 1000
+_BULK_INGEST_READ_BUFFER_SIZE = 64 * 1024
+
 
 @run_route_safely(message="Error creating application", unwrap_body=True)
 @log_execution_time(description="Creating a new loan application")
@@ -30,15 +37,120 @@ def create_application() -> Response:
     return jsonify(application.to_dict())
 
 
+def _insert_application_chunk(
+    wrapper: ApplicationsDBWrapper, chunk: List[Tuple[int, dict]]
+) -> Iterator[dict]:
+    try:
+        created = wrapper.create_applications_in_bulk(
+            [application for _, application in chunk]
+        )
+    except Exception as err:
+        # Isolate the rows the database refuses, so the rest still get in
+        logger.warning(f"Bulk insert of {len(chunk)} applications failed: {err}")
+        for line_number, application in chunk:
+            try:
+                [(app_id, key)] = wrapper.create_applications_in_bulk([application])
+            except Exception as row_err:
+                yield {"line": line_number, "error": str(row_err)}
+            else:
+                yield {"line": line_number, "id": app_id, "key": key}
+        return
+
+    for (line_number, _), (app_id, key) in zip(chunk, created):
+        yield {"line": line_number, "id": app_id, "key": key}
+
+
+@run_route_safely(message="Error ingesting applications", unwrap_body=True)
+@log_execution_time(description="Ingesting loan applications in bulk")
+def ingest_applications() -> Response:
+    """
+    Create applications from an NDJSON body, one application per line.
+
+    The body is read and inserted chunk by chunk while the response is being
+    streamed back. The response is NDJSON as well: one line per application
+    with either its ID and key or the reason it was refused, then a summary.
+    When ingesting fails midway, the last line holds the error along with the
+    summary of what was ingested until then.
+    """
+    wrapper = ApplicationsDBWrapper()
+
+    def generate() -> Iterator[str]:
+        created = 0
+        failed = 0
+        chunk = []
+
+        def process(results: Iterator[dict]) -> Iterator[str]:
+            nonlocal created, failed
+            for result in results:
+                if "error" in result:
+                    failed += 1
+                else:
+                    created += 1
+                yield json.dumps(result) + "\n"
+
+        try:
+            # The raw request stream reads lines a few bytes at a time
+            body = io.BufferedReader(
+                request.stream, buffer_size=_BULK_INGEST_READ_BUFFER_SIZE
+            )
+            for line_number, raw_line in enumerate(body, start=1):
+                if not raw_line.strip():
+                    continue
+
+                try:
+                    application = parse_application_row(json.loads(raw_line))
+                except (ValueError, ParsingError) as err:
+                    yield from process(iter([{"line": line_number, "error": str(err)}]))
+                    continue
+
+                chunk.append((line_number, application))
+                if len(chunk) >= _BULK_INGEST_CHUNK_SIZE:
+                    yield from process(_insert_application_chunk(wrapper, chunk))
+                    chunk = []
+
+            if chunk:
+                yield from process(_insert_application_chunk(wrapper, chunk))
+        except Exception as err:
+            # The response is already under way, so the error can only be
+            # reported in it. Chunks yielded before were committed.
+            logger.error(
+                f"Error ingesting applications, after creating {created}: {err}"
+            )
+            try:
+                wrapper.session_manager.session.rollback()
+            except Exception as rollback_err:
+                logger.error(f"Failed to roll back the ingest: {rollback_err}")
+            yield json.dumps(
+                {
+                    "error": f"Error ingesting applications: {err}",
+                    "summary": {"created": created, "failed": failed},
+                }
+            ) + "\n"
+            return
+
+        logger.info(f"Ingested {created} applications, refused {failed}")
+        yield json.dumps({"summary": {"created": created, "failed": failed}}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
 @run_route_safely(message="Error fetching loan applications", unwrap_body=False)
 @log_execution_time(description="Fetching loan applications")
 def get_loan_applications() -> Response:
     status_in = request.args.getlist("statusIn")
     status_not_in = request.args.getlist("statusNotIn")
+    try:
+        limit, cursor = parse_page_args(request.args)
+    except ValueError as err:
+        return Response(
+            response=json.dumps({"error": str(err)}),
+            status=400,
+            mimetype="application/json",
+        )
 
     wrapper = ApplicationsDBWrapper()
 
-    application_daos = wrapper.get_applications_by_value(
+    applications_page = wrapper.get_applications_by_value(
         status_in=(
             [status for status in map(lambda s: s.upper(), status_in)]
             if status_in
@@ -49,15 +161,19 @@ def get_loan_applications() -> Response:
             if status_not_in
             else None
         ),
+        limit=limit,
+        cursor=cursor,
     )
-    applications = [ApplicationDTO.from_dao(app_dao) for app_dao in application_daos]
+    applications = [
+        ApplicationDTO.from_dao(app_dao) for app_dao in applications_page.items
+    ]
 
-    return jsonify([app.to_dict() for app in applications])
+    return jsonify(applications_page.to_dict([app.to_dict() for app in applications]))
 
 
 def get_application_dao_by_key(application_key: str) -> Optional[ApplicationDAO]:
     wrapper = ApplicationsDBWrapper()
-    application_daos = wrapper.get_applications_by_value(key=application_key)
+    application_daos = wrapper.get_applications_by_value(key=application_key).items
 
     if not application_daos:
         return None
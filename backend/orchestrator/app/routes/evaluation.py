@@ -1,24 +1,101 @@
+import json
+import math
+from datetime import datetime
+from typing import List, Optional
+
 from flask import Response, jsonify, request
 
 from orchestrator.app.routes.application import get_application_dao_by_key
 from orchestrator.app.routes.pipeline import get_pipeline_dao_by_id
 from orchestrator.clients.db.wrappers.application import ApplicationsDBWrapper
-from orchestrator.clients.db.wrappers.evaluation import EvaluationsDBWrapper
+from orchestrator.clients.db.wrappers.evaluation import (
+    EvaluationsDBWrapper,
+    StepOutcomeFilter,
+)
+from orchestrator.clients.db.wrappers.evaluation_stats import (
+    TIMESERIES_INTERVALS,
+    EvaluationStatsDBWrapper,
+)
 from orchestrator.resources.evaluation import Evaluation as EvaluationDTO
+from orchestrator.resources.evaluation import EvaluationSummary
 from orchestrator.resources.types import (
-    ApplicationEvaluationStatus,
     ApplicationStatus,
-    EvaluationResult,
     PipelineStatus,
+    PipelineStepEvaluationResult,
 )
+from orchestrator.utils.admission import admission_controller
 from orchestrator.utils.async_evaluator import async_evaluator
 from orchestrator.utils.logging import log_execution_time, logger
+from orchestrator.utils.pagination import parse_page_args
 from orchestrator.utils.wrappers import run_route_safely
 
+# Maximum number of evaluations created by a single batch request
+_MAX_BATCH_EVALUATION_SIZE = 50000
+
+# Share of the evaluation queue batch requests can fill, the rest is kept for
+# single evaluations. Batches are also capped to fit in it.
+_BATCH_QUEUE_SHARE = 0.5
+
+# Evaluations are listed as summaries unless their full details are requested
+_SUMMARY_VIEW = "summary"
+_FULL_VIEW = "full"
+
+
+def _parse_datetime_arg(name: str) -> Optional[datetime]:
+    """Parse an optional ISO 8601 query parameter, raising ValueError if invalid."""
+    value = request.args.get(name)
+    if value is None:
+        return None
+
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO 8601 date or datetime")
+
+
+def _parse_step_outcome_args() -> List[StepOutcomeFilter]:
+    """
+    Parse the `stepOutcome` query parameters, each a step type or flow node ID,
+    optionally followed by `:PASS` or `:FAIL`. Raises ValueError if invalid.
+    """
+    step_outcomes = []
+    for value in request.args.getlist("stepOutcome"):
+        step, _, step_result = value.partition(":")
+        if not step:
+            raise ValueError("stepOutcome must name a step type or flow node ID")
+        if (
+            step_result
+            and step_result.upper() not in PipelineStepEvaluationResult.__members__
+        ):
+            raise ValueError("stepOutcome result must be one of PASS, FAIL")
+
+        step_outcomes.append(
+            (
+                step,
+                (
+                    PipelineStepEvaluationResult(step_result.upper())
+                    if step_result
+                    else None
+                ),
+            )
+        )
+
+    return step_outcomes
+
 
 @run_route_safely(message="Error evaluating application", unwrap_body=True)
 @log_execution_time(description="Creating loan application evaluation")
 def evaluate_application() -> Response:
+    admission = admission_controller.check()
+    if not admission.admitted:
+        logger.warning(f"Refusing evaluation request: {admission.reason}")
+        return Response(
+            response=json.dumps({"error": admission.reason}),
+            status=admission.status_code,
+            headers={"Retry-After": str(admission.retry_after)},
+            mimetype="application/json",
+        )
+
     evaluation_request = request.get_json(force=True)
 
     application_key = evaluation_request["applicationKey"]
@@ -57,6 +134,22 @@ def evaluate_application() -> Response:
         )
 
     db_wrapper = EvaluationsDBWrapper()
+    applications_db_wrapper = ApplicationsDBWrapper()
+
+    # The application is moved to IN_REVIEW before the evaluation exists, as any
+    # evaluator worker may claim and finish the evaluation as soon as it does.
+    previous_application_status = application_dao.status
+    try:
+        applications_db_wrapper.update_application_status(
+            application=application_dao,
+            new_status=ApplicationStatus.IN_REVIEW,
+        )
+    except Exception as err:
+        logger.error(
+            f"Failed to update status for application {application_dao.id} "
+            f"to IN_REVIEW: {err}"
+        )
+        pass
 
     evaluation_dao = None
 
@@ -73,8 +166,12 @@ def evaluate_application() -> Response:
             f"and pipeline {pipeline_dao.id}: {err}"
         )
 
-        if application_dao:
+        if evaluation_dao:
             db_wrapper.delete_evaluation(evaluation_dao)
+        applications_db_wrapper.update_application_status(
+            application=application_dao,
+            new_status=previous_application_status,
+        )
 
         return Response(
             response='{"error": "Failed to create evaluation"}',
@@ -82,19 +179,123 @@ def evaluate_application() -> Response:
             mimetype="application/json",
         )
 
-    try:
-        ApplicationsDBWrapper().update_application_status(
-            application=application_dao,
-            new_status=ApplicationStatus.IN_REVIEW,
+    return jsonify(evaluation_dto.to_dict())
+
+
+@run_route_safely(message="Error evaluating applications", unwrap_body=True)
+@log_execution_time(description="Creating loan application evaluations in bulk")
+def evaluate_applications_batch() -> Response:
+    evaluation_request = request.get_json(force=True)
+
+    pipeline_id = evaluation_request["pipelineId"]
+    application_keys = evaluation_request.get("applicationKeys")
+    application_status = evaluation_request.get("applicationStatus")
+
+    max_batch_size = min(
+        _MAX_BATCH_EVALUATION_SIZE,
+        math.floor(admission_controller.max_queue_depth * _BATCH_QUEUE_SHARE),
+    )
+    if (application_keys is None) == (application_status is None):
+        return Response(
+            response='{"error": "Exactly one of applicationKeys and '
+            'applicationStatus must be provided"}',
+            status=400,
+            mimetype="application/json",
         )
-    except Exception as err:
-        logger.error(
-            f"Failed to update status for application {application_dao.id} "
-            f"to IN_REVIEW: {err}"
+    if application_keys is not None and (
+        not isinstance(application_keys, list)
+        or len(application_keys) > max_batch_size
+        or not all(isinstance(key, str) and key for key in application_keys)
+    ):
+        return Response(
+            response=json.dumps(
+                {
+                    "error": f"applicationKeys must be a list of at most "
+                    f"{max_batch_size} non-empty keys"
+                }
+            ),
+            status=400,
+            mimetype="application/json",
         )
-        pass
+    if application_status is not None:
+        try:
+            application_status = ApplicationStatus(application_status)
+        except ValueError:
+            return Response(
+                response='{"error": "Invalid applicationStatus"}',
+                status=400,
+                mimetype="application/json",
+            )
 
-    return jsonify(evaluation_dto.to_dict())
+    # Every key counts against the queue, and batches only get a share of it
+    admission = admission_controller.check(
+        incoming=len(set(application_keys)) if application_keys is not None else 1,
+        queue_share=_BATCH_QUEUE_SHARE,
+    )
+    if not admission.admitted:
+        logger.warning(f"Refusing batch evaluation request: {admission.reason}")
+        return Response(
+            response=json.dumps({"error": admission.reason}),
+            status=admission.status_code,
+            headers={"Retry-After": str(admission.retry_after)},
+            mimetype="application/json",
+        )
+
+    # Applications matched by status are only evaluated up to the room left
+    limit = max_batch_size
+    if application_status is not None and admission.capacity is not None:
+        limit = min(limit, admission.capacity)
+
+    pipeline_dao = get_pipeline_dao_by_id(pipeline_id)
+    if pipeline_dao is None:
+        logger.error(f"Pipeline with ID {pipeline_id} not found")
+        return Response(
+            response='{"error": "Pipeline not found"}',
+            status=400,
+            mimetype="application/json",
+        )
+    elif pipeline_dao.status != PipelineStatus.ACTIVE:
+        logger.error(f"Pipeline with ID {pipeline_id} is not active")
+        return Response(
+            response='{"error": "Selected pipeline is not active"}',
+            status=400,
+            mimetype="application/json",
+        )
+
+    created = EvaluationsDBWrapper().create_evaluations_in_bulk(
+        pipeline_id=str(pipeline_dao.id),
+        application_keys=application_keys,
+        application_status=application_status,
+        limit=limit,
+    )
+    if created:
+        async_evaluator.wake_up()
+
+    response = {
+        "pipelineId": str(pipeline_dao.id),
+        "evaluations": [
+            {"evaluationId": evaluation_id, "applicationKey": application_key}
+            for evaluation_id, application_key in created
+        ],
+    }
+
+    if application_keys is not None:
+        # Keys not evaluated either do not exist or belong to applications
+        # that are already in review
+        created_keys = {application_key for _, application_key in created}
+        remaining_keys = set(application_keys) - created_keys
+        existing_keys = set()
+        if remaining_keys:
+            existing_keys = {
+                application.key
+                for application in ApplicationsDBWrapper().get_applications_by_keys(
+                    list(remaining_keys)
+                )
+            }
+        response["skipped"] = sorted(existing_keys)
+        response["notFound"] = sorted(remaining_keys - existing_keys)
+
+    return jsonify(response)
 
 
 @run_route_safely(message="Error getting evaluation by ID", unwrap_body=False)
@@ -122,46 +323,77 @@ def get_evaluations_by_params() -> Response:
     pipeline_id = request.args.get("pipelineId")
     status_in = request.args.getlist("statusIn")
     status_not_in = request.args.getlist("statusNotIn")
+    view = request.args.get("view", _SUMMARY_VIEW)
+    try:
+        limit, cursor = parse_page_args(request.args)
+        step_outcomes = _parse_step_outcome_args()
+    except ValueError as err:
+        return Response(
+            response=json.dumps({"error": str(err)}),
+            status=400,
+            mimetype="application/json",
+        )
+    if view not in (_SUMMARY_VIEW, _FULL_VIEW):
+        return Response(
+            response=json.dumps(
+                {"error": f"view must be one of {_SUMMARY_VIEW}, {_FULL_VIEW}"}
+            ),
+            status=400,
+            mimetype="application/json",
+        )
 
     db_wrapper = EvaluationsDBWrapper()
-    evaluations_dao = db_wrapper.get_evaluations_by_values(
-        application_key=application_key,
-        pipeline_id=pipeline_id,
-        status_in=status_in,
-        status_not_in=status_not_in,
-    )
+    filters = {
+        "application_key": application_key,
+        "pipeline_id": pipeline_id,
+        "status_in": status_in,
+        "status_not_in": status_not_in,
+        "step_outcomes": step_outcomes,
+        "limit": limit,
+        "cursor": cursor,
+    }
+
+    if view == _SUMMARY_VIEW:
+        summaries_page = db_wrapper.get_evaluation_summaries_by_values(**filters)
+        summaries = [EvaluationSummary.from_row(row) for row in summaries_page.items]
+
+        return jsonify(
+            summaries_page.to_dict([summary.to_dict() for summary in summaries])
+        )
+
+    evaluations_page = db_wrapper.get_evaluations_by_values(**filters)
 
     evaluations_dto = [
-        EvaluationDTO.from_dao(evaluation_dao) for evaluation_dao in evaluations_dao
+        EvaluationDTO.from_dao(evaluation_dao)
+        for evaluation_dao in evaluations_page.items
     ]
     evaluations_dict = [evaluation_dto.to_dict() for evaluation_dto in evaluations_dto]
 
-    return jsonify(evaluations_dict)
+    return jsonify(evaluations_page.to_dict(evaluations_dict))
 
 
 @run_route_safely(message="Error retrieving evaluation statistics", unwrap_body=False)
 @log_execution_time(description="Retrieving evaluation statistics")
 def get_evaluation_stats() -> Response:
-    db_wrapper = EvaluationsDBWrapper()
-    evaluations = db_wrapper.get_evaluations_by_values()
-
-    count_by_status = {
-        status.value: len([e for e in evaluations if e.status == status])
-        for status in ApplicationEvaluationStatus
-    }
-
-    count_by_result = {
-        result.value: len([e for e in evaluations if e.result == result])
-        for result in EvaluationResult
-    }
-
-    all_durations = [
-        e.details["run_duration"]
-        for e in evaluations
-        if e.details and "run_duration" in e.details
-    ]
+    pipeline_id = request.args.get("pipelineId")
+    try:
+        created_after = _parse_datetime_arg("createdAfter")
+        created_before = _parse_datetime_arg("createdBefore")
+    except ValueError as err:
+        return Response(
+            response=json.dumps({"error": str(err)}),
+            status=400,
+            mimetype="application/json",
+        )
 
-    average_duration = sum(all_durations) / len(all_durations) if all_durations else 0.0
+    db_wrapper = EvaluationsDBWrapper()
+    count_by_status, count_by_result, average_duration = (
+        db_wrapper.get_evaluation_stats(
+            pipeline_id=pipeline_id,
+            created_after=created_after,
+            created_before=created_before,
+        )
+    )
 
     return jsonify(
         {
@@ -170,3 +402,49 @@ def get_evaluation_stats() -> Response:
             "averageDuration": average_duration,
         }
     )
+
+
+@run_route_safely(
+    message="Error retrieving evaluation statistics time series", unwrap_body=False
+)
+@log_execution_time(description="Retrieving evaluation statistics time series")
+def get_evaluation_stats_timeseries() -> Response:
+    pipeline_id = request.args.get("pipelineId")
+    interval = request.args.get("interval", "day")
+    try:
+        finished_after = _parse_datetime_arg("finishedAfter")
+        finished_before = _parse_datetime_arg("finishedBefore")
+    except ValueError as err:
+        return Response(
+            response=json.dumps({"error": str(err)}),
+            status=400,
+            mimetype="application/json",
+        )
+
+    if interval not in TIMESERIES_INTERVALS:
+        return Response(
+            response=json.dumps(
+                {"error": f"interval must be one of {', '.join(TIMESERIES_INTERVALS)}"}
+            ),
+            status=400,
+            mimetype="application/json",
+        )
+
+    timeseries = EvaluationStatsDBWrapper().get_timeseries(
+        interval=interval,
+        pipeline_id=pipeline_id,
+        finished_after=finished_after,
+        finished_before=finished_before,
+    )
+
+    return jsonify({"interval": interval, "periods": timeseries})
+
+
+@run_route_safely(message="Error retrieving evaluator metrics", unwrap_body=False)
+def get_evaluator_metrics() -> Response:
+    return jsonify(async_evaluator.metrics())
+
+
+@run_route_safely(message="Error retrieving evaluation queue lag", unwrap_body=False)
+def get_evaluation_queue_lag() -> Response:
+    return jsonify(admission_controller.queue_status().to_dict())
@@ -1,5 +1,7 @@
 from flask import Response, jsonify
 
+from orchestrator.clients.db.session_manager import pool_metrics
+
 
 def health_check() -> Response:
     """Health check endpoint."""
@@ -8,3 +10,8 @@ def health_check() -> Response:
         status=200,
         mimetype="application/json",
     )
+
+
+def get_db_pool_metrics() -> Response:
+    """Connection pool metrics of the process serving the request."""
+    return jsonify(pool_metrics())
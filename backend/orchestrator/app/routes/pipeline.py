@@ -1,15 +1,28 @@
+import json
 from typing import Optional
 
 from flask import Response, jsonify, request
 
 from orchestrator.clients.db.schema import Pipeline as PipelineDAO
+from orchestrator.clients.db.wrappers.application import ApplicationsDBWrapper
 from orchestrator.clients.db.wrappers.pipeline import PipelinesDBWrapper
+from orchestrator.resources.application import Application
+from orchestrator.resources.pipeline.batch import BatchEvaluationError
 from orchestrator.resources.pipeline.pipeline import Pipeline
-from orchestrator.resources.types import PipelineStatus
+from orchestrator.resources.types import (
+    ApplicationStatus,
+    PipelineStatus,
+    PipelineStepType,
+)
 from orchestrator.utils.logging import log_execution_time, logger
+from orchestrator.utils.pagination import parse_page_args
 from orchestrator.utils.parsing import validate_pipeline_dict
 from orchestrator.utils.wrappers import run_route_safely
 
+# Applications are backtested in batches of this many, up to the maximum
+_BACKTEST_BATCH_SIZE = 5000
+_MAX_BACKTEST_APPLICATIONS = 100000
+
 
 def get_pipeline_dao_by_id(pipeline_id: str) -> Optional[PipelineDAO]:
     try:
@@ -72,10 +85,25 @@ def get_pipeline_by_id(pipeline_id: str) -> Response:
 def get_pipelines() -> Response:
     status_in = request.args.getlist("statusIn")
     status_not_in = request.args.getlist("statusNotIn")
+    step_type = request.args.get("stepType")
+    try:
+        limit, cursor = parse_page_args(request.args)
+        if step_type is not None:
+            if step_type.upper() not in PipelineStepType.__members__:
+                raise ValueError(
+                    "stepType must be one of " + ", ".join(PipelineStepType.__members__)
+                )
+            step_type = PipelineStepType(step_type.upper())
+    except ValueError as err:
+        return Response(
+            response=json.dumps({"error": str(err)}),
+            status=400,
+            mimetype="application/json",
+        )
 
     db_wrapper = PipelinesDBWrapper()
 
-    pipeline_daos = db_wrapper.get_pipelines_by_status(
+    pipelines_page = db_wrapper.get_pipelines_by_status(
         status_in=(
             [status for status in map(lambda s: s.upper(), status_in)]
             if status_in
@@ -86,11 +114,18 @@ def get_pipelines() -> Response:
             if status_not_in
             else None
         ),
+        step_type=step_type,
+        limit=limit,
+        cursor=cursor,
     )
 
-    pipelines = [Pipeline.from_dao(pipeline_dao) for pipeline_dao in pipeline_daos]
+    pipelines = [
+        Pipeline.from_dao(pipeline_dao) for pipeline_dao in pipelines_page.items
+    ]
 
-    return jsonify([pipeline.to_dict() for pipeline in pipelines])
+    return jsonify(
+        pipelines_page.to_dict([pipeline.to_dict() for pipeline in pipelines])
+    )
 
 
 @run_route_safely(message="Error patching pipeline", unwrap_body=True)
@@ -153,3 +188,78 @@ def validate_pipeline_steps() -> Response:
         status=200,
         mimetype="application/json",
     )
+
+
+@run_route_safely(message="Error backtesting pipeline", unwrap_body=True)
+@log_execution_time(description="Backtesting pipeline on stored applications")
+def backtest_pipeline(pipeline_id: str) -> Response:
+    """
+    Run the pipeline's current version on the stored applications, newest
+    first, and summarise the results it would give. Nothing is recorded.
+    """
+    pipeline_dao = get_pipeline_dao_by_id(pipeline_id)
+    if not pipeline_dao:
+        logger.error(f"Pipeline with ID {pipeline_id} not found")
+        return Response(
+            response='{"error": "Pipeline not found"}',
+            status=404,
+            mimetype="application/json",
+        )
+
+    backtest_request = request.get_json(force=True, silent=True) or {}
+    application_status = backtest_request.get("applicationStatus")
+    limit = backtest_request.get("limit", _MAX_BACKTEST_APPLICATIONS)
+
+    if (
+        not isinstance(limit, int)
+        or isinstance(limit, bool)
+        or not 0 < limit <= _MAX_BACKTEST_APPLICATIONS
+    ):
+        return Response(
+            response=json.dumps(
+                {
+                    "error": "limit must be an integer between 1 and "
+                    f"{_MAX_BACKTEST_APPLICATIONS}"
+                }
+            ),
+            status=400,
+            mimetype="application/json",
+        )
+    if application_status is not None:
+        try:
+            application_status = ApplicationStatus(application_status)
+        except ValueError:
+            return Response(
+                response='{"error": "Invalid applicationStatus"}',
+                status=400,
+                mimetype="application/json",
+            )
+
+    def application_batches():
+        db_wrapper = ApplicationsDBWrapper()
+        remaining, cursor = limit, None
+        while remaining > 0:
+            page = db_wrapper.get_applications_by_value(
+                status_in=[application_status] if application_status else None,
+                limit=min(remaining, _BACKTEST_BATCH_SIZE),
+                cursor=cursor,
+            )
+            if page.items:
+                yield [Application.from_dao(dao) for dao in page.items]
+            remaining -= len(page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                return
+
+    pipeline = Pipeline.from_dao(pipeline_dao)
+    try:
+        backtest = pipeline.backtest(application_batches())
+    except BatchEvaluationError as err:
+        logger.error(f"Pipeline with ID {pipeline_id} can't be backtested: {err}")
+        return Response(
+            response=json.dumps({"error": str(err)}),
+            status=400,
+            mimetype="application/json",
+        )
+
+    return jsonify(backtest)
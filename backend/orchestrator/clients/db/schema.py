@@ -1,9 +1,9 @@
 from sqlalchemy import Column
 from sqlalchemy import Enum as SQLAlchemyEnum
-from sqlalchemy import ForeignKey, Sequence, func, text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import ForeignKey, Index, Sequence, func, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Relationship, declarative_base
-from sqlalchemy.types import INTEGER, JSON, NUMERIC, TEXT, DateTime, String
+from sqlalchemy.types import DOUBLE_PRECISION, INTEGER, NUMERIC, TEXT, DateTime, String
 
 from orchestrator.resources.types import (
     ApplicationEvaluationStatus,
@@ -16,6 +16,9 @@ _BASE = declarative_base()
 
 _APPLICATIONS_COUNTER_SEQ = Sequence("application_counter_seq")
 
+# JSON path to the type of every step of a pipeline version's steps tree
+PIPELINE_STEP_TYPES_PATH = "$.**.type"
+
 
 class Application(_BASE):
     __tablename__ = "applications"
@@ -52,6 +55,13 @@ class Application(_BASE):
         onupdate=func.now(),
     )
 
+    __table_args__ = (
+        Index("ix_applications_status_created_at", "status", text("created_at DESC")),
+        Index(
+            "ix_applications_created_at_id", text("created_at DESC"), text("id DESC")
+        ),
+    )
+
 
 class Pipeline(_BASE):
     __tablename__ = "pipelines"
@@ -85,6 +95,8 @@ class Pipeline(_BASE):
     # Relationships
     current_version = Relationship("PipelineVersion", foreign_keys=[current_version_id])
 
+    __table_args__ = (Index("ix_pipelines_status", "status"),)
+
 
 class PipelineVersion(_BASE):
     __tablename__ = "pipeline_versions"
@@ -92,9 +104,9 @@ class PipelineVersion(_BASE):
     id = Column(UUID(as_uuid=True), primary_key=True)
 
     version_number = Column(INTEGER, nullable=False)
-    steps = Column(JSON, nullable=False)
+    steps = Column(JSONB, nullable=False)
 
-    react_flow_nodes = Column(JSON, nullable=True)
+    react_flow_nodes = Column(JSONB, nullable=True)
 
     previous_version_id = Column(
         UUID(as_uuid=True),
@@ -114,8 +126,27 @@ class PipelineVersion(_BASE):
         onupdate=func.now(),
     )
 
+    __table_args__ = (
+        # Finds the versions containing a type of step
+        Index(
+            "ix_pipeline_versions_step_types",
+            text(f"jsonb_path_query_array(steps, '{PIPELINE_STEP_TYPES_PATH}')"),
+            postgresql_using="gin",
+        ),
+    )
+
 
 class ApplicationEvaluation(_BASE):
+    """
+    Partitioned by month of `created_at`. The primary key is (id, created_at),
+    as it must include the partition key, so Postgres can't enforce that IDs
+    alone are unique. They are random UUIDs generated for every new evaluation,
+    and are never reused.
+
+    Evaluations are looked up by their ID and creation time whenever both are
+    known, so only the partition of that month is read.
+    """
+
     __tablename__ = "application_evaluations"
 
     id = Column(UUID(as_uuid=True), primary_key=True)
@@ -135,10 +166,24 @@ class ApplicationEvaluation(_BASE):
         default=ApplicationEvaluationStatus.PENDING,
     )
     result = Column(SQLAlchemyEnum(EvaluationResult), nullable=True, default=None)
-    details = Column(JSON, nullable=True, default=None)
+    details = Column(JSONB, nullable=True, default=None)
+    # Version the evaluation ran with, set once it ran. Its steps are not copied
+    # into the details, which only record the path taken through them.
+    pipeline_version_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("pipeline_versions.id"),
+        nullable=True,
+    )
+
+    # Queue bookkeeping: set when an evaluator worker claims the evaluation.
+    # Claims whose lease has expired can be picked up by another worker.
+    claimed_by = Column(String(255), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(INTEGER, nullable=False, server_default=text("0"))
 
     created_at = Column(
         DateTime(timezone=True),
+        primary_key=True,
         nullable=False,
         server_default=func.now(),
     )
@@ -152,3 +197,86 @@ class ApplicationEvaluation(_BASE):
     # Relationships
     application = Relationship("Application", foreign_keys=[application_id])
     pipeline = Relationship("Pipeline", foreign_keys=[pipeline_id])
+    pipeline_version = Relationship(
+        "PipelineVersion", foreign_keys=[pipeline_version_id]
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_application_evaluations_pipeline_id_created_at",
+            "pipeline_id",
+            text("created_at DESC"),
+        ),
+        Index(
+            "ix_application_evaluations_status_created_at",
+            "status",
+            text("created_at DESC"),
+        ),
+        Index(
+            "ix_application_evaluations_application_id_created_at",
+            "application_id",
+            text("created_at DESC"),
+        ),
+        Index(
+            "ix_application_evaluations_created_at_id",
+            text("created_at DESC"),
+            text("id DESC"),
+        ),
+        Index(
+            "ix_application_evaluations_queue",
+            "status",
+            "created_at",
+            postgresql_where=text("status IN ('PENDING', 'EVALUATING')"),
+        ),
+        Index(
+            "ix_application_evaluations_finished",
+            "updated_at",
+            postgresql_where=text("status IN ('EVALUATED', 'EVALUATING_ERROR')"),
+        ),
+        # Finds evaluations by the outcome of the steps they went through
+        Index(
+            "ix_application_evaluations_trace",
+            text("(details -> 'trace') jsonb_path_ops"),
+            postgresql_using="gin",
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+
+class SentimentClassification(_BASE):
+    __tablename__ = "sentiment_classifications"
+
+    # SHA-256 of the normalised loan purpose text
+    text_hash = Column(String(64), primary_key=True)
+    model = Column(String(100), primary_key=True)
+    prompt_version = Column(INTEGER, primary_key=True)
+
+    result = Column(String(50), nullable=False)
+
+    created_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+
+class EvaluationStatsRollup(_BASE):
+    """Counts of finished evaluations, per pipeline and per hour they finished in."""
+
+    __tablename__ = "evaluation_stats_rollups"
+
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    pipeline_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("pipelines.id"),
+        primary_key=True,
+    )
+    status = Column(SQLAlchemyEnum(ApplicationEvaluationStatus), primary_key=True)
+    # Empty for evaluations without a result, as primary key columns can't be null
+    result = Column(String(50), primary_key=True)
+    # Index of the run duration's histogram bucket, -1 when none was recorded
+    duration_bucket = Column(INTEGER, primary_key=True)
+
+    count = Column(INTEGER, nullable=False)
+    duration_sum = Column(DOUBLE_PRECISION, nullable=False, server_default=text("0"))
@@ -1,179 +1,225 @@
 import threading
-from typing import Dict, Optional
+from collections import deque
+from time import monotonic
+from typing import Optional
 
-from flask import g, has_app_context
 from pyutils.config.providers import YAMLConfigProvider
-from pyutils.database.sqlalchemy.db_factory import SessionManager
+from sqlalchemy import URL, create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
 
 from orchestrator.utils.logging import logger
 
-# Global session manager pool - keyed by thread ID for persistence across requests
-_SESSION_MANAGER_POOL: Dict[int, SessionManager] = {}
-_POOL_LOCK = threading.Lock()
-
-__CONFIG_SECRET_ROUTE = ["database"]
-__CONFIG_PROVIDER = YAMLConfigProvider("config.yaml")
+_CONFIG_SECRET_ROUTE = ["database"]
+_CONFIG_PROVIDER = YAMLConfigProvider("config.yaml")
+
+# Pool settings, overridable from the database section of config.yaml. The
+# pool is shared by every thread of the process, so pool_size + max_overflow
+# caps the connections a process can open.
+_DEFAULT_POOL_SIZE = 10
+_DEFAULT_MAX_OVERFLOW = 10
+_DEFAULT_POOL_TIMEOUT_SECONDS = 30
+_DEFAULT_POOL_RECYCLE_SECONDS = 1800
+
+# Number of most recent checkouts the connection hold times are computed over
+_HOLD_TIME_WINDOW = 1000
+
+with _CONFIG_PROVIDER.provide(_CONFIG_SECRET_ROUTE).unlock() as config:
+    _DATABASE_URL = URL.create(
+        "postgresql+psycopg2",
+        username=config.secret.get("username", "postgres"),
+        password=config.secret.get("password", "postgres"),
+        host=config.secret.get("host", "localhost"),
+        port=config.secret.get("port", 5432),
+        database=config.secret.get("database", "loan-orchestrator"),
+        query=config.secret.get("query_params") or {},
+    )
+    _POOL_OPTIONS = {
+        "pool_size": config.secret.get("pool_size", _DEFAULT_POOL_SIZE),
+        "max_overflow": config.secret.get("max_overflow", _DEFAULT_MAX_OVERFLOW),
+        "pool_timeout": config.secret.get(
+            "pool_timeout", _DEFAULT_POOL_TIMEOUT_SECONDS
+        ),
+        "pool_recycle": config.secret.get(
+            "pool_recycle", _DEFAULT_POOL_RECYCLE_SECONDS
+        ),
+        "pool_pre_ping": config.secret.get("pool_pre_ping", True),
+    }
+
+
+class _PoolMetrics:
+    """Counts pool events, and how long connections are held once checked out."""
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__checkouts = 0
+        self.__connects = 0
+        self.__invalidations = 0
+        self.__hold_times = deque(maxlen=_HOLD_TIME_WINDOW)
+
+    def listen(self, engine: Engine) -> None:
+        event.listen(engine, "connect", self.__on_connect)
+        event.listen(engine, "checkout", self.__on_checkout)
+        event.listen(engine, "checkin", self.__on_checkin)
+        event.listen(engine, "invalidate", self.__on_invalidate)
+
+    def to_dict(self, engine: Engine) -> dict:
+        with self.__lock:
+            hold_times = sorted(self.__hold_times)
+            checkouts = self.__checkouts
+            connects = self.__connects
+            invalidations = self.__invalidations
+
+        pool = engine.pool
+        return {
+            "size": pool.size(),
+            "checkedOut": pool.checkedout(),
+            "checkedIn": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "checkouts": checkouts,
+            "connects": connects,
+            "invalidations": invalidations,
+            "holdTime": {
+                "average": sum(hold_times) / len(hold_times) if hold_times else 0.0,
+                "p95": (
+                    hold_times[min(len(hold_times) - 1, int(len(hold_times) * 0.95))]
+                    if hold_times
+                    else 0.0
+                ),
+                "max": hold_times[-1] if hold_times else 0.0,
+            },
+        }
+
+    def __on_connect(self, dbapi_connection, connection_record) -> None:
+        with self.__lock:
+            self.__connects += 1
+
+    def __on_checkout(
+        self, dbapi_connection, connection_record, connection_proxy
+    ) -> None:
+        connection_record.info["checked_out_at"] = monotonic()
+        with self.__lock:
+            self.__checkouts += 1
+
+    def __on_checkin(self, dbapi_connection, connection_record) -> None:
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is None:
+            return
+        with self.__lock:
+            self.__hold_times.append(monotonic() - checked_out_at)
 
-with __CONFIG_PROVIDER.provide(__CONFIG_SECRET_ROUTE).unlock() as config:
-    __DB_NAME = config.secret.get("database", "loan-orchestrator")
-    __SCHEMA = config.secret.get("schema", "public")
+    def __on_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        with self.__lock:
+            self.__invalidations += 1
 
 
-def get_session_manager(
-    expire_on_commit: Optional[bool] = False,
-) -> Optional[SessionManager]:
+class SessionManager:
     """
-    Get or create a session manager for the current thread.
-    Each thread maintains its own session manager instance.
+    Hands out sessions bound to the engine shared by the whole process.
+
+    Each thread gets its own session, which only holds a pooled connection
+    while it is in a transaction. Tearing the session down at the end of a
+    request or job hands the connection back to the pool.
     """
-    thread_id = threading.current_thread().ident
 
-    # First, try to get from Flask's application context if available
-    if has_app_context() and hasattr(g, "session_manager"):
-        logger.info(
-            f"Reusing session manager from Flask context for thread {thread_id}"
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.__metrics = _PoolMetrics()
+        self.__metrics.listen(engine)
+        self.__sessions = scoped_session(
+            sessionmaker(bind=engine, expire_on_commit=False)
         )
-        return g.session_manager
-
-    # Check the global pool for existing session manager
-    with _POOL_LOCK:
-        session_manager = _SESSION_MANAGER_POOL.get(thread_id)
-
-        if session_manager is None:
-            logger.info(f"Creating NEW session manager for thread {thread_id}")
-            session_manager = SessionManager(
-                logger=logger,
-                config_path=__CONFIG_SECRET_ROUTE,
-                provider=__CONFIG_PROVIDER,
-                db_name=__DB_NAME,
-                expire_on_commit=expire_on_commit,
-            )
-            # Store in global pool
-            _SESSION_MANAGER_POOL[thread_id] = session_manager
-        else:
-            logger.info(
-                f"Reusing EXISTING session manager from pool for thread {thread_id}"
-            )
-
-    # Store in Flask context for faster access during this request
-    if has_app_context():
-        g.session_manager = session_manager
-
-    return session_manager
-
-
-def teardown():
-    """
-    Lightweight cleanup that doesn't actually teardown the session.
-    Sessions are kept alive across requests within the same thread for performance.
-    Only commit any pending transactions to ensure data consistency.
-    """
-    thread_id = threading.current_thread().ident
 
-    # Try to get session manager from Flask context first
-    session_manager = None
-    if has_app_context() and hasattr(g, "session_manager"):
-        session_manager = g.session_manager
-    else:
-        # Fallback to global pool
-        with _POOL_LOCK:
-            session_manager = _SESSION_MANAGER_POOL.get(thread_id)
+    @property
+    def session(self) -> Session:
+        return self.__sessions()
 
-    if session_manager is None:
-        logger.info(f"No session manager found for thread {thread_id} during teardown.")
-        return
+    def pool_metrics(self) -> dict:
+        return self.__metrics.to_dict(self.engine)
+
+    def teardown_session(self) -> None:
+        """Close the current thread's session, rolling back uncommitted work."""
+        self.__sessions.remove()
+
+    def shutdown_engine(self) -> None:
+        self.engine.dispose()
+
+
+_SESSION_MANAGER: Optional[SessionManager] = None
+_SESSION_MANAGER_LOCK = threading.Lock()
+
+
+def get_session_manager() -> SessionManager:
+    """Get the process-wide session manager, creating its engine on first use."""
+    global _SESSION_MANAGER
+
+    if _SESSION_MANAGER is None:
+        with _SESSION_MANAGER_LOCK:
+            if _SESSION_MANAGER is None:
+                logger.info(
+                    f"Creating database engine with pool settings {_POOL_OPTIONS}"
+                )
+                _SESSION_MANAGER = SessionManager(
+                    create_engine(_DATABASE_URL, **_POOL_OPTIONS)
+                )
+
+    return _SESSION_MANAGER
+
+
+def teardown(error: Optional[BaseException] = None) -> None:
+    """
+    End the current thread's session, returning its connection to the pool.
 
-    logger.info(f"Performing lightweight session cleanup for thread {thread_id}.")
+    Pending work is committed, or rolled back when `error` is given, as Flask
+    does when a request failed.
+    """
+    if _SESSION_MANAGER is None:
+        return
 
+    session = _SESSION_MANAGER.session
     try:
-        # Get the current session and commit any pending transactions
-        # but don't close the session - keep it alive for reuse
-        session = session_manager.session
-        if session and session.is_active:
+        if error is None and session.is_active:
             session.commit()
-            logger.debug("Committed pending transactions, keeping session alive.")
-    except Exception as error:  # pragma: no cover - defensive logging
+    except Exception:
         logger.exception("Failed to commit session transactions.")
-        # If commit fails, we should rollback to maintain consistency
-        try:
-            session = session_manager.session
-            if session and session.is_active:
-                session.rollback()
-                logger.debug("Rolled back failed transaction.")
-        except Exception as rollback_error:
-            logger.exception(
-                f"Failed to rollback session after commit error.: {rollback_error}"
-            )
-        raise error
-
-
-def shutdown_session_manager():
+        raise
+    finally:
+        _SESSION_MANAGER.teardown_session()
+
+
+def release_session() -> None:
     """
-    Completely shutdown the session manager for the current thread.
-    This should only be called when the thread is terminating or
-    when a complete cleanup is needed (e.g., application shutdown).
+    Close the current thread's session without committing, returning its
+    connection to the pool. Meant for long lived threads, between jobs.
     """
-    thread_id = threading.current_thread().ident
+    if _SESSION_MANAGER is not None:
+        _SESSION_MANAGER.teardown_session()
 
-    # Get session manager from global pool
-    with _POOL_LOCK:
-        session_manager = _SESSION_MANAGER_POOL.get(thread_id)
-        if session_manager is None:
-            logger.debug(f"No session manager to shutdown for thread {thread_id}.")
-            return
 
-        # Remove from pool
-        del _SESSION_MANAGER_POOL[thread_id]
+def shutdown_session_manager() -> None:
+    """
+    Close the current thread's session and the engine's pooled connections.
 
-    logger.debug(f"Shutting down session manager for thread {thread_id}.")
+    Only meant for process shutdown; the next database access creates a new
+    engine.
+    """
+    global _SESSION_MANAGER
 
-    shutdown_error: Optional[BaseException] = None
+    with _SESSION_MANAGER_LOCK:
+        session_manager = _SESSION_MANAGER
+        _SESSION_MANAGER = None
 
-    try:
-        session_manager.teardown_session()
-    except Exception as error:  # pragma: no cover - defensive logging
-        shutdown_error = error
-        logger.exception("Failed to teardown database session during shutdown.")
+    if session_manager is None:
+        return
 
     try:
+        session_manager.teardown_session()
+    finally:
         session_manager.shutdown_engine()
-    except Exception as error:  # pragma: no cover - defensive logging
-        if shutdown_error is None:
-            shutdown_error = error
-        logger.exception("Failed to shutdown database engine.")
 
-    # Session manager already removed from global pool above
-    # Also clear from Flask context if present
-    if has_app_context() and hasattr(g, "session_manager"):
-        delattr(g, "session_manager")
 
-    if shutdown_error is not None:
-        raise shutdown_error
-
-
-def cleanup_dead_threads():
-    """
-    Clean up session managers for threads that are no longer alive.
-    This prevents memory leaks in the global pool.
-    """
-    import threading
-
-    active_thread_ids = {t.ident for t in threading.enumerate()}
-
-    with _POOL_LOCK:
-        dead_thread_ids = set(_SESSION_MANAGER_POOL.keys()) - active_thread_ids
-
-        for thread_id in dead_thread_ids:
-            logger.debug(f"Cleaning up session manager for dead thread {thread_id}")
-            session_manager = _SESSION_MANAGER_POOL.pop(thread_id, None)
-            if session_manager:
-                try:
-                    session_manager.teardown_session()
-                    session_manager.shutdown_engine()
-                except Exception as e:
-                    logger.exception(f"Error cleaning up dead thread {thread_id}: {e}")
-
-        if dead_thread_ids:
-            logger.info(
-                f"Cleaned up {len(dead_thread_ids)} dead thread session managers"
-            )
+def pool_metrics() -> dict:
+    """Metrics of the shared connection pool, empty until it was created."""
+    if _SESSION_MANAGER is None:
+        return {}
+    return _SESSION_MANAGER.pool_metrics()
@@ -1,12 +1,14 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import uuid4
 
-from pyutils.database.sqlalchemy.filters import EqualityFilter, InListFilter
+from pyutils.database.sqlalchemy.filters import InListFilter
+from sqlalchemy import insert
 
 from orchestrator.clients.db.schema import Application
 from orchestrator.clients.db.wrappers.base import BaseDBWrapper
 from orchestrator.resources.types import ApplicationStatus, Country
 from orchestrator.utils.logging import log_execution_time
+from orchestrator.utils.pagination import Page, PageCursor
 
 
 class ApplicationsDBWrapper(BaseDBWrapper):
@@ -35,25 +37,70 @@ class ApplicationsDBWrapper(BaseDBWrapper):
             status=ApplicationStatus.SUBMITTED,
         )
 
+    @log_execution_time(description="Creating Applications in bulk in the database")
+    def create_applications_in_bulk(self, applications: List[dict]) -> List[Tuple]:
+        """
+        Insert several applications with multi-row INSERT statements.
+
+        Each application holds the arguments of `create_application`. Returns
+        the (ID, key) of every application, in the same order.
+        """
+        session = self.session_manager.session
+
+        rows = [
+            {
+                "id": uuid4(),
+                "applicant_name": application["applicant_name"],
+                "amount": application["amount"],
+                "monthly_income": application["monthly_income"],
+                "declared_debts": application["declared_debts"],
+                "country": application["country"].value,
+                "loan_purpose": application["loan_purpose"],
+                "status": ApplicationStatus.SUBMITTED,
+            }
+            for application in applications
+        ]
+
+        try:
+            # Passing the rows as parameters rather than through `values()`
+            # keeps the statement cached; SQLAlchemy batches them into
+            # multi-row VALUES clauses and keeps RETURNING in parameter order
+            created = session.execute(
+                insert(Application).returning(
+                    Application.id, Application.key, sort_by_parameter_order=True
+                ),
+                rows,
+            ).all()
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+        return [(str(app_id), key) for app_id, key in created]
+
     @log_execution_time(description="Fetching Applications by value from the database")
     def get_applications_by_value(
         self,
         key: Optional[str] = None,
         status_in: Optional[List[ApplicationStatus]] = None,
         status_not_in: Optional[List[ApplicationStatus]] = None,
-    ):
-        filters = []
+        limit: Optional[int] = None,
+        cursor: Optional[PageCursor] = None,
+    ) -> Page[Application]:
+        conditions = []
         if key:
-            filters.append(EqualityFilter(Application.key, key))
+            conditions.append(Application.key == key)
         if status_in:
-            filters.append(InListFilter(Application.status, status_in))
+            conditions.append(Application.status.in_(status_in))
         if status_not_in:
-            filters.append(
-                InListFilter(Application.status, status_not_in, negated=True)
-            )
+            conditions.append(Application.status.not_in(status_not_in))
+
+        return self._get_page(conditions, limit=limit, cursor=cursor)
 
+    @log_execution_time(description="Fetching Applications by keys from the database")
+    def get_applications_by_keys(self, keys: List[str]) -> List[Application]:
         return self._get_model(
-            filters=filters,
+            filters=[InListFilter(Application.key, keys)],
             return_type=self.GetResultType.ALL,
         )
 
@@ -1,17 +1,19 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from pyutils.config.providers import ConfigProvider
-from pyutils.database.sqlalchemy.db_factory import SessionManager
 from pyutils.database.sqlalchemy.filters import EqualityFilter, Filter
 from pyutils.database.sqlalchemy.joins import Join
 from pyutils.database.sqlalchemy.wrapper import DBWrapper as DBWrapperPyUtils
 from pyutils.helpers.errors import BadArgumentsError
-from sqlalchemy import Column
+from sqlalchemy import Column, literal, select, tuple_
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.sql.base import ExecutableOption
+from sqlalchemy.sql.elements import ColumnElement
 
-from orchestrator.clients.db.session_manager import get_session_manager
+from orchestrator.clients.db.session_manager import SessionManager, get_session_manager
 from orchestrator.utils.config import CONFIG_PROVIDER
 from orchestrator.utils.logging import logger
+from orchestrator.utils.pagination import Page, PageCursor
 
 
 class BaseDBWrapper(DBWrapperPyUtils):
@@ -76,3 +78,65 @@ class BaseDBWrapper(DBWrapperPyUtils):
             limit=limit,
             return_type=return_type,
         )
+
+    def _get_page(
+        self,
+        conditions: List[ColumnElement],
+        limit: Optional[int] = None,
+        cursor: Optional[PageCursor] = None,
+        options: Optional[List[ExecutableOption]] = None,
+        columns: Optional[List[ColumnElement]] = None,
+        joins: Optional[List[Tuple]] = None,
+    ) -> Page:
+        """
+        Fetch the models matching all `conditions`, newest first.
+
+        Models are ordered by (created_at, id) and only the ones strictly after
+        `cursor` are returned, so a page costs the same however deep into the
+        table it is. When more than `limit` models match, the page holds the
+        first `limit` of them and a cursor to the next page. Loader `options`
+        are applied to the query, to load relationships along with the models.
+
+        When `columns` are given, rows of them are returned instead of models.
+        They must include the model's `id` and `created_at`, and can come from
+        the (target, on clause) `joins`, which are left outer joined.
+        """
+        session = self.session_manager.session
+        created_at = self.model_class.created_at
+        model_id = self.model_class.id
+
+        if columns:
+            query = select(*columns).select_from(self.model_class)
+        else:
+            query = select(self.model_class)
+        for target, onclause in joins or []:
+            query = query.outerjoin(target, onclause)
+        query = query.where(*conditions)
+        if options:
+            query = query.options(*options)
+        if cursor is not None:
+            query = query.where(
+                tuple_(created_at, model_id)
+                < tuple_(
+                    literal(cursor.created_at, created_at.type),
+                    literal(cursor.id, model_id.type),
+                )
+            )
+        query = query.order_by(created_at.desc(), model_id.desc())
+        if limit is not None:
+            # One extra row tells whether there is a next page
+            query = query.limit(limit + 1)
+
+        if columns:
+            models = session.execute(query).all()
+        else:
+            models = session.scalars(query).all()
+
+        if limit is None or len(models) <= limit:
+            return Page(items=models)
+
+        models = models[:limit]
+        return Page(
+            items=models,
+            next_cursor=PageCursor(created_at=models[-1].created_at, id=models[-1].id),
+        )
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from orchestrator.clients.db.schema import SentimentClassification
+from orchestrator.clients.db.wrappers.base import BaseDBWrapper
+from orchestrator.utils.logging import log_execution_time
+
+
+class ClassificationsDBWrapper(BaseDBWrapper):
+    """
+    Cache of sentiment classifications.
+
+    Every call runs in its own short lived session rather than the thread's
+    one, which usually holds the evaluation being run. A failing cache access
+    then never leaves that session unusable.
+    """
+
+    def __init__(self):
+        super().__init__(SentimentClassification)
+
+    def __session(self) -> Session:
+        return Session(self.session_manager.engine, expire_on_commit=False)
+
+    @log_execution_time("Fetching cached sentiment classification")
+    def get_classification(
+        self,
+        text_hash: str,
+        model: str,
+        prompt_version: int,
+    ) -> Optional[SentimentClassification]:
+        with self.__session() as session:
+            return session.scalars(
+                select(SentimentClassification).where(
+                    SentimentClassification.text_hash == text_hash,
+                    SentimentClassification.model == model,
+                    SentimentClassification.prompt_version == prompt_version,
+                    SentimentClassification.expires_at > func.statement_timestamp(),
+                )
+            ).first()
+
+    @log_execution_time("Storing sentiment classification")
+    def save_classification(
+        self,
+        text_hash: str,
+        model: str,
+        prompt_version: int,
+        result: str,
+        ttl: timedelta,
+    ) -> None:
+        """Store a classification, replacing the one cached for the same key."""
+        statement = insert(SentimentClassification).values(
+            text_hash=text_hash,
+            model=model,
+            prompt_version=prompt_version,
+            result=result,
+            expires_at=datetime.now(tz=timezone.utc) + ttl,
+        )
+
+        # Concurrent evaluations may store the same key at once
+        with self.__session() as session, session.begin():
+            session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[
+                        SentimentClassification.text_hash,
+                        SentimentClassification.model,
+                        SentimentClassification.prompt_version,
+                    ],
+                    set_={
+                        "result": statement.excluded.result,
+                        "expires_at": statement.excluded.expires_at,
+                    },
+                )
+            )
+
+    @log_execution_time("Deleting expired sentiment classifications")
+    def delete_expired_classifications(self) -> int:
+        with self.__session() as session, session.begin():
+            deleted = session.execute(
+                delete(SentimentClassification).where(
+                    SentimentClassification.expires_at <= datetime.now(tz=timezone.utc)
+                )
+            )
+
+        return deleted.rowcount
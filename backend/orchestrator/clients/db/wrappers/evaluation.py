@@ -1,13 +1,43 @@
-from typing import List, Optional
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
 from uuid import uuid4
 
-from pyutils.database.sqlalchemy.filters import EqualityFilter, InListFilter
-from pyutils.database.sqlalchemy.joins import Join
+from pyutils.database.sqlalchemy.filters import EqualityFilter
+from sqlalchemy import (
+    Row,
+    String,
+    and_,
+    cast,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.orm import joinedload
 
-from orchestrator.clients.db.schema import Application, ApplicationEvaluation
+from orchestrator.clients.db.schema import (
+    Application,
+    ApplicationEvaluation,
+    Pipeline,
+    PipelineVersion,
+)
 from orchestrator.clients.db.wrappers.base import BaseDBWrapper
-from orchestrator.resources.types import ApplicationEvaluationStatus, EvaluationResult
+from orchestrator.clients.db.wrappers.evaluation_stats import EvaluationStatsDBWrapper
+from orchestrator.resources.types import (
+    ApplicationEvaluationStatus,
+    ApplicationStatus,
+    EvaluationResult,
+    PipelineStepEvaluationResult,
+)
 from orchestrator.utils.logging import log_execution_time
+from orchestrator.utils.pagination import Page, PageCursor
+
+# A step, by type or flow node ID, and the result it had, or None for any result
+StepOutcomeFilter = Tuple[str, Optional[PipelineStepEvaluationResult]]
 
 
 class EvaluationsDBWrapper(BaseDBWrapper):
@@ -30,14 +60,133 @@ class EvaluationsDBWrapper(BaseDBWrapper):
 
         return new_evaluation
 
+    @log_execution_time(description="Creating application evaluations in bulk")
+    def create_evaluations_in_bulk(
+        self,
+        pipeline_id: str,
+        application_keys: Optional[List[str]] = None,
+        application_status: Optional[ApplicationStatus] = None,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[str, str]]:
+        """
+        Create a pending evaluation for every matching application.
+
+        Applications are matched by key and/or status, moved to IN_REVIEW and
+        given an evaluation by a single statement. Applications already in
+        review, or locked by a concurrent request, are left out. Returns the
+        (evaluation ID, application key) pairs created.
+        """
+        session = self.session_manager.session
+
+        candidate_ids = select(Application.id).where(
+            Application.status != ApplicationStatus.IN_REVIEW
+        )
+        if application_keys is not None:
+            candidate_ids = candidate_ids.where(Application.key.in_(application_keys))
+        if application_status is not None:
+            candidate_ids = candidate_ids.where(
+                Application.status == application_status
+            )
+        candidate_ids = (
+            candidate_ids.order_by(Application.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+
+        claimed = (
+            update(Application)
+            .where(Application.id.in_(candidate_ids.scalar_subquery()))
+            .values(status=ApplicationStatus.IN_REVIEW)
+            .returning(Application.id, Application.key)
+            .cte("claimed")
+        )
+        inserted = (
+            insert(ApplicationEvaluation)
+            .from_select(
+                ["id", "application_id", "pipeline_id", "status"],
+                select(
+                    func.gen_random_uuid(),
+                    claimed.c.id,
+                    literal(pipeline_id, ApplicationEvaluation.pipeline_id.type),
+                    literal(
+                        ApplicationEvaluationStatus.PENDING,
+                        ApplicationEvaluation.status.type,
+                    ),
+                ),
+            )
+            .returning(ApplicationEvaluation.id, ApplicationEvaluation.application_id)
+            .cte("inserted")
+        )
+
+        created = session.execute(
+            select(inserted.c.id, claimed.c.key).join(
+                claimed, claimed.c.id == inserted.c.application_id
+            )
+        ).all()
+        session.commit()
+
+        return [(str(evaluation_id), key) for evaluation_id, key in created]
+
     @log_execution_time("Deleting an application evaluation")
     def delete_evaluation(self, evaluation: ApplicationEvaluation) -> None:
         """Delete an application evaluation entry."""
         self._delete_model(evaluation)
 
     @log_execution_time("Retrieving evaluation by ID")
-    def get_evaluation_by_id(self, evaluation_id: str) -> ApplicationEvaluation:
-        return self._get_model_by_id(evaluation_id)
+    def get_evaluation_by_id(
+        self, evaluation_id: str, created_at: Optional[datetime] = None
+    ) -> ApplicationEvaluation:
+        """
+        Get an evaluation by ID. Its creation time, when known, restricts the
+        lookup to the partition it is in rather than every partition.
+        """
+        if created_at is None:
+            return self._get_model_by_id(evaluation_id)
+
+        return self._get_model(
+            filters=[
+                EqualityFilter(ApplicationEvaluation.id, evaluation_id),
+                EqualityFilter(ApplicationEvaluation.created_at, created_at),
+            ],
+            error_message=f"Evaluation with ID {evaluation_id} not found.",
+            at_least_one_filter=True,
+        )
+
+    @staticmethod
+    def __filter_conditions(
+        application_key: Optional[str],
+        pipeline_id: Optional[str],
+        status_in: Optional[List[ApplicationEvaluationStatus]],
+        status_not_in: Optional[List[ApplicationEvaluationStatus]],
+        step_outcomes: Optional[List[StepOutcomeFilter]],
+    ) -> list:
+        conditions = []
+
+        if application_key:
+            conditions.append(
+                ApplicationEvaluation.application_id.in_(
+                    select(Application.id).where(Application.key == application_key)
+                )
+            )
+
+        if pipeline_id:
+            conditions.append(ApplicationEvaluation.pipeline_id == pipeline_id)
+
+        if status_in:
+            conditions.append(ApplicationEvaluation.status.in_(status_in))
+        if status_not_in:
+            conditions.append(ApplicationEvaluation.status.not_in(status_not_in))
+
+        # Trace steps are [flow node ID, step type, result, value, duration]
+        # arrays, which contain any subset of their elements. Served by the GIN
+        # index on the trace, so only compact run logs are matched.
+        for step, step_result in step_outcomes or []:
+            outcome = [step] if step_result is None else [step, step_result.value]
+            conditions.append(
+                ApplicationEvaluation.details["trace"].contains({"steps": [outcome]})
+            )
+
+        return conditions
 
     @log_execution_time("Retrieving evaluations by values")
     def get_evaluations_by_values(
@@ -46,60 +195,422 @@ class EvaluationsDBWrapper(BaseDBWrapper):
         pipeline_id: Optional[str] = None,
         status_in: Optional[List[ApplicationEvaluationStatus]] = None,
         status_not_in: Optional[List[ApplicationEvaluationStatus]] = None,
+        step_outcomes: Optional[List[StepOutcomeFilter]] = None,
         limit: Optional[int] = None,
-    ) -> List[ApplicationEvaluation]:
-        filters = []
-        joins = []
+        cursor: Optional[PageCursor] = None,
+    ) -> Page[ApplicationEvaluation]:
+        conditions = self.__filter_conditions(
+            application_key, pipeline_id, status_in, status_not_in, step_outcomes
+        )
 
-        if application_key:
-            filters.append(EqualityFilter(Application.key, application_key))
-            joins.append(
-                Join(
-                    Application,
-                    ApplicationEvaluation.application_id,
-                    Application.id,
-                )
-            )
+        # Everything `Evaluation.from_dao` reads, in one query rather than
+        # four lazy loads per evaluation
+        return self._get_page(
+            conditions,
+            limit=limit,
+            cursor=cursor,
+            options=[
+                joinedload(ApplicationEvaluation.application),
+                joinedload(ApplicationEvaluation.pipeline).joinedload(
+                    Pipeline.current_version
+                ),
+                joinedload(ApplicationEvaluation.pipeline_version),
+            ],
+        )
+
+    @log_execution_time("Retrieving evaluation summaries by values")
+    def get_evaluation_summaries_by_values(
+        self,
+        application_key: Optional[str] = None,
+        pipeline_id: Optional[str] = None,
+        status_in: Optional[List[ApplicationEvaluationStatus]] = None,
+        status_not_in: Optional[List[ApplicationEvaluationStatus]] = None,
+        step_outcomes: Optional[List[StepOutcomeFilter]] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[PageCursor] = None,
+    ) -> Page[Row]:
+        """
+        Same as `get_evaluations_by_values`, but only reads the columns needed
+        to list evaluations.
+
+        The pipeline name and version are the ones the evaluation ran with,
+        falling back to the pipeline's current ones for unfinished evaluations.
+        """
+        conditions = self.__filter_conditions(
+            application_key, pipeline_id, status_in, status_not_in, step_outcomes
+        )
 
+        return self._get_page(
+            conditions,
+            limit=limit,
+            cursor=cursor,
+            columns=[
+                ApplicationEvaluation.id,
+                ApplicationEvaluation.status,
+                ApplicationEvaluation.result,
+                ApplicationEvaluation.created_at,
+                ApplicationEvaluation.updated_at,
+                Application.key.label("application_key"),
+                Application.applicant_name,
+                ApplicationEvaluation.pipeline_id,
+                func.coalesce(
+                    ApplicationEvaluation.details[("pipeline", "name")].as_string(),
+                    Pipeline.name,
+                ).label("pipeline_name"),
+                func.coalesce(
+                    ApplicationEvaluation.details[("pipeline", "version")].as_string(),
+                    cast(PipelineVersion.version_number, String),
+                ).label("pipeline_version"),
+            ],
+            joins=[
+                (Application, ApplicationEvaluation.application_id == Application.id),
+                (Pipeline, ApplicationEvaluation.pipeline_id == Pipeline.id),
+                (PipelineVersion, Pipeline.current_version_id == PipelineVersion.id),
+            ],
+        )
+
+    @log_execution_time("Aggregating application evaluation statistics")
+    def get_evaluation_stats(
+        self,
+        pipeline_id: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+    ) -> Tuple[Dict[str, int], Dict[str, int], float]:
+        """
+        Count evaluations per status and per result, and average their run
+        duration, in the database.
+
+        Every status and result is included, with a count of 0 when no
+        evaluation matches. Evaluations without a recorded run duration are
+        left out of the average, which is 0.0 when there are none.
+        """
+        session = self.session_manager.session
+
+        conditions = []
         if pipeline_id:
-            filters.append(
-                EqualityFilter(ApplicationEvaluation.pipeline_id, pipeline_id)
-            )
+            conditions.append(ApplicationEvaluation.pipeline_id == pipeline_id)
+        if created_after is not None:
+            conditions.append(ApplicationEvaluation.created_at >= created_after)
+        if created_before is not None:
+            conditions.append(ApplicationEvaluation.created_at < created_before)
 
-        if status_in:
-            filters.append(InListFilter(ApplicationEvaluation.status, status_in))
-        if status_not_in:
-            filters.append(
-                InListFilter(ApplicationEvaluation.status, status_not_in, negated=True)
-            )
+        count_by_status = {status.value: 0 for status in ApplicationEvaluationStatus}
+        for status, count in session.execute(
+            select(ApplicationEvaluation.status, func.count())
+            .where(*conditions)
+            .group_by(ApplicationEvaluation.status)
+        ):
+            count_by_status[status.value] = count
 
-        order_by = None
-        order_by = {
-            "field": "created_at",
-            "direction": "desc",
-        }
+        count_by_result = {result.value: 0 for result in EvaluationResult}
+        for result, count in session.execute(
+            select(ApplicationEvaluation.result, func.count())
+            .where(ApplicationEvaluation.result.is_not(None), *conditions)
+            .group_by(ApplicationEvaluation.result)
+        ):
+            count_by_result[result.value] = count
 
-        return self._get_model(
-            filters=filters,
-            joins=joins,
-            order_by=order_by,
-            limit=limit,
-            return_type=self.GetResultType.ALL,
+        average_duration = session.scalar(
+            select(
+                func.avg(ApplicationEvaluation.details["run_duration"].as_float())
+            ).where(*conditions)
         )
 
-    @log_execution_time("Updating application evaluation")
-    def update_evaluation(
+        return count_by_status, count_by_result, float(average_duration or 0.0)
+
+    @log_execution_time("Finishing a claimed application evaluation")
+    def finish_evaluation(
         self,
         evaluation: ApplicationEvaluation,
-        status: Optional[ApplicationEvaluationStatus] = None,
+        worker_id: str,
+        status: ApplicationEvaluationStatus,
+        application_status: ApplicationStatus,
         result: Optional[EvaluationResult] = None,
         details: Optional[dict] = None,
-    ) -> None:
-        if status is not None:
-            evaluation.status = status
-        if result is not None:
-            evaluation.result = result
-        if details is not None:
-            evaluation.details = details
-
-        self._upsert_model(evaluation)
+        pipeline_version_id: Optional[str] = None,
+    ) -> bool:
+        """
+        Record the outcome of an evaluation claimed by the worker, and move its
+        application to `application_status`.
+
+        Nothing is written unless the worker still holds the claim, i.e. its
+        lease did not expire and let another worker claim the evaluation
+        meanwhile. Returns whether the outcome was recorded.
+        """
+        session = self.session_manager.session
+
+        try:
+            finished = session.execute(
+                update(ApplicationEvaluation)
+                .where(
+                    ApplicationEvaluation.id == evaluation.id,
+                    ApplicationEvaluation.created_at == evaluation.created_at,
+                    ApplicationEvaluation.claimed_by == worker_id,
+                    ApplicationEvaluation.status
+                    == ApplicationEvaluationStatus.EVALUATING,
+                )
+                .values(
+                    status=status,
+                    result=result,
+                    details=details,
+                    pipeline_version_id=pipeline_version_id,
+                    claimed_by=None,
+                    lease_expires_at=None,
+                )
+                .returning(ApplicationEvaluation.id),
+                execution_options={"synchronize_session": False},
+            ).first()
+            if finished is None:
+                session.rollback()
+                return False
+
+            EvaluationStatsDBWrapper().add_finished_evaluations(
+                pipeline_id=evaluation.pipeline_id,
+                status=status,
+                result=result,
+                duration=(details or {}).get("run_duration"),
+            )
+            session.execute(
+                update(Application)
+                .where(Application.id == evaluation.application_id)
+                .values(status=application_status),
+                execution_options={"synchronize_session": False},
+            )
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+        return True
+
+    @log_execution_time("Renewing the lease of a claimed application evaluation")
+    def renew_lease(
+        self,
+        evaluation_id: str,
+        created_at: datetime,
+        worker_id: str,
+        lease_duration: timedelta,
+    ) -> bool:
+        """
+        Extend the lease of an evaluation claimed by the worker. Returns False
+        when the worker no longer holds the claim.
+        """
+        session = self.session_manager.session
+
+        renewed = session.execute(
+            update(ApplicationEvaluation)
+            .where(
+                ApplicationEvaluation.id == evaluation_id,
+                ApplicationEvaluation.created_at == created_at,
+                ApplicationEvaluation.claimed_by == worker_id,
+                ApplicationEvaluation.status == ApplicationEvaluationStatus.EVALUATING,
+            )
+            .values(lease_expires_at=func.statement_timestamp() + lease_duration),
+            execution_options={"synchronize_session": False},
+        )
+        session.commit()
+
+        return renewed.rowcount > 0
+
+    @log_execution_time("Claiming queued application evaluations")
+    def claim_evaluations(
+        self,
+        worker_id: str,
+        limit: int,
+        lease_duration: timedelta,
+        max_attempts: int,
+    ) -> List[ApplicationEvaluation]:
+        """
+        Claim up to `limit` evaluations for the given worker, oldest first.
+
+        Pending evaluations are claimed, as well as evaluations whose previous
+        worker let the lease expire and that have attempts left. Rows locked by
+        concurrent claims are skipped, so any number of workers can claim at
+        the same time without ever getting the same evaluation.
+
+        Leases are compared with `statement_timestamp()` rather than `now()`,
+        as the thread's session may have been in a transaction for a while.
+        """
+        session = self.session_manager.session
+
+        claimable_keys = (
+            select(ApplicationEvaluation.id, ApplicationEvaluation.created_at)
+            .where(
+                or_(
+                    ApplicationEvaluation.status == ApplicationEvaluationStatus.PENDING,
+                    and_(
+                        ApplicationEvaluation.status
+                        == ApplicationEvaluationStatus.EVALUATING,
+                        or_(
+                            ApplicationEvaluation.lease_expires_at.is_(None),
+                            ApplicationEvaluation.lease_expires_at
+                            < func.statement_timestamp(),
+                        ),
+                        ApplicationEvaluation.attempts < max_attempts,
+                    ),
+                )
+            )
+            .order_by(ApplicationEvaluation.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+
+        claimed = session.scalars(
+            update(ApplicationEvaluation)
+            .where(
+                tuple_(ApplicationEvaluation.id, ApplicationEvaluation.created_at).in_(
+                    claimable_keys
+                )
+            )
+            .values(
+                status=ApplicationEvaluationStatus.EVALUATING,
+                claimed_by=worker_id,
+                lease_expires_at=func.statement_timestamp() + lease_duration,
+                attempts=ApplicationEvaluation.attempts + 1,
+            )
+            .returning(ApplicationEvaluation),
+            execution_options={"synchronize_session": False},
+        ).all()
+        session.commit()
+
+        return sorted(claimed, key=lambda evaluation: evaluation.created_at)
+
+    @log_execution_time("Releasing claimed application evaluations")
+    def release_evaluations(
+        self, evaluation_keys: List[Tuple[str, datetime]], worker_id: str
+    ) -> int:
+        """
+        Put evaluations claimed but never started by the worker back in the
+        queue, given as (ID, creation time) pairs.
+
+        The claim does not count as an attempt. Returns the number of
+        evaluations released.
+        """
+        session = self.session_manager.session
+
+        released = session.execute(
+            update(ApplicationEvaluation)
+            .where(
+                tuple_(ApplicationEvaluation.id, ApplicationEvaluation.created_at).in_(
+                    evaluation_keys
+                ),
+                ApplicationEvaluation.claimed_by == worker_id,
+                ApplicationEvaluation.status == ApplicationEvaluationStatus.EVALUATING,
+            )
+            .values(
+                status=ApplicationEvaluationStatus.PENDING,
+                claimed_by=None,
+                lease_expires_at=None,
+                attempts=ApplicationEvaluation.attempts - 1,
+            ),
+            execution_options={"synchronize_session": False},
+        )
+        session.commit()
+
+        return released.rowcount
+
+    @log_execution_time("Failing abandoned application evaluations")
+    def fail_abandoned_evaluations(self, max_attempts: int) -> int:
+        """
+        Give up on evaluations whose lease expired after their last attempt.
+
+        Both the evaluations and their applications are moved to their error
+        status. Returns the number of evaluations given up on.
+        """
+        session = self.session_manager.session
+
+        abandoned_keys = (
+            select(ApplicationEvaluation.id, ApplicationEvaluation.created_at)
+            .where(
+                ApplicationEvaluation.status == ApplicationEvaluationStatus.EVALUATING,
+                ApplicationEvaluation.lease_expires_at < func.statement_timestamp(),
+                ApplicationEvaluation.attempts >= max_attempts,
+            )
+            .with_for_update(skip_locked=True)
+        )
+
+        abandoned = session.execute(
+            update(ApplicationEvaluation)
+            .where(
+                tuple_(ApplicationEvaluation.id, ApplicationEvaluation.created_at).in_(
+                    abandoned_keys
+                )
+            )
+            .values(
+                status=ApplicationEvaluationStatus.EVALUATING_ERROR,
+                details={
+                    "error": f"Evaluation abandoned after {max_attempts} attempts"
+                },
+                claimed_by=None,
+                lease_expires_at=None,
+            )
+            .returning(
+                ApplicationEvaluation.application_id, ApplicationEvaluation.pipeline_id
+            ),
+            execution_options={"synchronize_session": False},
+        ).all()
+        application_ids = [application_id for application_id, _ in abandoned]
+
+        stats_db_wrapper = EvaluationStatsDBWrapper()
+        for pipeline_id, count in Counter(
+            pipeline_id for _, pipeline_id in abandoned
+        ).items():
+            stats_db_wrapper.add_finished_evaluations(
+                pipeline_id=pipeline_id,
+                status=ApplicationEvaluationStatus.EVALUATING_ERROR,
+                count=count,
+            )
+
+        if application_ids:
+            session.execute(
+                update(Application)
+                .where(Application.id.in_(application_ids))
+                .values(status=ApplicationStatus.REVIEWING_ERROR),
+                execution_options={"synchronize_session": False},
+            )
+        session.commit()
+
+        return len(application_ids)
+
+    @log_execution_time("Counting queued application evaluations")
+    def count_pending_evaluations(self) -> int:
+        session = self.session_manager.session
+
+        return session.scalar(
+            select(func.count())
+            .select_from(ApplicationEvaluation)
+            .where(ApplicationEvaluation.status == ApplicationEvaluationStatus.PENDING)
+        )
+
+    @log_execution_time("Retrieving evaluation queue status")
+    def get_queue_status(
+        self, rate_window: timedelta
+    ) -> Tuple[int, Optional[datetime], int]:
+        """
+        Return the number of pending evaluations, when the oldest one was
+        created, and how many evaluations finished within `rate_window`.
+        """
+        session = self.session_manager.session
+
+        pending, oldest_pending_at = session.execute(
+            select(func.count(), func.min(ApplicationEvaluation.created_at)).where(
+                ApplicationEvaluation.status == ApplicationEvaluationStatus.PENDING
+            )
+        ).one()
+
+        processed = session.scalar(
+            select(func.count())
+            .select_from(ApplicationEvaluation)
+            .where(
+                ApplicationEvaluation.status.in_(
+                    [
+                        ApplicationEvaluationStatus.EVALUATED,
+                        ApplicationEvaluationStatus.EVALUATING_ERROR,
+                    ]
+                ),
+                ApplicationEvaluation.updated_at
+                >= func.statement_timestamp() - rate_window,
+            )
+        )
+
+        return pending, oldest_pending_at, processed
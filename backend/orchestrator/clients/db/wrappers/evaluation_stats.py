@@ -0,0 +1,193 @@
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
+
+from orchestrator.clients.db.schema import EvaluationStatsRollup
+from orchestrator.clients.db.wrappers.base import BaseDBWrapper
+from orchestrator.resources.types import ApplicationEvaluationStatus, EvaluationResult
+from orchestrator.utils.logging import log_execution_time
+
+# Lower bounds, in seconds, of the run duration histogram buckets. Bucket 0
+# holds durations below the first bound. Changing these requires rebuilding
+# the rollups, as bucket indexes are stored.
+DURATION_BUCKET_BOUNDS = [
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+]
+
+# Granularities the rollups can be read at, as understood by date_trunc
+TIMESERIES_INTERVALS = ("hour", "day", "week", "month")
+
+_NO_DURATION_BUCKET = -1
+_NO_RESULT = ""
+
+
+def _duration_bucket(duration: Optional[float]) -> int:
+    if duration is None:
+        return _NO_DURATION_BUCKET
+    return bisect_right(DURATION_BUCKET_BOUNDS, duration)
+
+
+class EvaluationStatsDBWrapper(BaseDBWrapper):
+    def __init__(self):
+        super().__init__(EvaluationStatsRollup)
+
+    def add_finished_evaluations(
+        self,
+        pipeline_id: str,
+        status: ApplicationEvaluationStatus,
+        result: Optional[EvaluationResult] = None,
+        duration: Optional[float] = None,
+        count: int = 1,
+    ) -> None:
+        """
+        Add evaluations that just reached a terminal status to the rollups.
+
+        The rollup is updated in the thread's current transaction and is not
+        committed, so it lands together with the status change that caused it.
+        """
+        session = self.session_manager.session
+
+        statement = insert(EvaluationStatsRollup).values(
+            bucket_start=func.date_trunc("hour", func.statement_timestamp()),
+            pipeline_id=pipeline_id,
+            status=status,
+            result=result.value if result is not None else _NO_RESULT,
+            duration_bucket=_duration_bucket(duration),
+            count=count,
+            duration_sum=(duration or 0.0) * count,
+        )
+        session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[
+                    EvaluationStatsRollup.bucket_start,
+                    EvaluationStatsRollup.pipeline_id,
+                    EvaluationStatsRollup.status,
+                    EvaluationStatsRollup.result,
+                    EvaluationStatsRollup.duration_bucket,
+                ],
+                set_={
+                    "count": EvaluationStatsRollup.count + statement.excluded.count,
+                    "duration_sum": EvaluationStatsRollup.duration_sum
+                    + statement.excluded.duration_sum,
+                },
+            )
+        )
+
+    @log_execution_time("Retrieving evaluation statistics time series")
+    def get_timeseries(
+        self,
+        interval: str,
+        pipeline_id: Optional[str] = None,
+        finished_after: Optional[datetime] = None,
+        finished_before: Optional[datetime] = None,
+    ) -> List[dict]:
+        """
+        Aggregate the rollups into one entry per `interval`, oldest first.
+
+        Rollups are hourly, so the time range is applied to whole hours. Only
+        periods with at least one finished evaluation are returned.
+        """
+        if interval not in TIMESERIES_INTERVALS:
+            raise ValueError(
+                f"interval must be one of {', '.join(TIMESERIES_INTERVALS)}"
+            )
+
+        session = self.session_manager.session
+
+        # Inlined rather than bound, so the selected and grouped by expressions
+        # are identical. Safe, as it was checked against the allowed intervals.
+        period_start = func.date_trunc(
+            literal_column(f"'{interval}'"), EvaluationStatsRollup.bucket_start
+        )
+        query = select(
+            period_start,
+            EvaluationStatsRollup.status,
+            EvaluationStatsRollup.result,
+            EvaluationStatsRollup.duration_bucket,
+            func.sum(EvaluationStatsRollup.count),
+            func.sum(EvaluationStatsRollup.duration_sum),
+        )
+        if pipeline_id:
+            query = query.where(EvaluationStatsRollup.pipeline_id == pipeline_id)
+        if finished_after is not None:
+            query = query.where(
+                EvaluationStatsRollup.bucket_start
+                >= func.date_trunc("hour", finished_after)
+            )
+        if finished_before is not None:
+            query = query.where(EvaluationStatsRollup.bucket_start < finished_before)
+        query = query.group_by(
+            period_start,
+            EvaluationStatsRollup.status,
+            EvaluationStatsRollup.result,
+            EvaluationStatsRollup.duration_bucket,
+        ).order_by(period_start)
+
+        periods = defaultdict(
+            lambda: {
+                "count": 0,
+                "byStatus": {status.value: 0 for status in ApplicationEvaluationStatus},
+                "byResult": {result.value: 0 for result in EvaluationResult},
+                "durationCount": 0,
+                "durationSum": 0.0,
+                "durationHistogram": [0] * (len(DURATION_BUCKET_BOUNDS) + 1),
+            }
+        )
+        rows = session.execute(query).all()
+        for start, status, result, duration_bucket, count, duration_sum in rows:
+            period = periods[start]
+            period["count"] += count
+            period["byStatus"][status.value] += count
+            if result != _NO_RESULT:
+                period["byResult"][result] += count
+            if duration_bucket != _NO_DURATION_BUCKET:
+                period["durationCount"] += count
+                period["durationSum"] += duration_sum
+                period["durationHistogram"][duration_bucket] += count
+
+        return [
+            self.__to_timeseries_entry(start, period)
+            for start, period in periods.items()
+        ]
+
+    @staticmethod
+    def __to_timeseries_entry(start: datetime, period: dict) -> dict:
+        with_result = sum(period["byResult"].values())
+        approved = period["byResult"][EvaluationResult.APPROVED.value]
+        duration_count = period["durationCount"]
+
+        lower_bounds = [0.0] + DURATION_BUCKET_BOUNDS
+        upper_bounds = DURATION_BUCKET_BOUNDS + [None]
+
+        return {
+            "periodStart": start.isoformat(),
+            "count": period["count"],
+            "byStatus": period["byStatus"],
+            "byResult": period["byResult"],
+            "approvalRate": approved / with_result if with_result else None,
+            "averageDuration": (
+                period["durationSum"] / duration_count if duration_count else 0.0
+            ),
+            "durationHistogram": [
+                {"lowerBound": lower, "upperBound": upper, "count": count}
+                for lower, upper, count in zip(
+                    lower_bounds, upper_bounds, period["durationHistogram"]
+                )
+            ],
+        }
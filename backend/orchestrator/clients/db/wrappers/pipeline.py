@@ -1,12 +1,19 @@
 from typing import Optional
 from uuid import uuid4
 
-from pyutils.database.sqlalchemy.filters import InListFilter
-
-from orchestrator.clients.db.schema import Pipeline, PipelineVersion
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects.postgresql import JSONB
+
+from orchestrator.clients.db.schema import (
+    PIPELINE_STEP_TYPES_PATH,
+    Pipeline,
+    PipelineVersion,
+)
 from orchestrator.clients.db.wrappers.base import BaseDBWrapper
-from orchestrator.resources.types import PipelineStatus
+from orchestrator.resources.types import PipelineStatus, PipelineStepType
+from orchestrator.utils.caching import compiled_pipelines_cache
 from orchestrator.utils.logging import log_execution_time
+from orchestrator.utils.pagination import Page, PageCursor
 
 
 class PipelinesDBWrapper(BaseDBWrapper):
@@ -22,6 +29,7 @@ class PipelinesDBWrapper(BaseDBWrapper):
         version_number: int,
         steps: dict,
         react_flow_nodes: dict = None,
+        previous_version_id: Optional[str] = None,
     ) -> PipelineVersion:
         pipeline_version_id = str(uuid4())
         pipeline_version = self._create_and_upsert_model(
@@ -30,6 +38,7 @@ class PipelinesDBWrapper(BaseDBWrapper):
             version_number=version_number,
             steps=steps,
             react_flow_nodes=react_flow_nodes,
+            previous_version_id=previous_version_id,
         )
         return pipeline_version
 
@@ -63,22 +72,35 @@ class PipelinesDBWrapper(BaseDBWrapper):
         self,
         status_in: Optional[list[str]] = None,
         status_not_in: Optional[list[str]] = None,
-    ) -> list[Pipeline]:
-        filters = []
+        step_type: Optional[PipelineStepType] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[PageCursor] = None,
+    ) -> Page[Pipeline]:
+        conditions = []
 
         if status_in:
-            filters.append(InListFilter(self.model_class.status, status_in))
+            conditions.append(self.model_class.status.in_(status_in))
 
         if status_not_in:
-            filters.append(
-                InListFilter(self.model_class.status, status_not_in, negated=True)
+            conditions.append(self.model_class.status.not_in(status_not_in))
+
+        if step_type is not None:
+            # Same expression as the GIN index on the versions' step types, the
+            # path is inlined so that the planner can match it
+            step_types = func.jsonb_path_query_array(
+                PipelineVersion.steps,
+                literal(PIPELINE_STEP_TYPES_PATH, literal_execute=True),
+                type_=JSONB,
+            )
+            conditions.append(
+                self.model_class.current_version_id.in_(
+                    select(PipelineVersion.id).where(
+                        step_types.contains([step_type.value])
+                    )
+                )
             )
 
-        return self._get_with_filters(
-            model_class=self.model_class,
-            filters=filters,
-            return_type=self.GetResultType.ALL,
-        )
+        return self._get_page(conditions, limit=limit, cursor=cursor)
 
     def __should_update(self, pipeline: Pipeline, **kwargs) -> bool:
         if all(value is None for value in kwargs.values()):
@@ -117,19 +139,32 @@ class PipelinesDBWrapper(BaseDBWrapper):
         if not should_update:
             return pipeline
 
-        if steps is not None and steps != pipeline.current_version.steps:
-            # We need to create a new version
-            version = pipeline.current_version.version_number + 1
+        current_version = pipeline.current_version
+        steps_changed = steps is not None and steps != current_version.steps
+        nodes_changed = (
+            react_flow_nodes is not None
+            and react_flow_nodes != current_version.react_flow_nodes
+        )
+        if steps_changed or nodes_changed:
+            # Versions are never edited once created, as evaluations point at
+            # the one they ran with: any change to the nodes makes a new one
             new_version = self._create_pipeline_version(
-                version_number=version,
-                steps=steps,
+                version_number=current_version.version_number + 1,
+                steps=steps if steps_changed else current_version.steps,
+                react_flow_nodes=(
+                    react_flow_nodes
+                    if nodes_changed
+                    else current_version.react_flow_nodes
+                ),
+                previous_version_id=current_version.id,
             )
             pipeline.current_version_id = new_version.id
             pipeline.current_version = new_version
 
-        if react_flow_nodes is not None:
-            pipeline.current_version.react_flow_nodes = react_flow_nodes
-            self._upsert_model(pipeline.current_version)
+            # Older versions of this pipeline are only loaded again to show the
+            # evaluations that ran with them, not worth keeping compiled
+            pipeline_id = str(pipeline.id)
+            compiled_pipelines_cache.invalidate(lambda key: key[0] == pipeline_id)
 
         if name is not None:
             pipeline.name = name
@@ -0,0 +1,154 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from time import monotonic
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+from orchestrator.utils.logging import logger
+
+# A batch is sent as soon as it is full, or once its oldest request has been
+# waiting for `max_wait_seconds`, whichever comes first.
+_MAX_BATCH_SIZE = 20
+_MAX_WAIT_SECONDS = 0.05
+_MAX_BATCHES_IN_FLIGHT = 4
+
+
+class _PendingClassification(NamedTuple):
+    text: str
+    future: Future
+    enqueued_at: float
+
+
+class ClassificationBatcher:
+    """
+    Groups classification requests made by concurrent evaluations into batches.
+
+    `classify` blocks the calling thread until its text has been classified as
+    part of a batch. Batches are sent through `classify_batch`, which receives
+    the texts and the model and must return one result per text, in order.
+    When a batch fails, each of its texts is sent again on its own.
+    Requests for different models are never mixed in the same batch.
+    """
+
+    def __init__(
+        self,
+        classify_batch: Callable[[List[str], object], List[object]],
+        max_batch_size: int = _MAX_BATCH_SIZE,
+        max_wait_seconds: float = _MAX_WAIT_SECONDS,
+        max_batches_in_flight: int = _MAX_BATCHES_IN_FLIGHT,
+    ):
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size must be a positive integer")
+
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+
+        self.__classify_batch = classify_batch
+        self.__pending: Dict[object, List[_PendingClassification]] = {}
+        self.__condition = threading.Condition()
+        self.__executor = ThreadPoolExecutor(
+            max_workers=max_batches_in_flight,
+            thread_name_prefix="classification-batch",
+        )
+        self.__collector = None
+
+        self.batches_sent = 0
+        self.texts_sent = 0
+        self.requests = 0
+
+    def classify(self, text: str, model) -> object:
+        future = Future()
+        with self.__condition:
+            self.__pending.setdefault(model, []).append(
+                _PendingClassification(text, future, monotonic())
+            )
+            self.requests += 1
+            self.__ensure_collector()
+            self.__condition.notify()
+
+        return future.result()
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "batchesSent": self.batches_sent,
+            "textsSent": self.texts_sent,
+            "averageBatchSize": (
+                self.texts_sent / self.batches_sent if self.batches_sent else 0.0
+            ),
+        }
+
+    def __ensure_collector(self) -> None:
+        if self.__collector is not None and self.__collector.is_alive():
+            return
+
+        self.__collector = threading.Thread(
+            target=self.__collect,
+            name="classification-batcher",
+            daemon=True,
+        )
+        self.__collector.start()
+
+    def __collect(self) -> None:
+        while True:
+            with self.__condition:
+                model, batch = self.__wait_for_batch()
+            self.__executor.submit(self.__send, model, batch)
+
+    def __wait_for_batch(self) -> Tuple[object, List[_PendingClassification]]:
+        # Must be called while holding the condition
+        while True:
+            if not self.__pending:
+                self.__condition.wait()
+                continue
+
+            model, requests = min(
+                self.__pending.items(), key=lambda item: item[1][0].enqueued_at
+            )
+            remaining = requests[0].enqueued_at + self.max_wait_seconds - monotonic()
+            if len(requests) < self.max_batch_size and remaining > 0:
+                self.__condition.wait(timeout=remaining)
+                continue
+
+            size = self.max_batch_size
+            batch, rest = requests[:size], requests[size:]
+            if rest:
+                self.__pending[model] = rest
+            else:
+                del self.__pending[model]
+
+            return model, batch
+
+    def __send(self, model, batch: List[_PendingClassification]) -> None:
+        # Identical texts in the same batch are only classified once
+        texts = list(dict.fromkeys(request.text for request in batch))
+
+        try:
+            results = self.__classify_batch(texts, model)
+            if len(results) != len(texts):
+                raise ValueError(
+                    f"Expected {len(texts)} classification results, got "
+                    f"{len(results)}."
+                )
+        except Exception as err:
+            logger.exception(f"Failed to classify a batch of {len(texts)} texts")
+            if len(texts) == 1:
+                for request in batch:
+                    request.future.set_exception(err)
+                return
+
+            # Retried text by text, so one failure doesn't fail every caller
+            for text in texts:
+                self.__executor.submit(
+                    self.__send,
+                    model,
+                    [request for request in batch if request.text == text],
+                )
+            return
+
+        with self.__condition:
+            self.batches_sent += 1
+            self.texts_sent += len(texts)
+
+        results_by_text = dict(zip(texts, results))
+        for request in batch:
+            request.future.set_result(results_by_text[request.text])
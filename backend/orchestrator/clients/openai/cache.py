@@ -0,0 +1,112 @@
+import hashlib
+import threading
+from datetime import timedelta
+from typing import Optional
+
+from orchestrator.clients.db.wrappers.classification import ClassificationsDBWrapper
+from orchestrator.utils.caching import LRUCache
+from orchestrator.utils.logging import logger
+
+_MEMORY_CACHE_MAX_SIZE = 10000
+_MEMORY_CACHE_TTL = timedelta(hours=1)
+_DATABASE_CACHE_TTL = timedelta(days=30)
+
+# Expired rows are purged from the database once every this many writes
+_DATABASE_EVICTION_INTERVAL = 1000
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class ClassificationCache:
+    """
+    Two-tier cache of classification results.
+
+    Lookups go to an in-memory LRU first and then to the
+    `sentiment_classifications` table. Entries are keyed by the hash of the
+    normalised text, the model and the prompt version, so changing either of
+    the last two never serves stale results.
+    """
+
+    def __init__(self, prompt_version: int):
+        self.prompt_version = prompt_version
+
+        self.__memory_cache = LRUCache(
+            name="sentiment_classifications",
+            max_size=_MEMORY_CACHE_MAX_SIZE,
+            ttl_seconds=_MEMORY_CACHE_TTL.total_seconds(),
+        )
+        self.__db_wrapper = ClassificationsDBWrapper()
+
+        self.__lock = threading.Lock()
+        self.__database_hits = 0
+        self.__database_misses = 0
+        self.__writes = 0
+
+    def get(self, text: str, model: str) -> Optional[str]:
+        key = (hash_text(text), model, self.prompt_version)
+
+        result = self.__memory_cache.get(key)
+        if result is not None:
+            return result
+
+        try:
+            classification = self.__db_wrapper.get_classification(*key)
+        except Exception as err:
+            logger.warning(f"Failed to read cached sentiment classification: {err}")
+            classification = None
+
+        with self.__lock:
+            if classification is None:
+                self.__database_misses += 1
+                return None
+            self.__database_hits += 1
+
+        self.__memory_cache.put(key, classification.result)
+        return classification.result
+
+    def put(self, text: str, model: str, result: str) -> None:
+        key = (hash_text(text), model, self.prompt_version)
+        self.__memory_cache.put(key, result)
+
+        try:
+            self.__db_wrapper.save_classification(
+                *key, result=result, ttl=_DATABASE_CACHE_TTL
+            )
+        except Exception as err:
+            logger.warning(f"Failed to store sentiment classification: {err}")
+            return
+
+        with self.__lock:
+            self.__writes += 1
+            should_evict = self.__writes % _DATABASE_EVICTION_INTERVAL == 0
+
+        if should_evict:
+            self.evict_expired()
+
+    def evict_expired(self) -> None:
+        try:
+            deleted = self.__db_wrapper.delete_expired_classifications()
+            logger.info(f"Deleted {deleted} expired sentiment classifications")
+        except Exception as err:
+            logger.warning(f"Failed to delete expired classifications: {err}")
+
+    def stats(self) -> dict:
+        memory_stats = self.__memory_cache.stats()
+        lookups = memory_stats["hits"] + memory_stats["misses"]
+        hits = memory_stats["hits"] + self.__database_hits
+
+        return {
+            "memory": memory_stats,
+            "database": {
+                "hits": self.__database_hits,
+                "misses": self.__database_misses,
+                "writes": self.__writes,
+            },
+            "hitRate": hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,371 @@
+"""
+Manage the monthly partitions of the application evaluations table.
+
+    python -m orchestrator.partitions create --months-ahead 3
+    python -m orchestrator.partitions list
+    python -m orchestrator.partitions archive --older-than 12 \
+        --archive-dir /var/backups/evaluations
+    python -m orchestrator.partitions restore \
+        /var/backups/evaluations/application_evaluations_p202401.json
+
+Run `create` at least once a month, e.g. from cron, so evaluations never land
+in the default partition. `archive` detaches the partitions of months older
+than `--older-than` months, writes each to a gzip compressed CSV file next to a
+JSON manifest, and drops it. `restore` loads an archive back and re-attaches
+it, e.g. for an audit; archive it again once done.
+
+Archived evaluations are no longer returned by the API, but remain counted in
+the evaluation statistics rollups.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import Connection, text
+
+from orchestrator.clients.db.session_manager import (
+    get_session_manager,
+    shutdown_session_manager,
+)
+from orchestrator.utils.logging import logger
+
+_TABLE = "application_evaluations"
+_DEFAULT_PARTITION = f"{_TABLE}_default"
+_PARTITION_NAME = re.compile(rf"^{_TABLE}_p(\d{{6}})$")
+_COLUMN_NAME = re.compile(r"^[a-z_][a-z0-9_]*$")
+_PARTITION_BOUND = re.compile(r"^FOR VALUES FROM \('[^']+'\) TO \('[^']+'\)$")
+
+_DEFAULT_MONTHS_AHEAD = 3
+
+# Bounds of the current month and the `months_ahead` following ones. Months
+# start at midnight in the database's time zone, as `date_trunc` does.
+_UPCOMING_MONTHS = text("""
+    SELECT to_char(month, 'YYYYMM'), month, month + interval '1 month'
+    FROM generate_series(
+        date_trunc('month', now()),
+        date_trunc('month', now()) + make_interval(months => :months_ahead),
+        interval '1 month'
+    ) AS month
+    """)
+
+_PARTITIONS = text("""
+    SELECT
+        child.relname,
+        pg_get_expr(child.relpartbound, child.oid),
+        child.reltuples::bigint,
+        pg_total_relation_size(child.oid)
+    FROM pg_inherits
+    JOIN pg_class AS parent ON parent.oid = pg_inherits.inhparent
+    JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid
+    WHERE parent.relname = :table
+    ORDER BY child.relname
+    """)
+
+_COLUMNS = text("""
+    SELECT column_name FROM information_schema.columns
+    WHERE table_schema = current_schema() AND table_name = :table
+    ORDER BY ordinal_position
+    """)
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _monthly_partitions(connection: Connection) -> List[tuple]:
+    """(name, month as YYYYMM, bound) of the attached monthly partitions."""
+    partitions = []
+    for name, bound, _, _ in connection.execute(_PARTITIONS, {"table": _TABLE}):
+        match = _PARTITION_NAME.match(name)
+        if match:
+            partitions.append((name, match.group(1), bound))
+    return partitions
+
+
+def create_partitions(months_ahead: int) -> List[str]:
+    """
+    Create the partitions of the current month and the `months_ahead` next
+    ones that don't exist yet. Returns the names of those created.
+
+    Evaluations of these months that landed in the default partition are moved
+    to the new partition.
+    """
+    engine = get_session_manager().engine
+    with engine.connect() as connection:
+        months = connection.execute(
+            _UPCOMING_MONTHS, {"months_ahead": months_ahead}
+        ).all()
+        existing = {name for name, _, _ in _monthly_partitions(connection)}
+
+    created = []
+    for suffix, start, end in months:
+        name = f"{_TABLE}_p{suffix}"
+        if name in existing:
+            continue
+
+        with engine.begin() as connection:
+            connection.execute(
+                text(f"CREATE TABLE {name} (LIKE {_TABLE} INCLUDING DEFAULTS)")
+            )
+            moved = connection.execute(
+                text(f"""
+                    WITH moved AS (
+                        DELETE FROM {_DEFAULT_PARTITION}
+                        WHERE created_at >= :start AND created_at < :end
+                        RETURNING *
+                    )
+                    INSERT INTO {name} SELECT * FROM moved
+                    """),
+                {"start": start, "end": end},
+            ).rowcount
+            connection.execute(
+                text(
+                    f"ALTER TABLE {_TABLE} ATTACH PARTITION {name} "
+                    f"FOR VALUES FROM ('{start.isoformat()}') "
+                    f"TO ('{end.isoformat()}')"
+                )
+            )
+
+        logger.info(f"Created partition {name}, moving {moved} evaluations into it")
+        created.append(name)
+
+    return created
+
+
+def list_partitions() -> List[dict]:
+    engine = get_session_manager().engine
+    with engine.connect() as connection:
+        return [
+            {
+                "name": name,
+                "bound": bound,
+                "estimatedRows": max(estimated_rows, 0),
+                "sizeBytes": size,
+            }
+            for name, bound, estimated_rows, size in connection.execute(
+                _PARTITIONS, {"table": _TABLE}
+            )
+        ]
+
+
+def archive_partitions(
+    older_than_months: int, archive_dir: str, dry_run: bool = False
+) -> List[str]:
+    """
+    Archive the monthly partitions of months at least `older_than_months`
+    before the current one. Returns the paths of the manifests written.
+    """
+    engine = get_session_manager().engine
+    with engine.connect() as connection:
+        cutoff = connection.scalar(
+            text(
+                "SELECT to_char(date_trunc('month', now()) "
+                "- make_interval(months => :months), 'YYYYMM')"
+            ),
+            {"months": older_than_months},
+        )
+        partitions = [
+            (name, bound)
+            for name, month, bound in _monthly_partitions(connection)
+            if month < cutoff
+        ]
+
+    if dry_run:
+        for name, bound in partitions:
+            logger.info(f"Would archive partition {name} ({bound})")
+        return []
+
+    os.makedirs(archive_dir, exist_ok=True)
+    return [_archive_partition(name, bound, archive_dir) for name, bound in partitions]
+
+
+def _archive_partition(name: str, bound: str, archive_dir: str) -> str:
+    engine = get_session_manager().engine
+    data_path = os.path.join(archive_dir, f"{name}.csv.gz")
+    manifest_path = os.path.join(archive_dir, f"{name}.json")
+
+    # Detached first, so no evaluation changes while it is being written out
+    with engine.begin() as connection:
+        connection.execute(text(f"ALTER TABLE {_TABLE} DETACH PARTITION {name}"))
+    logger.info(f"Detached partition {name}")
+
+    try:
+        with engine.begin() as connection:
+            columns = connection.scalars(_COLUMNS, {"table": name}).all()
+            rows = connection.scalar(text(f"SELECT count(*) FROM {name}"))
+
+            partial_path = f"{data_path}.partial"
+            with gzip.open(partial_path, "wb") as file:
+                with connection.connection.cursor() as cursor:
+                    cursor.copy_expert(
+                        f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)", file
+                    )
+            os.replace(partial_path, data_path)
+
+            manifest = {
+                "partition": name,
+                "bound": bound,
+                "columns": columns,
+                "rows": rows,
+                "file": os.path.basename(data_path),
+                "sha256": _sha256(data_path),
+                "archivedAt": datetime.now(tz=timezone.utc).isoformat(),
+            }
+            with open(manifest_path, "w") as file:
+                json.dump(manifest, file, indent=2)
+                file.flush()
+                os.fsync(file.fileno())
+
+            connection.execute(text(f"DROP TABLE {name}"))
+    except Exception:
+        logger.exception(f"Failed to archive partition {name}, attaching it back")
+        with engine.begin() as connection:
+            connection.execute(
+                text(f"ALTER TABLE {_TABLE} ATTACH PARTITION {name} {bound}")
+            )
+        raise
+
+    logger.info(f"Archived {rows} evaluations of partition {name} to {data_path}")
+    return manifest_path
+
+
+def restore_partition(manifest_path: str) -> str:
+    """
+    Load an archived partition back and attach it. Returns its name.
+
+    Raises ValueError if the manifest or its data file is not a valid archive.
+    """
+    with open(manifest_path) as file:
+        manifest = json.load(file)
+
+    name = manifest.get("partition", "")
+    bound = manifest.get("bound", "")
+    columns = manifest.get("columns", [])
+    if (
+        not _PARTITION_NAME.match(name)
+        or not _PARTITION_BOUND.match(bound)
+        or not all(_COLUMN_NAME.match(column) for column in columns)
+    ):
+        raise ValueError(f"{manifest_path} is not a partition archive manifest")
+
+    data_path = os.path.join(os.path.dirname(manifest_path), manifest["file"])
+    if _sha256(data_path) != manifest["sha256"]:
+        raise ValueError(f"{data_path} does not match its manifest's checksum")
+
+    engine = get_session_manager().engine
+    with engine.begin() as connection:
+        connection.execute(
+            text(f"CREATE TABLE {name} (LIKE {_TABLE} INCLUDING DEFAULTS)")
+        )
+        with gzip.open(data_path, "rb") as file:
+            with connection.connection.cursor() as cursor:
+                cursor.copy_expert(
+                    f"COPY {name} ({', '.join(columns)}) "
+                    "FROM STDIN WITH (FORMAT csv, HEADER)",
+                    file,
+                )
+
+        rows = connection.scalar(text(f"SELECT count(*) FROM {name}"))
+        if rows != manifest["rows"]:
+            raise ValueError(
+                f"Loaded {rows} evaluations from {data_path}, expected "
+                f"{manifest['rows']}"
+            )
+
+        connection.execute(
+            text(f"ALTER TABLE {_TABLE} ATTACH PARTITION {name} {bound}")
+        )
+
+    logger.info(f"Restored {rows} evaluations into partition {name}")
+    return name
+
+
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Manage the monthly partitions of application evaluations."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    create = commands.add_parser(
+        "create", help="Create the partitions of the upcoming months"
+    )
+    create.add_argument(
+        "--months-ahead",
+        type=int,
+        default=_DEFAULT_MONTHS_AHEAD,
+        help="Number of months after the current one to create partitions for",
+    )
+
+    commands.add_parser("list", help="List the attached partitions")
+
+    archive = commands.add_parser(
+        "archive", help="Detach, archive and drop the partitions of old months"
+    )
+    archive.add_argument(
+        "--older-than",
+        type=int,
+        required=True,
+        help="Archive the months at least this many months before the current one",
+    )
+    archive.add_argument(
+        "--archive-dir",
+        required=True,
+        help="Directory the archives and their manifests are written to",
+    )
+    archive.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only log the partitions that would be archived",
+    )
+
+    restore = commands.add_parser(
+        "restore", help="Load an archived partition back and attach it"
+    )
+    restore.add_argument("manifest", help="Path of the archive's JSON manifest")
+
+    args = parser.parse_args(argv)
+    if args.command == "create" and args.months_ahead < 0:
+        parser.error("--months-ahead can't be negative")
+    if args.command == "archive" and args.older_than < 1:
+        parser.error("--older-than must be at least 1, the current month is kept")
+
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = _parse_args(argv)
+
+    try:
+        if args.command == "create":
+            create_partitions(months_ahead=args.months_ahead)
+        elif args.command == "list":
+            for partition in list_partitions():
+                print(
+                    f"{partition['name']:<40} {partition['estimatedRows']:>12} rows "
+                    f"{partition['sizeBytes'] / 1024 / 1024:>10.1f} MiB   "
+                    f"{partition['bound']}"
+                )
+        elif args.command == "archive":
+            archive_partitions(
+                older_than_months=args.older_than,
+                archive_dir=args.archive_dir,
+                dry_run=args.dry_run,
+            )
+        elif args.command == "restore":
+            restore_partition(args.manifest)
+    finally:
+        shutdown_session_manager()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,14 @@
+import dataclasses
+from datetime import datetime
 from typing import Optional
 
+from sqlalchemy import Row
+
 from orchestrator.clients.db.schema import (
     ApplicationEvaluation as ApplicationEvaluationDAO,
 )
 from orchestrator.resources.application import Application
-from orchestrator.resources.pipeline.pipeline import Pipeline
+from orchestrator.resources.pipeline.pipeline import Pipeline, is_compact_run_log
 from orchestrator.resources.types import ApplicationEvaluationStatus, EvaluationResult
 
 
@@ -17,18 +21,35 @@ class Evaluation:
         status: ApplicationEvaluationStatus,
         result: Optional[EvaluationResult] = None,
         details: Optional[dict] = None,
+        details_pipeline: Optional[Pipeline] = None,
     ):
+        """
+        `details` are stored as is, with run logs only holding the trace of the
+        run. `details_pipeline` is the pipeline at the version that ran, which
+        the full run log is rebuilt from.
+        """
         self.id_ = id_
         self.application = application
         self.pipeline = pipeline
         self.status = status
         self.result = result
         self.details = details
+        self.details_pipeline = details_pipeline
 
     @classmethod
     def from_dao(cls, dao: ApplicationEvaluationDAO) -> "Evaluation":
         application = Application.from_dao(dao.application)
         pipeline = Pipeline.from_dao(dao.pipeline)
+
+        details_pipeline = None
+        if dao.pipeline_version_id is not None:
+            if str(dao.pipeline_version_id) == pipeline.version_id:
+                details_pipeline = pipeline
+            else:
+                details_pipeline = Pipeline.from_dao(
+                    dao.pipeline, version=dao.pipeline_version
+                )
+
         return cls(
             id_=dao.id,
             application=application,
@@ -36,8 +57,16 @@ class Evaluation:
             status=dao.status,
             result=dao.result,
             details=dao.details,
+            details_pipeline=details_pipeline,
         )
 
+    @property
+    def full_details(self) -> Optional[dict]:
+        """The details, with the run log expanded to the steps and their results."""
+        if is_compact_run_log(self.details) and self.details_pipeline is not None:
+            return self.details_pipeline.expand_run_log(self.details)
+        return self.details
+
     def to_dict(self) -> dict:
         return {
             "evaluationId": self.id_,
@@ -45,10 +74,60 @@ class Evaluation:
             "pipeline": self.pipeline.to_dict(),
             "status": self.status.value,
             "result": self.result.value if self.result else None,
-            "details": self.details,
+            "details": self.full_details,
         }
 
     def run(self):
         self.pipeline.run_on_application(self.application)
         self.result = self.pipeline.run_result
         self.details = self.pipeline.run_log
+        self.details_pipeline = self.pipeline
+
+
+@dataclasses.dataclass
+class EvaluationSummary:
+    """What listing an evaluation needs, without rebuilding its pipeline."""
+
+    id_: str
+    status: ApplicationEvaluationStatus
+    result: Optional[EvaluationResult]
+    application_key: str
+    applicant_name: str
+    pipeline_id: str
+    pipeline_name: str
+    pipeline_version: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def from_row(cls, row: Row) -> "EvaluationSummary":
+        return cls(
+            id_=str(row.id),
+            status=row.status,
+            result=row.result,
+            application_key=row.application_key,
+            applicant_name=row.applicant_name,
+            pipeline_id=str(row.pipeline_id),
+            pipeline_name=row.pipeline_name,
+            pipeline_version=row.pipeline_version,
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "evaluationId": self.id_,
+            "application": {
+                "key": self.application_key,
+                "applicantName": self.applicant_name,
+            },
+            "pipeline": {
+                "id": self.pipeline_id,
+                "name": self.pipeline_name,
+                "version": self.pipeline_version,
+            },
+            "status": self.status.value,
+            "result": self.result.value if self.result else None,
+            "createdAt": self.created_at.isoformat() if self.created_at else None,
+            "updatedAt": self.updated_at.isoformat() if self.updated_at else None,
+        }
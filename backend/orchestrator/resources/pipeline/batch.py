@@ -0,0 +1,181 @@
+import dataclasses
+from typing import List, Optional
+
+import numpy as np
+from pyutils.helpers.errors import Error
+
+from orchestrator.resources.application import Application
+from orchestrator.resources.pipeline.program import PipelineProgram
+from orchestrator.resources.types import (
+    COUNTRY_CODES,
+    EvaluationResult,
+    PipelineStepType,
+)
+
+# Per-step outcome codes, as stored in `BatchEvaluationResult.step_outcomes`
+STEP_ERROR = -2
+STEP_NOT_EVALUATED = -1
+STEP_FAILED = 0
+STEP_PASSED = 1
+
+# Error of rows whose step divided by zero, as raised by the single
+# application path for the same application
+_DIVISION_BY_ZERO_ERROR = "float division by zero"
+
+_RESULT_CODES = {result: code for code, result in enumerate(EvaluationResult)}
+_RESULTS_BY_CODE = list(EvaluationResult)
+
+
+class BatchEvaluationError(Error):
+    _extension_details = {
+        "category": "server",
+        "code": "BatchEvaluationError",
+        "severity": "error",
+    }
+
+    def __init__(self, message: str):
+        super().__init__(f"BatchEvaluationError: {message}")
+
+
+@dataclasses.dataclass
+class ApplicationBatch:
+    amount: np.ndarray
+    monthly_income: np.ndarray
+    declared_debts: np.ndarray
+    country_code: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.amount)
+
+    @classmethod
+    def from_applications(cls, applications: List[Application]) -> "ApplicationBatch":
+        return cls(
+            amount=np.fromiter(
+                (app.amount for app in applications),
+                dtype=np.float64,
+                count=len(applications),
+            ),
+            monthly_income=np.fromiter(
+                (app.monthly_income for app in applications),
+                dtype=np.float64,
+                count=len(applications),
+            ),
+            declared_debts=np.fromiter(
+                (app.declared_debts for app in applications),
+                dtype=np.float64,
+                count=len(applications),
+            ),
+            country_code=np.fromiter(
+                (COUNTRY_CODES[app.country] for app in applications),
+                dtype=np.int32,
+                count=len(applications),
+            ),
+        )
+
+
+@dataclasses.dataclass
+class BatchEvaluationResult:
+    # None for rows that could not be evaluated, with the reason in `errors`
+    results: List[Optional[EvaluationResult]]
+    errors: List[Optional[str]]
+    # One array per instruction of the program, in the same order. Rows that
+    # never reached a step hold NaN as value and STEP_NOT_EVALUATED as outcome.
+    step_values: List[np.ndarray]
+    step_outcomes: List[np.ndarray]
+
+
+def evaluate_batch(
+    program: PipelineProgram, batch: ApplicationBatch
+) -> BatchEvaluationResult:
+    """
+    Run every application of the batch through the program at once.
+
+    Instructions are laid out in pre-order, so by the time an instruction is
+    reached all the rows routed to it by its parent are already known.
+
+    Rows dividing by zero in a step, which `PipelineProgram.run` raises
+    ZeroDivisionError for, stop there with STEP_ERROR as outcome, no result
+    and the same error message.
+    """
+    size = len(batch)
+    step_values = []
+    step_outcomes = []
+
+    if not isinstance(program.entry, int):
+        return BatchEvaluationResult(
+            results=[program.entry] * size,
+            errors=[None] * size,
+            step_values=step_values,
+            step_outcomes=step_outcomes,
+        )
+
+    result_codes = np.full(size, -1, dtype=np.int8)
+    failed_rows = np.zeros(size, dtype=bool)
+    rows_at = {program.entry: np.arange(size)}
+
+    for index, instruction in enumerate(program.instructions):
+        rows = rows_at.pop(index, None)
+
+        values = np.full(size, np.nan, dtype=np.float64)
+        outcomes = np.full(size, STEP_NOT_EVALUATED, dtype=np.int8)
+        step_values.append(values)
+        step_outcomes.append(outcomes)
+
+        if rows is None or not len(rows):
+            continue
+
+        divisors = []
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if instruction.kind == PipelineStepType.DTI_RULE:
+                divisors = [batch.monthly_income[rows]]
+                row_values = batch.declared_debts[rows] / batch.monthly_income[rows]
+                passed = row_values < instruction.threshold
+            elif instruction.kind == PipelineStepType.AMOUNT_POLICY_RULE:
+                caps = instruction.loan_caps.cap_vector
+                row_values = caps[batch.country_code[rows]]
+                passed = batch.amount[rows] <= row_values
+            elif instruction.kind == PipelineStepType.RISK_SCORING_RULE:
+                caps = instruction.loan_caps.cap_vector[batch.country_code[rows]]
+                divisors = [batch.monthly_income[rows], caps]
+                row_values = (
+                    batch.declared_debts[rows] / batch.monthly_income[rows] * 100
+                ) + (batch.amount[rows] / caps * 20)
+                passed = row_values <= instruction.threshold
+            else:
+                raise BatchEvaluationError(
+                    f"Step type {instruction.kind.value} can not be evaluated in "
+                    f"batches."
+                )
+
+        divided_by_zero = np.zeros(len(rows), dtype=bool)
+        for divisor in divisors:
+            divided_by_zero |= divisor == 0
+
+        values[rows] = np.where(divided_by_zero, np.nan, row_values)
+        outcomes[rows] = np.where(
+            divided_by_zero,
+            STEP_ERROR,
+            np.where(passed, STEP_PASSED, STEP_FAILED),
+        )
+        failed_rows[rows[divided_by_zero]] = True
+
+        rows, passed = rows[~divided_by_zero], passed[~divided_by_zero]
+
+        for target, target_rows in (
+            (instruction.pass_target, rows[passed]),
+            (instruction.fail_target, rows[~passed]),
+        ):
+            if isinstance(target, int):
+                rows_at[target] = target_rows
+            else:
+                result_codes[target_rows] = _RESULT_CODES[target]
+
+    return BatchEvaluationResult(
+        results=[
+            None if failed else _RESULTS_BY_CODE[code]
+            for code, failed in zip(result_codes, failed_rows)
+        ],
+        errors=[_DIVISION_BY_ZERO_ERROR if failed else None for failed in failed_rows],
+        step_values=step_values,
+        step_outcomes=step_outcomes,
+    )
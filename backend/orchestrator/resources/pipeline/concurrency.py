@@ -0,0 +1,72 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from orchestrator.resources.types import PipelineStepType
+
+# Maximum number of steps of each type evaluated at the same time by this
+# process. Step types that are not listed are never limited.
+_DEFAULT_STEP_CONCURRENCY_LIMITS = {
+    PipelineStepType.SENTIMENT_ANALYSIS_RULE: 8,
+}
+
+
+class StepConcurrencyLimiter:
+    """Caps how many steps of a given type run concurrently across threads."""
+
+    def __init__(self, limits: Dict[PipelineStepType, int]):
+        self.__lock = threading.Lock()
+        self.__semaphores: Dict[PipelineStepType, threading.BoundedSemaphore] = {}
+        self.__limits: Dict[PipelineStepType, int] = {}
+        self.__in_flight: Dict[PipelineStepType, int] = {}
+
+        self.configure(limits)
+
+    def configure(self, limits: Dict[PipelineStepType, int]) -> None:
+        """
+        Replace the configured limits.
+
+        Steps that already hold a slot keep it; only new steps see the new limits.
+        """
+        for step_type, limit in limits.items():
+            if limit <= 0:
+                raise ValueError(
+                    f"Concurrency limit for {step_type.value} must be a positive "
+                    f"integer"
+                )
+
+        with self.__lock:
+            self.__limits = dict(limits)
+            self.__semaphores = {
+                step_type: threading.BoundedSemaphore(limit)
+                for step_type, limit in limits.items()
+            }
+
+    @contextmanager
+    def limit(self, step_type: PipelineStepType) -> Iterator[None]:
+        semaphore = self.__semaphores.get(step_type)
+        if semaphore is None:
+            yield
+            return
+
+        with semaphore:
+            with self.__lock:
+                self.__in_flight[step_type] = self.__in_flight.get(step_type, 0) + 1
+            try:
+                yield
+            finally:
+                with self.__lock:
+                    self.__in_flight[step_type] -= 1
+
+    def stats(self) -> dict:
+        with self.__lock:
+            return {
+                step_type.value: {
+                    "limit": limit,
+                    "inFlight": self.__in_flight.get(step_type, 0),
+                }
+                for step_type, limit in self.__limits.items()
+            }
+
+
+step_concurrency_limiter = StepConcurrencyLimiter(_DEFAULT_STEP_CONCURRENCY_LIMITS)
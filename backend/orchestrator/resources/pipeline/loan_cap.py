@@ -1,6 +1,9 @@
 import dataclasses
+from typing import Optional
 
-from orchestrator.resources.types import Country
+import numpy as np
+
+from orchestrator.resources.types import COUNTRY_CODES, Country
 
 
 @dataclasses.dataclass
@@ -23,11 +26,27 @@ class LoanCaps(list):
         super().__init__(caps)
         self.other = other
 
+        # The first cap listed for a country wins, same as a linear scan would.
+        self.__caps_by_country: dict[Country, float] = {}
+        for cap in caps:
+            self.__caps_by_country.setdefault(cap.country, cap.cap_amount)
+
+        self.__cap_vector: Optional[np.ndarray] = None
+
     def get_cap_for_country(self, country: Country) -> float:
-        for cap in self:
-            if cap.is_applicable_to(country):
-                return cap.cap_amount
-        return self.other
+        return self.__caps_by_country.get(country, self.other)
+
+    @property
+    def cap_vector(self) -> np.ndarray:
+        """Dense cap per country, indexed by the country codes in `COUNTRY_CODES`."""
+        if self.__cap_vector is None:
+            cap_vector = np.full(len(COUNTRY_CODES), self.other, dtype=np.float64)
+            for country, cap_amount in self.__caps_by_country.items():
+                cap_vector[COUNTRY_CODES[country]] = cap_amount
+            cap_vector.flags.writeable = False
+            self.__cap_vector = cap_vector
+
+        return self.__cap_vector
 
     def to_dicts(self) -> list[dict]:
         result = [cap.to_dict() for cap in self]
@@ -1,14 +1,36 @@
 from datetime import datetime
-from time import time
-from typing import Optional
+from time import perf_counter
+from typing import Iterable, List, Optional, Tuple
 
 from orchestrator.clients.db.schema import Pipeline as PipelineDAO
+from orchestrator.clients.db.schema import PipelineVersion as PipelineVersionDAO
 from orchestrator.resources.application import Application
+from orchestrator.resources.pipeline.batch import (
+    STEP_ERROR,
+    STEP_FAILED,
+    STEP_PASSED,
+    ApplicationBatch,
+    BatchEvaluationResult,
+    evaluate_batch,
+)
+from orchestrator.resources.pipeline.program import PipelineProgram
 from orchestrator.resources.pipeline.step import PipelineStep
+from orchestrator.resources.pipeline.trace import ExecutionTrace
 from orchestrator.resources.types import EvaluationResult, PipelineStatus
+from orchestrator.utils.caching import compiled_pipelines_cache
 from orchestrator.utils.parsing import parse_pipeline_step
 
 
+def is_compact_run_log(details: Optional[dict]) -> bool:
+    """Whether evaluation details hold a run log that only records the trace."""
+    return bool(details) and "trace" in details and "eval" not in details
+
+
+def _parse_and_compile(steps: dict) -> Tuple[PipelineStep, PipelineProgram]:
+    root_step = parse_pipeline_step(steps)
+    return root_step, PipelineProgram.compile(root_step)
+
+
 class Pipeline:
     def __init__(
         self,
@@ -21,6 +43,8 @@ class Pipeline:
         react_flow_nodes: dict,
         created_at: datetime,
         updated_at: datetime,
+        program: Optional[PipelineProgram] = None,
+        version_id: Optional[str] = None,
     ):
         self.id_ = id_
         self.name = name
@@ -31,18 +55,79 @@ class Pipeline:
         self.react_flow_nodes = react_flow_nodes
         self.created_at = created_at
         self.updated_at = updated_at
+        self.version_id = version_id
 
         self.run_result: Optional[EvaluationResult] = None
+        self.run_trace: Optional[ExecutionTrace] = None
         self.run_time: float = 0.0
 
+        self.__program = program
+
+    @property
+    def program(self) -> PipelineProgram:
+        if self.__program is None:
+            self.__program = PipelineProgram.compile(self.root_step)
+        return self.__program
+
     def run_on_application(self, application: Application) -> EvaluationResult:
-        start_time = time()
-        self.run_result = self.root_step.execute(application)
-        end_time = time()
+        start_time = perf_counter()
+        self.run_result, self.run_trace = self.program.run(application)
+        end_time = perf_counter()
         self.run_time = end_time - start_time
 
         return self.run_result
 
+    def run_on_batch(self, batch: ApplicationBatch) -> BatchEvaluationResult:
+        return evaluate_batch(self.program, batch)
+
+    def backtest(self, application_batches: Iterable[List[Application]]) -> dict:
+        """
+        Run the pipeline on batches of applications, without recording
+        anything, and count the results and the outcomes of every step.
+
+        Steps are listed in the order of the compiled program. Raises
+        BatchEvaluationError if a step can't be evaluated in batches.
+        """
+        instructions = self.program.instructions
+        by_result = {result.value: 0 for result in EvaluationResult}
+        step_counts = [{"passed": 0, "failed": 0, "errors": 0} for _ in instructions]
+        applications = 0
+        errors = 0
+
+        for applications_batch in application_batches:
+            batch_result = self.run_on_batch(
+                ApplicationBatch.from_applications(applications_batch)
+            )
+            applications += len(applications_batch)
+            for result in batch_result.results:
+                if result is None:
+                    errors += 1
+                else:
+                    by_result[result.value] += 1
+            for counts, outcomes in zip(step_counts, batch_result.step_outcomes):
+                counts["passed"] += int((outcomes == STEP_PASSED).sum())
+                counts["failed"] += int((outcomes == STEP_FAILED).sum())
+                counts["errors"] += int((outcomes == STEP_ERROR).sum())
+
+        return {
+            "pipelineId": self.id_,
+            "version": self.version,
+            "applications": applications,
+            "byResult": by_result,
+            "errors": errors,
+            "steps": [
+                {
+                    "index": index,
+                    "flowNodeId": instruction.step.flow_node_id,
+                    "type": instruction.kind.value,
+                    **counts,
+                }
+                for index, (instruction, counts) in enumerate(
+                    zip(instructions, step_counts)
+                )
+            ],
+        }
+
     def to_dict(self) -> dict:
         return {
             "id": self.id_,
@@ -58,6 +143,12 @@ class Pipeline:
 
     @property
     def run_log(self) -> Optional[dict]:
+        """
+        What is stored of the last run: the path taken through the steps,
+        rather than the steps themselves, which the pipeline version holds.
+
+        Use `expand_run_log` on the pipeline at that version to get the full log.
+        """
         if self.run_result is None:
             return None
 
@@ -67,24 +158,49 @@ class Pipeline:
                 "version": self.version,
                 "description": self.description,
             },
-            "steps": self.root_step.to_dict(),
-            "reactFlowNodes": self.react_flow_nodes,
-            "eval": self.root_step.get_evaluation_result(),
+            "trace": self.run_trace.encode(),
             "run_result": self.run_result.value,
             "run_duration": self.run_time,
         }
 
+    def expand_run_log(self, run_log: dict) -> dict:
+        """
+        Rebuild the full log of a run of this pipeline from its `run_log`.
+
+        The encoded trace is kept next to the nested evaluation result it was
+        expanded to, for consumers that only need the path taken.
+        """
+        trace = ExecutionTrace.decode(run_log["trace"])
+        return {
+            "pipeline": run_log["pipeline"],
+            "steps": self.root_step.to_dict(),
+            "reactFlowNodes": self.react_flow_nodes,
+            "eval": trace.to_evaluation_result(self.root_step),
+            "trace": run_log["trace"],
+            "run_result": run_log["run_result"],
+            "run_duration": run_log["run_duration"],
+        }
+
     @classmethod
-    def from_dao(cls, dao: PipelineDAO) -> "Pipeline":
-        root_step = parse_pipeline_step(dao.current_version.steps)
+    def from_dao(
+        cls, dao: PipelineDAO, version: Optional[PipelineVersionDAO] = None
+    ) -> "Pipeline":
+        """Build the pipeline at `version`, its current version by default."""
+        version = version or dao.current_version
+        root_step, program = compiled_pipelines_cache.get_or_create(
+            (str(dao.id), version.version_number),
+            lambda: _parse_and_compile(version.steps),
+        )
         return cls(
             id_=str(dao.id),
             name=dao.name,
             description=dao.description,
-            version=str(dao.current_version.version_number),
+            version=str(version.version_number),
             status=PipelineStatus(dao.status),
             root_step=root_step,
-            react_flow_nodes=dao.current_version.react_flow_nodes or {},
+            react_flow_nodes=version.react_flow_nodes or {},
             created_at=dao.created_at,
             updated_at=dao.updated_at,
+            program=program,
+            version_id=str(version.id),
         )
@@ -0,0 +1,181 @@
+from time import perf_counter_ns
+from typing import List, NamedTuple, Optional, Tuple, Union
+
+from orchestrator.resources.application import Application
+from orchestrator.resources.pipeline.amount_policy import AmountPoliciesRule
+from orchestrator.resources.pipeline.concurrency import step_concurrency_limiter
+from orchestrator.resources.pipeline.dti_rule import DTIRule
+from orchestrator.resources.pipeline.loan_cap import LoanCaps
+from orchestrator.resources.pipeline.risk_scoring import RiskScoringRule
+from orchestrator.resources.pipeline.step import PipelineStep
+from orchestrator.resources.pipeline.trace import ExecutionTrace, StepOutcome
+from orchestrator.resources.types import (
+    EvaluationResult,
+    PipelineStepEvaluationResult,
+    PipelineStepType,
+)
+
+# Op codes used by the interpreter loop. Rule steps are evaluated inline, every
+# other step type falls back to calling its own `_evaluate` implementation.
+_OP_DTI = 0
+_OP_AMOUNT_POLICY = 1
+_OP_RISK_SCORING = 2
+_OP_STEP_CALL = 3
+
+_OP_CODES = {
+    PipelineStepType.DTI_RULE: _OP_DTI,
+    PipelineStepType.AMOUNT_POLICY_RULE: _OP_AMOUNT_POLICY,
+    PipelineStepType.RISK_SCORING_RULE: _OP_RISK_SCORING,
+}
+
+_PASS = PipelineStepEvaluationResult.PASS
+_FAIL = PipelineStepEvaluationResult.FAIL
+
+Target = Union[int, EvaluationResult]
+
+
+class Instruction(NamedTuple):
+    """
+    A single pipeline step, flattened.
+
+    `pass_target` and `fail_target` are either the index of the next instruction
+    in the program or the terminal `EvaluationResult` of the pipeline.
+    """
+
+    op_code: int
+    kind: PipelineStepType
+    threshold: Optional[float]
+    loan_caps: Optional[LoanCaps]
+    pass_target: Target
+    fail_target: Target
+    step: PipelineStep
+
+
+class PipelineProgram:
+    """Flat, non-recursive representation of a parsed pipeline step tree."""
+
+    def __init__(self, instructions: List[Instruction], entry: Target):
+        self.instructions = instructions
+        self.entry = entry
+
+    def __len__(self) -> int:
+        return len(self.instructions)
+
+    @classmethod
+    def compile(cls, root: Union[PipelineStep, EvaluationResult]) -> "PipelineProgram":
+        if not isinstance(root, PipelineStep):
+            return cls(instructions=[], entry=root)
+
+        # Steps are laid out in pre-order, so the root is always instruction 0
+        # and the targets can be patched in once every step has an index.
+        ordered_steps: List[PipelineStep] = []
+        indexes = {}
+        pending = [root]
+        while pending:
+            step = pending.pop()
+            indexes[id(step)] = len(ordered_steps)
+            ordered_steps.append(step)
+
+            for next_step in (step.fail_scenario, step.pass_scenario):
+                if isinstance(next_step, PipelineStep):
+                    pending.append(next_step)
+
+        def target_of(scenario: Union[PipelineStep, EvaluationResult]) -> Target:
+            if isinstance(scenario, PipelineStep):
+                return indexes[id(scenario)]
+            return scenario
+
+        instructions = [
+            cls.__compile_step(
+                step,
+                pass_target=target_of(step.pass_scenario),
+                fail_target=target_of(step.fail_scenario),
+            )
+            for step in ordered_steps
+        ]
+
+        return cls(instructions=instructions, entry=0)
+
+    @staticmethod
+    def __compile_step(
+        step: PipelineStep, pass_target: Target, fail_target: Target
+    ) -> Instruction:
+        threshold = None
+        loan_caps = None
+
+        if isinstance(step, DTIRule):
+            threshold = step.max_dti
+        elif isinstance(step, RiskScoringRule):
+            threshold = step.max_risk_score
+            loan_caps = step.loan_caps
+        elif isinstance(step, AmountPoliciesRule):
+            loan_caps = step.loan_caps
+
+        return Instruction(
+            op_code=_OP_CODES.get(step.type, _OP_STEP_CALL),
+            kind=step.type,
+            threshold=threshold,
+            loan_caps=loan_caps,
+            pass_target=pass_target,
+            fail_target=fail_target,
+            step=step,
+        )
+
+    def run(self, application: Application) -> Tuple[EvaluationResult, ExecutionTrace]:
+        """
+        Run the program on a single application.
+
+        The program itself is never modified, so one instance can be shared by
+        any number of threads. Everything about the run is in the returned trace.
+        """
+        target = self.entry
+        if not isinstance(target, int):
+            return target, ExecutionTrace()
+
+        instructions = self.instructions
+        amount = application.amount
+        monthly_income = application.monthly_income
+        declared_debts = application.declared_debts
+        country = application.country
+        outcomes = []
+
+        while True:
+            op_code, kind, threshold, loan_caps, pass_target, fail_target, step = (
+                instructions[target]
+            )
+
+            start_time = perf_counter_ns()
+            if op_code == _OP_DTI:
+                value = declared_debts / monthly_income
+                passed = value < threshold
+            elif op_code == _OP_AMOUNT_POLICY:
+                value = loan_caps.get_cap_for_country(country)
+                passed = amount <= value
+            elif op_code == _OP_RISK_SCORING:
+                loan_cap = loan_caps.get_cap_for_country(country)
+                value = (declared_debts / monthly_income * 100) + (
+                    amount / loan_cap * 20
+                )
+                passed = value <= threshold
+            else:
+                # Steps calling out to other services are subject to the
+                # process-wide concurrency limits; the wait is not timed.
+                with step_concurrency_limiter.limit(kind):
+                    start_time = perf_counter_ns()
+                    result, value = step._evaluate(application)
+                passed = result == PipelineStepEvaluationResult.PASS
+            end_time = perf_counter_ns()
+
+            outcomes.append(
+                StepOutcome(
+                    step.flow_node_id,
+                    _PASS if passed else _FAIL,
+                    value,
+                    end_time - start_time,
+                    step.type,
+                )
+            )
+
+            target = pass_target if passed else fail_target
+            if target.__class__ is not int:
+                return target, ExecutionTrace(tuple(outcomes))
@@ -42,14 +42,15 @@ class SentimentAnalysisStep(PipelineStep):
             flow_node_id=flow_node_id,
         )
 
-        self.__open_ai_client = OpenAIClient()
+        # The OpenAI client is only created once a sentiment step actually runs,
+        # parsing a pipeline must not touch the network stack.
         self.__model = model
 
     def _evaluate(
         self,
         application: Application,
     ) -> tuple[PipelineStepEvaluationResult, Optional[float]]:
-        result = self.__open_ai_client.classify_risk(
+        result = OpenAIClient().classify_risk(
             model=self.__model, text=application.loan_purpose
         )
 
@@ -1,8 +1,10 @@
 import abc
-from time import time
+from time import perf_counter_ns
 from typing import Optional, Tuple, Union
 
 from orchestrator.resources.application import Application
+from orchestrator.resources.pipeline.concurrency import step_concurrency_limiter
+from orchestrator.resources.pipeline.trace import ExecutionTrace, StepOutcome
 from orchestrator.resources.types import (
     EvaluationResult,
     PipelineStepEvaluationResult,
@@ -22,11 +24,6 @@ class PipelineStep(abc.ABC):
         self.fail_scenario = fail_scenario
         self.type = type
 
-        self.evaluated: bool = False
-        self.evaluation_result: Optional[EvaluationResult] = None
-        self.evaluation_result_value: Optional[float] = None
-        self.evaluation_duration: float = 0.0
-
         self.flow_node_id = flow_node_id
 
     @abc.abstractmethod
@@ -35,30 +32,36 @@ class PipelineStep(abc.ABC):
     ) -> Tuple[PipelineStepEvaluationResult, Optional[float]]:
         raise NotImplementedError("This method should be implemented by subclasses")
 
-    def __timed_evaluation(self, application: Application) -> EvaluationResult:
-        start_time = time()
-        result, result_value = self._evaluate(application)
-        end_time = time()
-
-        self.evaluation_duration = end_time - start_time
-        self.evaluated = True
-        self.evaluation_result = result
-        self.evaluation_result_value = result_value
+    def __timed_evaluation(self, application: Application) -> StepOutcome:
+        with step_concurrency_limiter.limit(self.type):
+            start_time = perf_counter_ns()
+            result, result_value = self._evaluate(application)
+            end_time = perf_counter_ns()
+
+        return StepOutcome(
+            flow_node_id=self.flow_node_id,
+            result=result,
+            value=result_value,
+            duration_ns=end_time - start_time,
+            step_type=self.type,
+        )
+
+    def execute(
+        self, application: Application
+    ) -> Tuple[EvaluationResult, ExecutionTrace]:
+        outcomes = []
+        next_step = self
 
-        return result
+        while isinstance(next_step, PipelineStep):
+            outcome = next_step.__timed_evaluation(application)
+            outcomes.append(outcome)
 
-    def execute(self, application: Application) -> EvaluationResult:
-        eval_result = self.__timed_evaluation(application)
+            if outcome.result == PipelineStepEvaluationResult.PASS:
+                next_step = next_step.pass_scenario
+            else:
+                next_step = next_step.fail_scenario
 
-        if eval_result == PipelineStepEvaluationResult.PASS:
-            next_step = self.pass_scenario
-        else:
-            next_step = self.fail_scenario
-
-        if isinstance(next_step, PipelineStep):
-            return next_step.execute(application)
-        else:
-            return next_step
+        return next_step, ExecutionTrace(outcomes=tuple(outcomes))
 
     def to_dict(self) -> dict:
         if isinstance(self.pass_scenario, PipelineStep):
@@ -77,24 +80,41 @@ class PipelineStep(abc.ABC):
             "failScenario": fail_scenario_dict,
         }
 
-    def get_evaluation_result(self) -> Optional[dict]:
-        if not self.evaluated:
-            return None
+    def get_evaluation_result(
+        self, trace: ExecutionTrace, position: int = 0
+    ) -> Optional[dict]:
+        """
+        Rebuild the nested evaluation result of the subtree rooted at this step.
 
-        if isinstance(self.pass_scenario, PipelineStep):
-            pass_eval_result = self.pass_scenario.get_evaluation_result()
-        else:
-            pass_eval_result = self.pass_scenario.value
+        `position` is the index of this step's outcome in the trace. Branches
+        that were not taken during the run are reported as `None`.
+        """
+        if position >= len(trace.outcomes):
+            return None
 
-        if isinstance(self.fail_scenario, PipelineStep):
-            fail_eval_result = self.fail_scenario.get_evaluation_result()
-        else:
-            fail_eval_result = self.fail_scenario.value
+        outcome = trace.outcomes[position]
+        passed = outcome.result == PipelineStepEvaluationResult.PASS
 
         return {
-            "evaluation_result": self.evaluation_result.value,
-            "evaluation_result_value": self.evaluation_result_value,
-            "evaluation_duration": self.evaluation_duration,
-            "pass_scenario_evaluation": pass_eval_result,
-            "fail_scenario_evaluation": fail_eval_result,
+            "evaluation_result": outcome.result.value,
+            "evaluation_result_value": outcome.value,
+            "evaluation_duration": outcome.duration,
+            "pass_scenario_evaluation": self.__scenario_evaluation_result(
+                self.pass_scenario, trace, position + 1 if passed else None
+            ),
+            "fail_scenario_evaluation": self.__scenario_evaluation_result(
+                self.fail_scenario, trace, None if passed else position + 1
+            ),
         }
+
+    @staticmethod
+    def __scenario_evaluation_result(
+        scenario: Union[EvaluationResult, "PipelineStep"],
+        trace: ExecutionTrace,
+        position: Optional[int],
+    ) -> Optional[Union[dict, str]]:
+        if not isinstance(scenario, PipelineStep):
+            return scenario.value
+        if position is None:
+            return None
+        return scenario.get_evaluation_result(trace, position)
@@ -0,0 +1,91 @@
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Mapping, NamedTuple, Optional, Tuple
+
+from orchestrator.resources.types import PipelineStepEvaluationResult, PipelineStepType
+
+if TYPE_CHECKING:
+    from orchestrator.resources.pipeline.step import PipelineStep
+
+# Version of the encoding written by `ExecutionTrace.encode`. Bump it, and keep
+# decoding the previous versions, whenever the layout of a step changes.
+# Version 1 did not record the step type.
+TRACE_FORMAT_VERSION = 2
+
+
+class StepOutcome(NamedTuple):
+    flow_node_id: str
+    result: PipelineStepEvaluationResult
+    value: Optional[float]
+    duration_ns: int
+    step_type: Optional[PipelineStepType] = None
+
+    @property
+    def duration(self) -> float:
+        """Duration of the step, in seconds."""
+        return self.duration_ns / 1e9
+
+
+class ExecutionTrace(NamedTuple):
+    """
+    Immutable record of a single pipeline run.
+
+    Outcomes are stored in the order the steps were visited, which is also the
+    path taken through the step tree.
+    """
+
+    outcomes: Tuple[StepOutcome, ...] = ()
+
+    @property
+    def by_node_id(self) -> Mapping[str, StepOutcome]:
+        return MappingProxyType(
+            {outcome.flow_node_id: outcome for outcome in self.outcomes}
+        )
+
+    def encode(self) -> dict:
+        """
+        JSON friendly form of the trace.
+
+        Every visited step is a `[flow node ID, step type, result, value,
+        duration in ns]` array, in the order the steps were visited.
+        """
+        return {
+            "version": TRACE_FORMAT_VERSION,
+            "steps": [
+                [
+                    outcome.flow_node_id,
+                    outcome.step_type.value if outcome.step_type else None,
+                    outcome.result.value,
+                    outcome.value,
+                    outcome.duration_ns,
+                ]
+                for outcome in self.outcomes
+            ],
+        }
+
+    @classmethod
+    def decode(cls, encoded: dict) -> "ExecutionTrace":
+        """Read a trace written by `encode`. Raises ValueError if it can't be."""
+        version = encoded.get("version") if isinstance(encoded, dict) else None
+        if version == 1:
+            steps = [[step[0], None, *step[1:]] for step in encoded["steps"]]
+        elif version == TRACE_FORMAT_VERSION:
+            steps = encoded["steps"]
+        else:
+            raise ValueError(f"Unsupported execution trace version: {version}")
+
+        return cls(
+            outcomes=tuple(
+                StepOutcome(
+                    flow_node_id=flow_node_id,
+                    result=PipelineStepEvaluationResult(result),
+                    value=value,
+                    duration_ns=duration_ns,
+                    step_type=PipelineStepType(step_type) if step_type else None,
+                )
+                for flow_node_id, step_type, result, value, duration_ns in steps
+            )
+        )
+
+    def to_evaluation_result(self, root_step: "PipelineStep") -> Optional[dict]:
+        """The nested evaluation result of the step tree the trace was run on."""
+        return root_step.get_evaluation_result(self)
@@ -44,3 +44,6 @@ Country = Enum(
     "Country",
     {country.name: country.name for country in pycountry.countries},
 )
+
+# Dense integer code of each country, used to index per-country arrays.
+COUNTRY_CODES = {country: code for code, country in enumerate(Country)}
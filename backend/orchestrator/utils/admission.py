@@ -0,0 +1,167 @@
+import math
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from time import monotonic
+from typing import Optional
+
+from orchestrator.clients.db.wrappers.evaluation import EvaluationsDBWrapper
+from orchestrator.utils.logging import logger
+
+# New evaluations are refused with 429 once the backlog would take longer than
+# this to work through at the recent processing rate, or once it holds more
+# evaluations than this. When nothing was processed recently although work is
+# waiting, the evaluators are assumed to be down and 503 is returned instead.
+_MAX_QUEUE_LAG = timedelta(minutes=5)
+_MAX_QUEUE_DEPTH = 5000
+
+# Window the processing rate is measured over
+_RATE_WINDOW = timedelta(minutes=1)
+
+# Pending evaluations younger than this do not count as stalled, so a burst
+# arriving just after an idle period is not refused
+_STALL_GRACE_PERIOD = timedelta(seconds=30)
+
+_MIN_RETRY_AFTER_SECONDS = 1
+_MAX_RETRY_AFTER_SECONDS = 300
+_STALLED_RETRY_AFTER_SECONDS = 30
+
+# The queue status is shared between requests for this long
+_STATUS_TTL_SECONDS = 1.0
+
+
+@dataclass
+class QueueStatus:
+    pending: int
+    oldest_pending_age: float
+    processed_per_second: float
+
+    @property
+    def estimated_lag(self) -> Optional[float]:
+        """Seconds needed to work through the backlog, None if nothing runs."""
+        if not self.pending:
+            return 0.0
+        if not self.processed_per_second:
+            return None
+        return self.pending / self.processed_per_second
+
+    def to_dict(self) -> dict:
+        return {
+            "pending": self.pending,
+            "oldestPendingAge": self.oldest_pending_age,
+            "processedPerSecond": self.processed_per_second,
+            "estimatedLag": self.estimated_lag,
+        }
+
+
+@dataclass
+class AdmissionDecision:
+    admitted: bool
+    status_code: int = 200
+    retry_after: Optional[int] = None
+    reason: Optional[str] = None
+    capacity: Optional[int] = None
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_queue_lag: timedelta = _MAX_QUEUE_LAG,
+        max_queue_depth: int = _MAX_QUEUE_DEPTH,
+    ):
+        self.max_queue_lag = max_queue_lag.total_seconds()
+        self.max_queue_depth = max_queue_depth
+
+        self.__db_wrapper = EvaluationsDBWrapper()
+        self.__lock = threading.Lock()
+        self.__status: Optional[QueueStatus] = None
+        self.__status_expires_at = 0.0
+
+    def queue_status(self) -> QueueStatus:
+        with self.__lock:
+            if self.__status is not None and monotonic() < self.__status_expires_at:
+                return self.__status
+
+        pending, oldest_pending_at, processed = self.__db_wrapper.get_queue_status(
+            rate_window=_RATE_WINDOW
+        )
+        oldest_pending_age = 0.0
+        if oldest_pending_at is not None:
+            oldest_pending_age = max(
+                (datetime.now(tz=timezone.utc) - oldest_pending_at).total_seconds(),
+                0.0,
+            )
+
+        status = QueueStatus(
+            pending=pending,
+            oldest_pending_age=oldest_pending_age,
+            processed_per_second=processed / _RATE_WINDOW.total_seconds(),
+        )
+
+        with self.__lock:
+            self.__status = status
+            self.__status_expires_at = monotonic() + _STATUS_TTL_SECONDS
+
+        return status
+
+    def check(self, incoming: int = 1, queue_share: float = 1.0) -> AdmissionDecision:
+        """
+        Decide whether `incoming` more evaluations can be queued.
+
+        They are admitted when the backlog is within `queue_share` of the
+        maximum lag, and stays within `queue_share` of the maximum depth once
+        they are added. Requests of lower priority pass a smaller share, which
+        keeps the rest of the queue for the others. The decision's `capacity`
+        is the number of evaluations that could be queued, None when unknown.
+        """
+        try:
+            status = self.queue_status()
+        except Exception as err:
+            # Failing open: the evaluation insert will surface a broken
+            # database on its own
+            logger.error(f"Failed to retrieve evaluation queue status: {err}")
+            return AdmissionDecision(admitted=True)
+
+        lag = status.estimated_lag
+        if (
+            lag is None
+            and status.oldest_pending_age >= _STALL_GRACE_PERIOD.total_seconds()
+        ):
+            return AdmissionDecision(
+                admitted=False,
+                status_code=503,
+                retry_after=_STALLED_RETRY_AFTER_SECONDS,
+                reason="Evaluations are not being processed",
+            )
+
+        capacity = max(
+            math.floor(self.max_queue_depth * queue_share) - status.pending, 0
+        )
+        lag_excess = (lag or 0.0) - self.max_queue_lag * queue_share
+        if lag_excess <= 0 and incoming <= capacity:
+            return AdmissionDecision(admitted=True, capacity=capacity)
+
+        # Time the evaluators need to make room for the incoming evaluations
+        excess = max(lag_excess, 0.0)
+        if incoming > capacity:
+            excess = max(
+                excess,
+                (
+                    (incoming - capacity) / status.processed_per_second
+                    if status.processed_per_second
+                    else _STALLED_RETRY_AFTER_SECONDS
+                ),
+            )
+        return AdmissionDecision(
+            admitted=False,
+            status_code=429,
+            retry_after=min(
+                max(math.ceil(excess), _MIN_RETRY_AFTER_SECONDS),
+                _MAX_RETRY_AFTER_SECONDS,
+            ),
+            reason="Too many evaluations queued",
+            capacity=capacity if lag_excess <= 0 else 0,
+        )
+
+
+admission_controller = AdmissionController()
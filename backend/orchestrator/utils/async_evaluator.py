@@ -1,67 +1,159 @@
+import os
 import queue
+import socket
 import threading
+from collections import deque
 from dataclasses import dataclass
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from time import monotonic
 
 from orchestrator.clients.db.schema import ApplicationEvaluation as EvaluationDAO
-from orchestrator.clients.db.wrappers.application import ApplicationsDBWrapper
+from orchestrator.clients.db.session_manager import release_session
 from orchestrator.clients.db.wrappers.evaluation import EvaluationsDBWrapper
 from orchestrator.resources.evaluation import Evaluation
+from orchestrator.resources.pipeline.concurrency import step_concurrency_limiter
 from orchestrator.resources.types import ApplicationEvaluationStatus, ApplicationStatus
 from orchestrator.utils.logging import logger
 
+_NUM_WORKERS = 8
+
+# Evaluations are claimed from the database for this long, and the lease of
+# running ones is renewed every `_LEASE_RENEWAL_INTERVAL`. A worker that dies
+# mid-evaluation leaves its claims behind, which are claimed again by another
+# worker once the lease expires, up to `_MAX_ATTEMPTS` times overall.
+_LEASE_DURATION = timedelta(minutes=5)
+_LEASE_RENEWAL_INTERVAL = timedelta(minutes=1)
+_MAX_ATTEMPTS = 3
+
+# How often the database is polled for new evaluations when no wake-up signal
+# was received, and how often abandoned evaluations are looked for.
+_POLL_INTERVAL_SECONDS = 2.0
+_ABANDONED_CHECK_INTERVAL_SECONDS = 60.0
+
+# Number of most recent jobs the wait time percentiles are computed over
+_WAIT_TIME_WINDOW = 1000
+
+
+class _LeaseHeartbeat:
+    """
+    Renews the lease of a claimed evaluation from a background thread, for as
+    long as the evaluation runs.
+    """
+
+    def __init__(self, evaluation_id: str, created_at: datetime, worker_id: str):
+        self.evaluation_id = evaluation_id
+        self.created_at = created_at
+        self.worker_id = worker_id
+        self.__stop_event = threading.Event()
+        self.__thread = None
+        self.__db_wrapper = EvaluationsDBWrapper()
+
+    def __enter__(self) -> "_LeaseHeartbeat":
+        self.__thread = threading.Thread(
+            target=self.__renew_loop,
+            name=f"lease-heartbeat-{self.evaluation_id}",
+            daemon=True,
+        )
+        self.__thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.__stop_event.set()
+        self.__thread.join()
+
+    def __renew_loop(self):
+        interval = _LEASE_RENEWAL_INTERVAL.total_seconds()
+        while not self.__stop_event.wait(timeout=interval):
+            try:
+                renewed = self.__db_wrapper.renew_lease(
+                    self.evaluation_id,
+                    created_at=self.created_at,
+                    worker_id=self.worker_id,
+                    lease_duration=_LEASE_DURATION,
+                )
+            except Exception as e:
+                # Retried at the next interval, before the lease runs out
+                logger.error(
+                    f"Failed to renew the lease of evaluation {self.evaluation_id}: "
+                    f"{e}"
+                )
+                continue
+            finally:
+                release_session()
+
+            if not renewed:
+                logger.warning(
+                    f"Lost the claim on evaluation {self.evaluation_id}, its "
+                    "result will be dropped"
+                )
+                return
+
 
 @dataclass
 class AsyncEvaluatorJob:
-    evaluation: Evaluation
+    evaluation_id: str
+    created_at: datetime
+    worker_id: str
 
     _evaluation_db_wrapper: EvaluationsDBWrapper = EvaluationsDBWrapper()
-    _application_db_wrapper: ApplicationsDBWrapper = ApplicationsDBWrapper()
+
+    @classmethod
+    def from_dao(
+        cls, evaluation_dao: EvaluationDAO, worker_id: str
+    ) -> "AsyncEvaluatorJob":
+        return cls(
+            evaluation_id=str(evaluation_dao.id),
+            created_at=evaluation_dao.created_at,
+            worker_id=worker_id,
+        )
+
+    def __finish(self, evaluation_dao: EvaluationDAO, **outcome) -> None:
+        finished = self._evaluation_db_wrapper.finish_evaluation(
+            evaluation_dao, worker_id=self.worker_id, **outcome
+        )
+        if not finished:
+            logger.warning(
+                f"Dropped the result of evaluation {self.evaluation_id}, it was "
+                "claimed by another worker meanwhile"
+            )
 
     def __attempt_execution(self, evaluation_dao: EvaluationDAO):
-        self.evaluation.run()
+        evaluation = Evaluation.from_dao(evaluation_dao)
+        evaluation.run()
 
-        self._evaluation_db_wrapper.update_evaluation(
+        self.__finish(
             evaluation_dao,
             status=ApplicationEvaluationStatus.EVALUATED,
-            result=self.evaluation.result,
-            details=self.evaluation.details,
-        )
-        self._application_db_wrapper.update_application_status(
-            evaluation_dao.application,
-            ApplicationStatus.REVIEWED,
+            application_status=ApplicationStatus.REVIEWED,
+            result=evaluation.result,
+            details=evaluation.details,
+            pipeline_version_id=evaluation.pipeline.version_id,
         )
 
     def __handle_evaluation_failure(
         self, evaluation_dao: EvaluationDAO, error: Exception
     ):
-        logger.error(f"Evaluation {self.evaluation.id_} failed with error: {error}")
-        self._evaluation_db_wrapper.update_evaluation(
+        logger.error(f"Evaluation {self.evaluation_id} failed with error: {error}")
+        self.__finish(
             evaluation_dao,
             status=ApplicationEvaluationStatus.EVALUATING_ERROR,
-            result=None,
+            application_status=ApplicationStatus.REVIEWING_ERROR,
             details={"error": str(error)},
         )
-        self._application_db_wrapper.update_application_status(
-            evaluation_dao.application,
-            ApplicationStatus.REVIEWING_ERROR,
-        )
 
     def execute(self):
-        # Set status to EVALUATING
-
+        # The evaluation was already moved to EVALUATING when it was claimed
         evaluation_dao = self._evaluation_db_wrapper.get_evaluation_by_id(
-            self.evaluation.id_
-        )
-        self.evaluation.status = ApplicationEvaluationStatus.EVALUATING
-        self._evaluation_db_wrapper.update_evaluation(
-            evaluation_dao, status=ApplicationEvaluationStatus.EVALUATING
+            self.evaluation_id, created_at=self.created_at
         )
 
-        try:
-            self.__attempt_execution(evaluation_dao=evaluation_dao)
-        except Exception as err:
-            self.__handle_evaluation_failure(evaluation_dao, err)
+        with _LeaseHeartbeat(
+            self.evaluation_id, created_at=self.created_at, worker_id=self.worker_id
+        ):
+            try:
+                self.__attempt_execution(evaluation_dao=evaluation_dao)
+            except Exception as err:
+                self.__handle_evaluation_failure(evaluation_dao, err)
 
 
 class AsyncEvaluator:
@@ -69,7 +161,7 @@ class AsyncEvaluator:
     _lock = threading.Lock()
 
     def __new__(cls):
-        """Singleton pattern to ensure only one logger instance."""
+        """Singleton pattern to ensure only one evaluator instance."""
         if cls._instance is None:
             with cls._lock:
                 if cls._instance is None:
@@ -80,76 +172,318 @@ class AsyncEvaluator:
         if hasattr(self, "_initialized"):
             return
         self.name = "AsyncEvaluator"
+        self.num_workers = _NUM_WORKERS
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
         self._initialized = True
 
-        self.__queue = queue.Queue(maxsize=10000)
+        # Only holds evaluations this process already claimed from the database
+        self.__queue = queue.Queue()
+        self.__wake_event = threading.Event()
+        self.__db_wrapper = EvaluationsDBWrapper()
 
-        self._worker_thread = None
+        self._dispatcher_thread = None
+        self._worker_threads = []
         self._shutdown_event = threading.Event()
 
-        # Start the worker thread automatically on logger creation
-        self.start()
+        self.__metrics_lock = threading.Lock()
+        # Worker slots taken by claimed evaluations, from the moment they are
+        # claimed until a worker is done with them or they are released
+        self.__reserved = 0
+        self.__in_flight = 0
+        self.__claimed = 0
+        self.__completed = 0
+        self.__failed = 0
+        self.__wait_times = deque(maxlen=_WAIT_TIME_WINDOW)
+
+        # Threads are only started on request, by the API processes when the
+        # evaluator is embedded or by the standalone worker
+        self._draining_event = threading.Event()
 
     def start(self):
-        """Start the background worker thread."""
-        if self._worker_thread is None or not self._worker_thread.is_alive():
-            self._shutdown_event.clear()
-            self._worker_thread = threading.Thread(
-                target=self.__worker_loop, name=self.name, daemon=True
+        """Start the dispatcher and the background worker threads."""
+        self._shutdown_event.clear()
+        self._draining_event.clear()
+
+        if self._dispatcher_thread is None or not self._dispatcher_thread.is_alive():
+            self._dispatcher_thread = threading.Thread(
+                target=self.__dispatcher_loop,
+                name=f"{self.name}-dispatcher",
+                daemon=True,
             )
-            self._worker_thread.start()
-            logger.info("Threaded logger started")
+            self._dispatcher_thread.start()
+
+        self._worker_threads = [
+            thread for thread in self._worker_threads if thread.is_alive()
+        ]
+
+        for _ in range(self.num_workers - len(self._worker_threads)):
+            worker_thread = threading.Thread(
+                target=self.__worker_loop,
+                name=f"{self.name}-{len(self._worker_threads)}",
+                daemon=True,
+            )
+            worker_thread.start()
+            self._worker_threads.append(worker_thread)
+
+        logger.info(f"Async evaluator started with {self.num_workers} workers")
 
     def stop(self, timeout: float = 30.0):
         """
-        Stop the background worker thread gracefully.
+        Stop the background worker threads gracefully.
 
         Args:
-            timeout: Maximum time to wait for the thread to stop
+            timeout: Maximum time to wait for each thread to stop
         """
-        if self._worker_thread and self._worker_thread.is_alive():
-            logger.info("Stopping GraphQL threaded logger...")
-            self._shutdown_event.set()
+        worker_threads = [
+            thread for thread in self._worker_threads if thread.is_alive()
+        ]
+        if not worker_threads:
+            return
 
-            # Add a sentinel value to wake up the worker
+        logger.info("Stopping async evaluator...")
+        self._shutdown_event.set()
+        self.__wake_event.set()
+
+        # Add one sentinel value per worker to wake them up. Workers only exit
+        # on the shutdown event, so the sentinels of workers that exited
+        # without taking theirs are skipped by the next workers started.
+        for _ in worker_threads:
             try:
                 self.__queue.put_nowait(None)
             except queue.Full:
                 pass
 
-            self._worker_thread.join(timeout=timeout)
+        for worker_thread in worker_threads:
+            worker_thread.join(timeout=timeout)
+        if self._dispatcher_thread is not None:
+            self._dispatcher_thread.join(timeout=timeout)
+
+    def configure(self, num_workers: int = None, step_concurrency_limits=None):
+        """
+        Change the number of workers and the per step type concurrency limits.
+
+        Running workers are stopped and restarted when the pool size changes.
+        """
+        if step_concurrency_limits is not None:
+            step_concurrency_limiter.configure(step_concurrency_limits)
+
+        if num_workers is not None and num_workers != self.num_workers:
+            if num_workers <= 0:
+                raise ValueError("num_workers must be a positive integer")
+
+            was_running = self.is_running
+            self.stop()
+            self.num_workers = num_workers
+            if was_running:
+                self.start()
+
+    @property
+    def is_running(self) -> bool:
+        return any(thread.is_alive() for thread in self._worker_threads)
+
+    @property
+    def is_draining(self) -> bool:
+        return self._draining_event.is_set()
+
+    def drain(self, timeout: float = 60.0):
+        """
+        Stop claiming new evaluations, finish the claimed ones and stop.
+
+        Evaluations still not started once `timeout` runs out are released
+        back to the queue, so other workers can pick them up straight away.
+        """
+        logger.info("Draining async evaluator...")
+        end_time = monotonic() + timeout
+        self._draining_event.set()
+        self.__wake_event.set()
+        if self._dispatcher_thread is not None:
+            self._dispatcher_thread.join(timeout=timeout)
+
+        while monotonic() < end_time:
+            # Jobs count as unfinished from being queued until a worker is done
+            # with them, so this also covers jobs just taken off the queue
+            if not self.__queue.unfinished_tasks:
+                break
+            self._shutdown_event.wait(timeout=0.1)
+
+        unstarted_keys = []
+        while True:
+            try:
+                job = self.__queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                unstarted_keys.append((job.evaluation_id, job.created_at))
+                with self.__metrics_lock:
+                    self.__reserved -= 1
+            self.__queue.task_done()
+
+        if unstarted_keys:
+            released = self.__db_wrapper.release_evaluations(
+                unstarted_keys, worker_id=self.worker_id
+            )
+            logger.warning(f"Released {released} unstarted evaluations")
+
+        self.stop(timeout=max(end_time - monotonic(), 0.0))
 
     def add_to_queue(self, evaluation: Evaluation):
-        try:
-            self.__queue.put_nowait(AsyncEvaluatorJob(evaluation))
-        except queue.Full:
-            logger.warning("Job queue is full, dropping job")
+        """
+        Signal that a new evaluation is waiting in the database.
+
+        The evaluation itself is claimed by whichever evaluator gets to it
+        first; this only spares this process from waiting for its next poll.
+        """
+        self.wake_up()
+
+    def wake_up(self):
+        """Look for pending evaluations now rather than at the next poll."""
+        self.__wake_event.set()
 
     def flush(self, timeout: float = 5.0):
-        """Flush all log jobs in the queue."""
+        """Flush all evaluation jobs in the queue."""
         end_time = datetime.now(tz=timezone.utc).timestamp() + timeout
         while not self.__queue.empty() and datetime.utcnow().timestamp() < end_time:
             try:
                 job = self.__queue.get_nowait()
                 if job is None:
                     continue
-                job.execute()
+                self.__run_job(job)
                 self.__queue.task_done()
             except queue.Empty:
                 break
 
+    def metrics(self) -> dict:
+        with self.__metrics_lock:
+            wait_times = sorted(self.__wait_times)
+            in_flight = self.__in_flight
+            claimed = self.__claimed
+            completed = self.__completed
+            failed = self.__failed
+
+        def percentile(fraction: float) -> float:
+            if not wait_times:
+                return 0.0
+            return wait_times[min(len(wait_times) - 1, int(len(wait_times) * fraction))]
+
+        return {
+            "workers": self.num_workers,
+            "aliveWorkers": len(
+                [thread for thread in self._worker_threads if thread.is_alive()]
+            ),
+            "workerId": self.worker_id,
+            "queueDepth": self.__db_wrapper.count_pending_evaluations(),
+            "claimedQueueDepth": self.__queue.qsize(),
+            "inFlight": in_flight,
+            "claimed": claimed,
+            "completed": completed,
+            "failed": failed,
+            "waitTime": {
+                "average": sum(wait_times) / len(wait_times) if wait_times else 0.0,
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": wait_times[-1] if wait_times else 0.0,
+            },
+            "stepConcurrency": step_concurrency_limiter.stats(),
+        }
+
+    def __run_job(self, job: AsyncEvaluatorJob):
+        wait_time = datetime.now(tz=timezone.utc) - job.created_at
+        with self.__metrics_lock:
+            self.__wait_times.append(wait_time.total_seconds())
+            self.__in_flight += 1
+
+        succeeded = False
+        try:
+            job.execute()
+            succeeded = True
+        finally:
+            # Worker threads live on, their sessions must not hold a connection
+            release_session()
+            with self.__metrics_lock:
+                self.__in_flight -= 1
+                self.__reserved -= 1
+                if succeeded:
+                    self.__completed += 1
+                else:
+                    self.__failed += 1
+            # A worker slot was freed, there is room to claim more evaluations
+            self.__wake_event.set()
+
+    def __claim_jobs(self) -> int:
+        # The free slots are reserved before claiming, then the ones left
+        # unused are given back
+        with self.__metrics_lock:
+            capacity = self.num_workers - self.__reserved
+            if capacity <= 0:
+                return 0
+            self.__reserved += capacity
+
+        queued = 0
+        try:
+            evaluation_daos = self.__db_wrapper.claim_evaluations(
+                worker_id=self.worker_id,
+                limit=capacity,
+                lease_duration=_LEASE_DURATION,
+                max_attempts=_MAX_ATTEMPTS,
+            )
+            for evaluation_dao in evaluation_daos:
+                self.__queue.put_nowait(
+                    AsyncEvaluatorJob.from_dao(evaluation_dao, worker_id=self.worker_id)
+                )
+                queued += 1
+        finally:
+            with self.__metrics_lock:
+                self.__reserved -= capacity - queued
+                self.__claimed += queued
+
+        return queued
+
+    def __dispatcher_loop(self):
+        last_abandoned_check = None
+        while not (self._shutdown_event.is_set() or self._draining_event.is_set()):
+            self.__wake_event.clear()
+            claimed = 0
+
+            try:
+                now = monotonic()
+                if (
+                    last_abandoned_check is None
+                    or now - last_abandoned_check >= _ABANDONED_CHECK_INTERVAL_SECONDS
+                ):
+                    last_abandoned_check = now
+                    abandoned = self.__db_wrapper.fail_abandoned_evaluations(
+                        max_attempts=_MAX_ATTEMPTS
+                    )
+                    if abandoned:
+                        logger.warning(f"Gave up on {abandoned} abandoned evaluations")
+
+                claimed = self.__claim_jobs()
+            except Exception as e:
+                logger.error(f"Error claiming evaluation jobs: {e}")
+            finally:
+                release_session()
+
+            # Claim again straight away while there is a backlog, otherwise
+            # wait for a wake-up signal or the next poll
+            if not claimed:
+                self.__wake_event.wait(timeout=_POLL_INTERVAL_SECONDS)
+
     def __worker_loop(self):
         while not self._shutdown_event.is_set():
             try:
                 job = self.__queue.get(timeout=1)
-                if job is None:
-                    break
-                job.execute()
-                self.__queue.task_done()
             except queue.Empty:
                 continue
+
+            try:
+                # Sentinels only wake the worker up to check the shutdown event
+                if job is None:
+                    continue
+                self.__run_job(job)
             except Exception as e:
-                logger.error(f"Error processing log job: {e}")
+                logger.error(f"Error processing evaluation job: {e}")
+            finally:
+                self.__queue.task_done()
 
 
 async_evaluator = AsyncEvaluator()
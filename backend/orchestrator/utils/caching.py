@@ -0,0 +1,104 @@
+import threading
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Callable, Hashable, Optional
+
+
+class LRUCache:
+    """
+    Thread-safe, size bounded LRU cache with hit/miss counters.
+
+    When `ttl_seconds` is set, entries older than that are treated as missing
+    and dropped on their next lookup.
+    """
+
+    def __init__(self, name: str, max_size: int, ttl_seconds: Optional[float] = None):
+        if max_size <= 0:
+            raise ValueError("max_size must be a positive integer")
+
+        self.name = name
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+
+        self.__entries: OrderedDict = OrderedDict()
+        self.__lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self.__lock:
+            try:
+                value, expires_at = self.__entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+
+            if expires_at is not None and expires_at <= monotonic():
+                del self.__entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        expires_at = None
+        if self.ttl_seconds is not None:
+            expires_at = monotonic() + self.ttl_seconds
+
+        with self.__lock:
+            self.__entries[key] = (value, expires_at)
+            self.__entries.move_to_end(key)
+
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is None:
+            # The factory runs outside the lock, so two threads missing on the
+            # same key may both build the value. The last one wins, which is
+            # fine for the immutable values we cache.
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        with self.__lock:
+            stale_keys = [key for key in self.__entries if predicate(key)]
+            for key in stale_keys:
+                del self.__entries[key]
+
+        return len(stale_keys)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self.__entries),
+            "maxSize": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hitRate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Parsed and compiled pipeline steps, keyed by (pipeline ID, version number).
+# Pipeline versions are never modified once written, so entries never go stale;
+# they are only dropped to free memory once a pipeline moves to a new version.
+compiled_pipelines_cache = LRUCache(name="compiled_pipelines", max_size=512)
@@ -0,0 +1,69 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Generic, List, Optional, Tuple, TypeVar
+from uuid import UUID
+
+from werkzeug.datastructures import MultiDict
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class PageCursor:
+    """Position of the last row of a page, in (created_at, id) order."""
+
+    created_at: datetime
+    id: UUID
+
+    def encode(self) -> str:
+        payload = json.dumps(
+            {"createdAt": self.created_at.isoformat(), "id": str(self.id)}
+        )
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+    @classmethod
+    def decode(cls, cursor: str) -> "PageCursor":
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            return cls(
+                created_at=datetime.fromisoformat(payload["createdAt"]),
+                id=UUID(payload["id"]),
+            )
+        except (binascii.Error, UnicodeError, KeyError, TypeError, ValueError):
+            raise ValueError("Invalid cursor")
+
+
+@dataclass
+class Page(Generic[T]):
+    items: List[T]
+    next_cursor: Optional[PageCursor] = None
+
+    def to_dict(self, items: list) -> dict:
+        return {
+            "items": items,
+            "nextCursor": self.next_cursor.encode() if self.next_cursor else None,
+        }
+
+
+def parse_page_args(args: MultiDict) -> Tuple[int, Optional[PageCursor]]:
+    """
+    Read the `limit` and `cursor` query parameters of a list endpoint.
+
+    Raises ValueError with a message fit for the client if either is invalid.
+    """
+    try:
+        limit = int(args.get("limit", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    cursor = args.get("cursor")
+
+    return limit, PageCursor.decode(cursor) if cursor else None
@@ -1,4 +1,5 @@
-from typing import Dict, List, Union
+import math
+from typing import Any, Dict, List, Union
 
 from pyutils.helpers.errors import Error
 
@@ -148,3 +149,58 @@ def validate_pipeline_dict(pipeline_dict: dict) -> bool:
     except ParsingError as e:
         logger.error(f"Pipeline validation failed: {e}")
         return False
+
+
+# NUMERIC(12, 2) columns can not hold anything larger
+_MAX_APPLICATION_AMOUNT = 10**10
+
+
+def _parse_application_amount(row: dict, field: str, allow_zero: bool = True) -> float:
+    value = row.get(field)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ParsingError(f"'{field}' must be a number.")
+    if not math.isfinite(value) or value < 0 or value >= _MAX_APPLICATION_AMOUNT:
+        raise ParsingError(
+            f"'{field}' must be between 0 and {_MAX_APPLICATION_AMOUNT}."
+        )
+    if not allow_zero and value == 0:
+        raise ParsingError(f"'{field}' must be greater than 0.")
+
+    return value
+
+
+def _parse_application_text(row: dict, field: str, max_length: int = None) -> str:
+    value = row.get(field)
+    if not isinstance(value, str) or not value.strip():
+        raise ParsingError(f"'{field}' must be a non-empty string.")
+    if max_length is not None and len(value) > max_length:
+        raise ParsingError(f"'{field}' must be at most {max_length} characters.")
+
+    return value
+
+
+def parse_application_row(row: Any) -> dict:
+    """
+    Validate a loan application as submitted to the API.
+
+    Returns the arguments `ApplicationsDBWrapper.create_application` expects,
+    raises `ParsingError` describing the first invalid field otherwise.
+    """
+    if not isinstance(row, dict):
+        raise ParsingError("Application must be a JSON object.")
+
+    try:
+        country = Country(row.get("country"))
+    except ValueError:
+        raise ParsingError(f"Unknown country: {row.get('country')}.")
+
+    return {
+        "applicant_name": _parse_application_text(row, "applicantName", max_length=255),
+        "amount": _parse_application_amount(row, "amount"),
+        "monthly_income": _parse_application_amount(
+            row, "monthlyIncome", allow_zero=False
+        ),
+        "declared_debts": _parse_application_amount(row, "declaredDebts"),
+        "country": country,
+        "loan_purpose": _parse_application_text(row, "loanPurpose"),
+    }
@@ -0,0 +1,154 @@
+"""
+Standalone evaluator worker.
+
+Runs queued evaluations outside of the API processes, so both can be scaled
+independently:
+
+    python -m orchestrator.worker --concurrency 16 --health-port 8001
+
+The worker exposes `GET /health` and `GET /metrics` on the health port. On
+SIGTERM or SIGINT it stops claiming evaluations and drains the ones it already
+claimed before exiting.
+"""
+
+import argparse
+import json
+import os
+import signal
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+from orchestrator.app.config import Config
+from orchestrator.clients.db.session_manager import (
+    pool_metrics,
+    shutdown_session_manager,
+)
+from orchestrator.resources.types import PipelineStepType
+from orchestrator.utils.async_evaluator import async_evaluator
+from orchestrator.utils.logging import logger
+
+_DEFAULT_HEALTH_PORT = 8001
+_DEFAULT_DRAIN_TIMEOUT_SECONDS = 60.0
+
+
+class _HealthRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):  # noqa: N802
+        if self.path == "/health":
+            healthy = async_evaluator.is_running and not async_evaluator.is_draining
+            self.__respond(
+                200 if healthy else 503,
+                {"status": "ok" if healthy else "draining"},
+            )
+        elif self.path == "/metrics":
+            try:
+                self.__respond(
+                    200, {**async_evaluator.metrics(), "dbPool": pool_metrics()}
+                )
+            except Exception as err:
+                logger.error(f"Failed to collect evaluator metrics: {err}")
+                self.__respond(500, {"error": "Failed to collect metrics"})
+        else:
+            self.__respond(404, {"error": "Not found"})
+
+    def log_message(self, format: str, *args) -> None:
+        # Health checks are too frequent to be worth logging
+        pass
+
+    def __respond(self, status: int, body: dict) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run loan application evaluations.")
+    parser.add_argument(
+        "--config-path",
+        default=os.getenv("CONFIG_PATH"),
+        help="Path to config.yaml, defaults to $CONFIG_PATH or backend/config.yaml",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Number of evaluations run at the same time, defaults to the "
+        "evaluator workers setting of the config",
+    )
+    parser.add_argument(
+        "--sentiment-concurrency",
+        type=int,
+        default=None,
+        help="Maximum number of concurrent sentiment analysis steps",
+    )
+    parser.add_argument(
+        "--health-port",
+        type=int,
+        default=_DEFAULT_HEALTH_PORT,
+        help="Port of the health and metrics server, 0 disables it",
+    )
+    parser.add_argument(
+        "--drain-timeout",
+        type=float,
+        default=_DEFAULT_DRAIN_TIMEOUT_SECONDS,
+        help="Seconds to wait for claimed evaluations to finish on shutdown",
+    )
+
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = _parse_args(argv)
+    config = Config(args.config_path)
+
+    step_concurrency_limits = None
+    if args.sentiment_concurrency is not None:
+        step_concurrency_limits = {
+            PipelineStepType.SENTIMENT_ANALYSIS_RULE: args.sentiment_concurrency
+        }
+
+    async_evaluator.configure(
+        num_workers=args.concurrency or config.EVALUATOR_WORKERS,
+        step_concurrency_limits=step_concurrency_limits,
+    )
+
+    stop_requested = threading.Event()
+
+    def request_stop(signum, _frame):
+        logger.info(f"Received signal {signum}, shutting down")
+        stop_requested.set()
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    health_server = None
+    if args.health_port:
+        health_server = ThreadingHTTPServer(
+            ("0.0.0.0", args.health_port), _HealthRequestHandler
+        )
+        threading.Thread(
+            target=health_server.serve_forever, name="worker-health", daemon=True
+        ).start()
+        logger.info(f"Worker health server listening on port {args.health_port}")
+
+    async_evaluator.start()
+
+    # Waking up regularly keeps the main thread responsive to signals
+    while not stop_requested.wait(timeout=1.0):
+        pass
+
+    try:
+        async_evaluator.drain(timeout=args.drain_timeout)
+    finally:
+        if health_server is not None:
+            health_server.shutdown()
+        shutdown_session_manager()
+
+    logger.info("Worker stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+The tests run against the database configured in config.yaml, migrated with
+`alembic upgrade head`. They are skipped when it can't be reached, and
+remove the rows they insert once done.
+"""
+
+import os
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def session_manager():
+    if not os.path.exists("config.yaml"):
+        pytest.skip("No config.yaml in the working directory")
+
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+
+    from orchestrator.clients.db.session_manager import (
+        get_session_manager,
+        shutdown_session_manager,
+    )
+
+    manager = get_session_manager()
+    try:
+        with manager.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except OperationalError as err:
+        pytest.skip(f"Database unavailable: {err}")
+
+    yield manager
+
+    shutdown_session_manager()
@@ -0,0 +1,132 @@
+import json
+from contextlib import contextmanager
+from typing import Iterator, List
+
+import pytest
+from sqlalchemy import event, text
+
+_TEST_PREFIX = "test-"
+_EVALUATIONS = 5
+
+_STEPS = {
+    "type": "DTI_RULE",
+    "nodeId": "dti",
+    "maxDTI": 0.4,
+    "passScenario": "APPROVED",
+    "failScenario": "REJECTED",
+}
+
+_SEED_STATEMENTS = [
+    """
+    INSERT INTO pipeline_versions (id, version_number, steps)
+    VALUES
+        ('00000000-0000-4000-8000-000000000001', 1, CAST(:steps AS jsonb)),
+        ('00000000-0000-4000-8000-000000000002', 2, CAST(:steps AS jsonb))
+    """,
+    """
+    INSERT INTO pipelines (id, name, status, current_version_id)
+    VALUES (
+        '00000000-0000-4000-8000-000000000003',
+        :prefix || 'pipeline',
+        'ACTIVE',
+        '00000000-0000-4000-8000-000000000002'
+    )
+    """,
+    """
+    INSERT INTO applications (
+        id, applicant_name, status, amount, monthly_income, declared_debts,
+        country, loan_purpose
+    )
+    SELECT
+        gen_random_uuid(), :prefix || i, 'REVIEWED'::applicationstatus,
+        10000, 5000, 1000, 'France', 'Test loan purpose'
+    FROM generate_series(1, :evaluations) AS i
+    """,
+    # Half of the evaluations ran with the previous version of the pipeline
+    """
+    INSERT INTO application_evaluations (
+        id, application_id, pipeline_id, status, result, pipeline_version_id
+    )
+    SELECT
+        gen_random_uuid(),
+        id,
+        '00000000-0000-4000-8000-000000000003',
+        'EVALUATED'::applicationevaluationstatus,
+        'APPROVED'::evaluationresult,
+        CASE WHEN row_number() OVER () % 2 = 0
+            THEN '00000000-0000-4000-8000-000000000001'
+            ELSE '00000000-0000-4000-8000-000000000002'
+        END::uuid
+    FROM applications
+    WHERE applicant_name LIKE :prefix || '%'
+    """,
+]
+
+_CLEANUP_STATEMENTS = [
+    """
+    DELETE FROM application_evaluations
+    WHERE pipeline_id = '00000000-0000-4000-8000-000000000003'
+    """,
+    "DELETE FROM applications WHERE applicant_name LIKE :prefix || '%'",
+    "DELETE FROM pipelines WHERE id = '00000000-0000-4000-8000-000000000003'",
+    """
+    DELETE FROM pipeline_versions WHERE id IN (
+        '00000000-0000-4000-8000-000000000001',
+        '00000000-0000-4000-8000-000000000002'
+    )
+    """,
+]
+
+
+@pytest.fixture
+def evaluations(session_manager):
+    session = session_manager.session
+    params = {
+        "prefix": _TEST_PREFIX,
+        "steps": json.dumps(_STEPS),
+        "evaluations": _EVALUATIONS,
+    }
+    try:
+        for statement in _SEED_STATEMENTS:
+            session.execute(text(statement), params)
+        session.commit()
+
+        yield "00000000-0000-4000-8000-000000000003"
+    finally:
+        session.rollback()
+        for statement in _CLEANUP_STATEMENTS:
+            session.execute(text(statement), params)
+        session.commit()
+        session_manager.teardown_session()
+
+
+@contextmanager
+def _count_queries(engine) -> Iterator[List[str]]:
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_get_evaluations_by_values_issues_one_query(session_manager, evaluations):
+    from orchestrator.clients.db.wrappers.evaluation import EvaluationsDBWrapper
+    from orchestrator.resources.evaluation import Evaluation
+
+    # Starts from a fresh session, so nothing is already in its identity map
+    session_manager.teardown_session()
+
+    with _count_queries(session_manager.engine) as statements:
+        page = EvaluationsDBWrapper().get_evaluations_by_values(
+            pipeline_id=evaluations, limit=_EVALUATIONS
+        )
+        # Everything the evaluations route serializes
+        serialized = [Evaluation.from_dao(dao).to_dict() for dao in page.items]
+
+    assert len(serialized) == _EVALUATIONS
+    assert len(statements) == 1, statements
@@ -8,17 +8,18 @@ import { apiClient } from './client';
 import type {
   Application,
   GetApplicationsParams,
+  Page,
 } from './types';
 
 /**
- * Gets all loan applications with optional filters
+ * Gets one page of loan applications with optional filters
  * 
  * @param params - Query parameters for filtering
- * @returns Array of applications
+ * @returns One page of applications, and the cursor to the next one
  */
-export async function getApplications(
+export async function getApplicationsPage(
   params?: GetApplicationsParams
-): Promise<Application[]> {
+): Promise<Page<Application>> {
   const queryParams: Record<string, string | string[]> = {};
   
   if (params?.statusIn) {
@@ -29,7 +30,15 @@ export async function getApplications(
     queryParams.statusNotIn = params.statusNotIn;
   }
 
-  return apiClient.get<Application[]>('/application', {
+  if (params?.limit) {
+    queryParams.limit = String(params.limit);
+  }
+
+  if (params?.cursor) {
+    queryParams.cursor = params.cursor;
+  }
+
+  return apiClient.get<Page<Application>>('/application', {
     params: Object.keys(queryParams).length > 0 ? queryParams : undefined,
   });
 }
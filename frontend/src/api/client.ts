@@ -216,4 +216,3 @@ export class ApiClient {
  * Default API client instance
  */
 export const apiClient = new ApiClient();
-
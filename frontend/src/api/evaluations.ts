@@ -9,7 +9,9 @@ import type {
   EvaluateApplicationRequest,
   Evaluation,
   EvaluationStats,
+  EvaluationSummary,
   GetEvaluationsParams,
+  Page,
 } from './types';
 
 /**
@@ -38,14 +40,14 @@ export async function getEvaluationById(
 }
 
 /**
- * Gets evaluations with optional filters
+ * Gets one page of evaluations with optional filters
  * 
  * @param params - Query parameters for filtering
- * @returns Array of evaluations
+ * @returns One page of evaluation summaries, and the cursor to the next one
  */
-export async function getEvaluations(
+export async function getEvaluationsPage(
   params?: GetEvaluationsParams
-): Promise<Evaluation[]> {
+): Promise<Page<EvaluationSummary>> {
   const queryParams: Record<string, string | string[]> = {};
   
   if (params?.applicationKey) {
@@ -64,7 +66,19 @@ export async function getEvaluations(
     queryParams.statusNotIn = params.statusNotIn;
   }
 
-  return apiClient.get<Evaluation[]>('/evaluations', {
+  if (params?.stepOutcome) {
+    queryParams.stepOutcome = params.stepOutcome;
+  }
+
+  if (params?.limit) {
+    queryParams.limit = String(params.limit);
+  }
+
+  if (params?.cursor) {
+    queryParams.cursor = params.cursor;
+  }
+
+  return apiClient.get<Page<EvaluationSummary>>('/evaluations', {
     params: Object.keys(queryParams).length > 0 ? queryParams : undefined,
   });
 }
@@ -5,10 +5,10 @@
  * 
  * @example
  * ```ts
- * import { createApplication, getPipelines } from '@/api';
+ * import { createApplication, getPipelinesPage } from '@/api';
  * 
  * const app = await createApplication({ ... });
- * const pipelines = await getPipelines();
+ * const { items: pipelines, nextCursor } = await getPipelinesPage({ limit: 20 });
  * ```
  */
 
@@ -6,9 +6,12 @@
 
 import { apiClient } from './client';
 import type {
+  BacktestPipelineRequest,
   CreatePipelineRequest,
   GetPipelinesParams,
+  Page,
   Pipeline,
+  PipelineBacktest,
   UpdatePipelineRequest,
 } from './types';
 
@@ -25,14 +28,14 @@ export async function createPipeline(
 }
 
 /**
- * Gets all pipelines with optional filters
+ * Gets one page of pipelines with optional filters
  * 
  * @param params - Query parameters for filtering
- * @returns Array of pipelines
+ * @returns One page of pipelines, and the cursor to the next one
  */
-export async function getPipelines(
+export async function getPipelinesPage(
   params?: GetPipelinesParams
-): Promise<Pipeline[]> {
+): Promise<Page<Pipeline>> {
   const queryParams: Record<string, string | string[]> = {};
   
   if (params?.statusIn) {
@@ -43,7 +46,19 @@ export async function getPipelines(
     queryParams.statusNotIn = params.statusNotIn;
   }
 
-  return apiClient.get<Pipeline[]>('/pipeline', {
+  if (params?.stepType) {
+    queryParams.stepType = params.stepType;
+  }
+
+  if (params?.limit) {
+    queryParams.limit = String(params.limit);
+  }
+
+  if (params?.cursor) {
+    queryParams.cursor = params.cursor;
+  }
+
+  return apiClient.get<Page<Pipeline>>('/pipeline', {
     params: Object.keys(queryParams).length > 0 ? queryParams : undefined,
   });
 }
@@ -89,3 +104,20 @@ export async function validatePipelineSteps(
   return apiClient.post<{ message: string }>('/pipeline/validate', steps);
 }
 
+/**
+ * Runs a pipeline's current version on the stored applications
+ * 
+ * Nothing is recorded, only the results it would give are counted.
+ * 
+ * @param pipelineId - The pipeline ID
+ * @param data - Applications to run the pipeline on
+ * @returns Counts of the results and of every step's outcomes
+ * @throws ApiClientError if the pipeline has steps that can't be backtested
+ */
+export async function backtestPipeline(
+  pipelineId: string,
+  data: BacktestPipelineRequest = {}
+): Promise<PipelineBacktest> {
+  return apiClient.post<PipelineBacktest>(`/pipeline/${pipelineId}/backtest`, data);
+}
+
@@ -22,6 +22,28 @@ export type EvaluationStatus = 'PENDING' | 'EVALUATING' | 'EVALUATED' | 'EVALUAT
 
 export type EvaluationResult = 'APPROVED' | 'REJECTED' | 'NEEDS_REVIEW';
 
+export type PipelineStepType =
+  | 'DTI_RULE'
+  | 'AMOUNT_POLICY_RULE'
+  | 'RISK_SCORING_RULE'
+  | 'SENTIMENT_ANALYSIS_RULE';
+
+export type PipelineStepResult = 'PASS' | 'FAIL';
+
+// ============================================================================
+// Pagination Types
+// ============================================================================
+
+export interface Page<T> {
+  items: T[];
+  nextCursor: string | null;
+}
+
+export interface PageParams {
+  limit?: number;
+  cursor?: string;
+}
+
 // ============================================================================
 // Application Types
 // ============================================================================
@@ -41,7 +63,7 @@ export interface Application {
   updatedAt: string;
 }
 
-export interface GetApplicationsParams {
+export interface GetApplicationsParams extends PageParams {
   statusIn?: ApplicationStatus[];
   statusNotIn?: ApplicationStatus[];
 }
@@ -98,9 +120,35 @@ export interface Pipeline {
   version: string;
 }
 
-export interface GetPipelinesParams {
+export interface GetPipelinesParams extends PageParams {
   statusIn?: PipelineStatus[];
   statusNotIn?: PipelineStatus[];
+  /** Only pipelines whose current version contains a step of this type */
+  stepType?: PipelineStepType;
+}
+
+export interface BacktestPipelineRequest {
+  /** Only applications with this status, all of them by default */
+  applicationStatus?: ApplicationStatus;
+  /** Maximum number of applications, newest first */
+  limit?: number;
+}
+
+export interface PipelineBacktest {
+  pipelineId: string;
+  version: string;
+  applications: number;
+  byResult: Record<EvaluationResult, number>;
+  /** Applications that could not be evaluated, e.g. without a monthly income */
+  errors: number;
+  steps: {
+    index: number;
+    flowNodeId: string | null;
+    type: PipelineStepType;
+    passed: number;
+    failed: number;
+    errors: number;
+  }[];
 }
 
 // ============================================================================
@@ -112,8 +160,18 @@ export interface EvaluateApplicationRequest {
   pipelineId: string;
 }
 
+/**
+ * Path taken by a pipeline run: one [flow node ID, step type, result, value,
+ * duration in nanoseconds] entry per visited step, in visiting order
+ */
+export interface ExecutionTrace {
+  version: 2;
+  steps: [string, PipelineStepType, PipelineStepResult, number | null, number][];
+}
+
 export interface EvaluationDetails {
   run_duration?: number;
+  trace?: ExecutionTrace;
   [key: string]: unknown;
 }
 
@@ -128,11 +186,30 @@ export interface Evaluation {
   updatedAt?: string;
 }
 
-export interface GetEvaluationsParams {
+/**
+ * Evaluation as listed by GET /evaluations, with the pipeline name and version
+ * it ran with
+ */
+export interface EvaluationSummary {
+  evaluationId: string;
+  application: Pick<Application, 'key' | 'applicantName'>;
+  pipeline: Pick<Pipeline, 'id' | 'name'> & { version: string | null };
+  status: EvaluationStatus;
+  result: EvaluationResult | null;
+  createdAt: string;
+  updatedAt: string;
+}
+
+export interface GetEvaluationsParams extends PageParams {
   applicationKey?: string;
   pipelineId?: string;
   statusIn?: EvaluationStatus[];
   statusNotIn?: EvaluationStatus[];
+  /**
+   * Only evaluations that went through every given step, each a step type or
+   * flow node ID, optionally followed by the result it had, e.g. 'DTI_RULE:FAIL'
+   */
+  stepOutcome?: string[];
 }
 
 export interface EvaluationStats {
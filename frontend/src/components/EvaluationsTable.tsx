@@ -1,8 +1,9 @@
-import React, { useState, useEffect } from 'react';
+import React from 'react';
 import { useNavigate } from 'react-router-dom';
 import StatusBadge from './StatusBadge';
-import { getEvaluations } from '../api/evaluations';
-import type { Evaluation } from '../api/types';
+import LoadMoreButton from './LoadMoreButton';
+import { getEvaluationsPage } from '../api/evaluations';
+import { usePages } from '../hooks/usePages';
 
 interface EvaluationsTableProps {
   limit: number | null;
@@ -10,35 +11,21 @@ interface EvaluationsTableProps {
 
 const EvaluationsTable: React.FC<EvaluationsTableProps> = ({ limit }) => {
   const navigate = useNavigate();
-  const [evaluations, setEvaluations] = useState<Evaluation[]>([]);
-  const [loading, setLoading] = useState<boolean>(true);
-  const [error, setError] = useState<string | null>(null);
-
-  useEffect(() => {
-    const fetchEvaluations = async () => {
-      try {
-        setLoading(true);
-        setError(null);
-        const data = await getEvaluations();
-        // Sort by createdAt descending (most recent first)
-        const sorted = [...data].sort((a, b) => {
-          const aTime = a.createdAt ? new Date(a.createdAt).getTime() : 0;
-          const bTime = b.createdAt ? new Date(b.createdAt).getTime() : 0;
-          return bTime - aTime;
-        });
-        // Apply limit if provided
-        const limited = limit !== null ? sorted.slice(0, limit) : sorted;
-        setEvaluations(limited);
-      } catch (err) {
-        setError(err instanceof Error ? err.message : 'Failed to load evaluations');
-        console.error('Error fetching evaluations:', err);
-      } finally {
-        setLoading(false);
-      }
-    };
-
-    fetchEvaluations();
-  }, [limit]);
+  // The API lists the most recent evaluations first, so a limited table only
+  // needs the first page, a full one loads the next pages on demand
+  const {
+    items: evaluations,
+    loading,
+    loadingMore,
+    error,
+    loadMoreError,
+    hasMore,
+    loadMore,
+  } = usePages(
+    (cursor) => getEvaluationsPage({ limit: limit ?? undefined, cursor }),
+    'Failed to load evaluations',
+    [limit]
+  );
 
   return (
     <div className="bg-white rounded-lg shadow-md overflow-hidden border border-gray-200">
@@ -93,8 +80,7 @@ const EvaluationsTable: React.FC<EvaluationsTableProps> = ({ limit }) => {
                   </td>
                   <td className="px-6 py-4 whitespace-nowrap">
                     <div className="text-sm text-gray-900">
-                      {(evaluation.details as any)?.pipeline?.name || evaluation.pipeline.name}{' '}
-                      v{(evaluation.details as any)?.pipeline?.version || evaluation.pipeline.version}
+                      {evaluation.pipeline.name} v{evaluation.pipeline.version}
                     </div>
                   </td>
                   <td className="px-6 py-4 whitespace-nowrap">
@@ -151,6 +137,14 @@ const EvaluationsTable: React.FC<EvaluationsTableProps> = ({ limit }) => {
           </tbody>
         </table>
       </div>
+      {limit === null && hasMore && !loading && (
+        <LoadMoreButton
+          onClick={loadMore}
+          loading={loadingMore}
+          error={loadMoreError}
+          label="Load more evaluations"
+        />
+      )}
     </div>
   );
 };
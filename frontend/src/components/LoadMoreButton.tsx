@@ -0,0 +1,30 @@
+import React from 'react';
+
+interface LoadMoreButtonProps {
+  onClick: () => void;
+  loading: boolean;
+  error?: string | null;
+  label?: string;
+}
+
+const LoadMoreButton: React.FC<LoadMoreButtonProps> = ({
+  onClick,
+  loading,
+  error,
+  label = 'Load more',
+}) => {
+  return (
+    <div className="flex flex-col items-center py-4">
+      {error && <p className="mb-2 text-sm text-red-600">Error: {error}</p>}
+      <button
+        onClick={onClick}
+        disabled={loading}
+        className="px-4 py-2 rounded-md text-sm font-medium text-blue-600 border border-blue-600 hover:bg-blue-50 transition-colors disabled:text-gray-400 disabled:border-gray-300 disabled:cursor-not-allowed disabled:hover:bg-transparent"
+      >
+        {loading ? 'Loading...' : label}
+      </button>
+    </div>
+  );
+};
+
+export default LoadMoreButton;
@@ -0,0 +1,98 @@
+import { useState, useEffect, useCallback, useRef } from 'react';
+import type { DependencyList } from 'react';
+import type { Page } from '../api/types';
+
+/**
+ * Lists the items of a paginated endpoint one page at a time
+ *
+ * The first page is fetched on mount and whenever `deps` change, the next ones
+ * only when `loadMore` is called. `error` is set when the first page failed,
+ * `loadMoreError` when one of the next ones did, keeping the items loaded.
+ *
+ * @param fetchPage - Fetches the page starting after the given cursor
+ * @param errorMessage - Error shown when a page fails without a message
+ * @param deps - Values the first page depends on
+ */
+export const usePages = <T>(
+  fetchPage: (cursor?: string) => Promise<Page<T>>,
+  errorMessage: string,
+  deps: DependencyList = []
+) => {
+  const [items, setItems] = useState<T[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loading, setLoading] = useState<boolean>(true);
+  const [loadingMore, setLoadingMore] = useState<boolean>(false);
+  const [error, setError] = useState<string | null>(null);
+  const [loadMoreError, setLoadMoreError] = useState<string | null>(null);
+
+  // Latest `fetchPage`, and a counter so that pages of an earlier list are
+  // dropped once `deps` changed
+  const fetchPageRef = useRef(fetchPage);
+  fetchPageRef.current = fetchPage;
+  const listRef = useRef(0);
+
+  useEffect(() => {
+    const list = ++listRef.current;
+
+    const fetchFirstPage = async () => {
+      try {
+        setLoading(true);
+        setError(null);
+        setLoadMoreError(null);
+        setItems([]);
+        setNextCursor(null);
+        const page = await fetchPageRef.current();
+        if (list === listRef.current) {
+          setItems(page.items);
+          setNextCursor(page.nextCursor);
+        }
+      } catch (err) {
+        if (list === listRef.current) {
+          setError(err instanceof Error ? err.message : errorMessage);
+        }
+        console.error('Error fetching page:', err);
+      } finally {
+        if (list === listRef.current) {
+          setLoading(false);
+        }
+      }
+    };
+
+    fetchFirstPage();
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, deps);
+
+  const loadMore = useCallback(async () => {
+    if (nextCursor === null || loadingMore) {
+      return;
+    }
+
+    const list = listRef.current;
+    try {
+      setLoadingMore(true);
+      setLoadMoreError(null);
+      const page = await fetchPageRef.current(nextCursor);
+      if (list === listRef.current) {
+        setItems((prev) => [...prev, ...page.items]);
+        setNextCursor(page.nextCursor);
+      }
+    } catch (err) {
+      if (list === listRef.current) {
+        setLoadMoreError(err instanceof Error ? err.message : errorMessage);
+      }
+      console.error('Error fetching page:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  }, [nextCursor, loadingMore, errorMessage]);
+
+  return {
+    items,
+    loading,
+    loadingMore,
+    error,
+    loadMoreError,
+    hasMore: nextCursor !== null,
+    loadMore,
+  };
+};
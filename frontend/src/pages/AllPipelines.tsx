@@ -1,9 +1,11 @@
-import React, { useEffect, useState, useMemo } from 'react';
+import React, { useState, useMemo } from 'react';
 import { useNavigate } from 'react-router-dom';
 import Header from '../components/Header';
 import NotificationContainer from '../components/NotificationContainer';
+import LoadMoreButton from '../components/LoadMoreButton';
 import { useNotifications } from '../hooks/useNotifications';
-import { getPipelines, updatePipeline } from '../api/pipelines';
+import { usePages } from '../hooks/usePages';
+import { getPipelinesPage, updatePipeline } from '../api/pipelines';
 import type { Pipeline } from '../api/types';
 
 const AllPipelines: React.FC = () => {
@@ -13,28 +15,15 @@ const AllPipelines: React.FC = () => {
   const [disablingPipelineId, setDisablingPipelineId] = useState<string | null>(null);
   const [enablingPipelineId, setEnablingPipelineId] = useState<string | null>(null);
 
-  const [pipelines, setPipelines] = useState<Pipeline[]>([]);
-  const [pipelinesLoading, setPipelinesLoading] = useState<boolean>(true);
-  const [pipelinesError, setPipelinesError] = useState<string | null>(null);
-  
-  
-  useEffect(() => {
-    const fetchPipelines = async () => {
-      try {
-        setPipelinesLoading(true);
-        setPipelinesError(null);
-        const data = await getPipelines();
-        setPipelines(data);
-      } catch (err) {
-        setPipelinesError(err instanceof Error ? err.message : 'Failed to load pipelines');
-        console.error('Error fetching applications:', err);
-      } finally {
-        setPipelinesLoading(false);
-      }
-    };
-  
-    fetchPipelines();
-  }, []);
+  const {
+    items: pipelines,
+    loading: pipelinesLoading,
+    loadingMore: pipelinesLoadingMore,
+    error: pipelinesError,
+    loadMoreError: pipelinesLoadMoreError,
+    hasMore: hasMorePipelines,
+    loadMore: loadMorePipelines,
+  } = usePages((cursor) => getPipelinesPage({ cursor }), 'Failed to load pipelines');
 
   // Filter and sort pipelines
   const filteredPipelines = useMemo(() => {
@@ -370,6 +359,15 @@ const AllPipelines: React.FC = () => {
             <p className="text-gray-500">No pipelines found matching your search.</p>
           </div>
         )}
+
+        {!pipelinesLoading && hasMorePipelines && (
+          <LoadMoreButton
+            onClick={loadMorePipelines}
+            loading={pipelinesLoadingMore}
+            error={pipelinesLoadMoreError}
+            label="Load more pipelines"
+          />
+        )}
       </main>
 
       {/* Notification Container */}
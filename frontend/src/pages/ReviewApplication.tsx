@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useMemo } from 'react';
+import React, { useState, useMemo } from 'react';
 import { useNavigate } from 'react-router-dom';
 import ReactFlow, {
   Node,
@@ -13,11 +13,12 @@ import Header from '../components/Header';
 import RuleNode from '../components/RuleNode';
 import TerminalNode from '../components/TerminalNode';
 import NotificationContainer from '../components/NotificationContainer';
+import LoadMoreButton from '../components/LoadMoreButton';
 import { useNotifications } from '../hooks/useNotifications';
-import { getApplications } from '../api/applications';
-import { getPipelines } from '../api/pipelines';
+import { usePages } from '../hooks/usePages';
+import { getApplicationsPage } from '../api/applications';
+import { getPipelinesPage } from '../api/pipelines';
 import { evaluateApplication } from '../api/evaluations';
-import type { Application, Pipeline } from '../api/types';
 
 // Define node types for React Flow
 const nodeTypes: NodeTypes = {
@@ -30,49 +31,33 @@ const ReviewApplication: React.FC = () => {
   const { notifications, removeNotification, showSuccess, showError } = useNotifications();
   const [selectedApplication, setSelectedApplication] = useState<string>('');
   const [selectedPipeline, setSelectedPipeline] = useState<string>('');
-  const [applications, setApplications] = useState<Application[]>([]);
-  const [pipelines, setPipelines] = useState<Pipeline[]>([]);
-  const [applicationsLoading, setApplicationsLoading] = useState<boolean>(true);
-  const [pipelinesLoading, setPipelinesLoading] = useState<boolean>(true);
-  const [applicationsError, setApplicationsError] = useState<string | null>(null);
-  const [pipelinesError, setPipelinesError] = useState<string | null>(null);
   const [isRunning, setIsRunning] = useState<boolean>(false);
 
-  useEffect(() => {
-    const fetchApplications = async () => {
-      try {
-        setApplicationsLoading(true);
-        setApplicationsError(null);
-        const data = await getApplications({ statusNotIn: ['IN_REVIEW', 'REVIEWED']});
-        setApplications(data);
-      } catch (err) {
-        setApplicationsError(err instanceof Error ? err.message : 'Failed to load applications');
-        console.error('Error fetching applications:', err);
-      } finally {
-        setApplicationsLoading(false);
-      }
-    };
-
-    fetchApplications();
-  }, []);
-
-  useEffect(() => {
-    const fetchPipelines = async () => {
-      try {
-        setPipelinesLoading(true);
-        setPipelinesError(null);
-        const data = await getPipelines({ statusIn: ['ACTIVE']});
-        setPipelines(data);
-      } catch (err) {
-        setPipelinesError(err instanceof Error ? err.message : 'Failed to load pipelines');
-        console.error('Error fetching pipelines:', err);
-      } finally {
-        setPipelinesLoading(false);
-      }
-    };
+  const {
+    items: applications,
+    loading: applicationsLoading,
+    loadingMore: applicationsLoadingMore,
+    error: applicationsError,
+    loadMoreError: applicationsLoadMoreError,
+    hasMore: hasMoreApplications,
+    loadMore: loadMoreApplications,
+  } = usePages(
+    (cursor) => getApplicationsPage({ statusNotIn: ['IN_REVIEW', 'REVIEWED'], cursor }),
+    'Failed to load applications'
+  );
 
-    fetchPipelines();
-  }, []);
+  const {
+    items: pipelines,
+    loading: pipelinesLoading,
+    loadingMore: pipelinesLoadingMore,
+    error: pipelinesError,
+    loadMoreError: pipelinesLoadMoreError,
+    hasMore: hasMorePipelines,
+    loadMore: loadMorePipelines,
+  } = usePages(
+    (cursor) => getPipelinesPage({ statusIn: ['ACTIVE'], cursor }),
+    'Failed to load pipelines'
+  );
 
   const selectedAppData = applications.find((app) => app.key === selectedApplication);
   const selectedPipelineData = pipelines.find((p) => p.id === selectedPipeline);
@@ -240,6 +225,14 @@ const ReviewApplication: React.FC = () => {
                 {applicationsError && (
                   <div className="mt-2 text-sm text-red-600">{applicationsError}</div>
                 )}
+                {hasMoreApplications && (
+                  <LoadMoreButton
+                    onClick={loadMoreApplications}
+                    loading={applicationsLoadingMore}
+                    error={applicationsLoadMoreError}
+                    label="Load more applications"
+                  />
+                )}
                 {selectedAppData && (
                   <div className="mt-2 text-sm text-gray-500">Ref: {selectedAppData.key}</div>
                 )}
@@ -283,6 +276,14 @@ const ReviewApplication: React.FC = () => {
                 {pipelinesError && (
                   <div className="mt-2 text-sm text-red-600">{pipelinesError}</div>
                 )}
+                {hasMorePipelines && (
+                  <LoadMoreButton
+                    onClick={loadMorePipelines}
+                    loading={pipelinesLoadingMore}
+                    error={pipelinesLoadMoreError}
+                    label="Load more pipelines"
+                  />
+                )}
               </div>
             </div>
 